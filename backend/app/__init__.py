@@ -22,6 +22,35 @@ def create_app(config_class=Config):
     # Import models to ensure they are registered with SQLAlchemy
     from app import models
 
+    # In-process caches
+    from app.services.tracking_service import init_tracking_cache
+    from app.services.product_catalog import init_product_catalog
+    from app.services.driver_directory import init_driver_directory
+
+    init_tracking_cache(app)
+    init_product_catalog(app)
+    init_driver_directory(app)
+
+    # Role-version checks for tokens past ROLE_CLAIM_TTL
+    from app.utils.identity import init_identity
+
+    init_identity(app)
+
+    # Block-reserving tracking number allocator (one per worker)
+    from app.services.tracking_numbers import init_tracking_numbers
+
+    init_tracking_numbers(app)
+
+    # bcrypt process pool used by User.set_password / check_password
+    from app.services.password_hashing import init_password_hasher
+
+    init_password_hasher(app)
+
+    # Outbound mail queue worker (started on the first queued email)
+    from app.services.mail_queue import init_mail_queue
+
+    init_mail_queue(app)
+
     # Register Blueprints (Connecting your routes)
     from app.routes.auth import auth_bp
     from app.routes.product import product_bp
@@ -33,4 +62,9 @@ def create_app(config_class=Config):
 
     # You will register other blueprints here later (e.g., shipments_bp)
 
+    # CLI commands (flask update-tracking, ...)
+    from app.commands import init_commands
+
+    init_commands(app)
+
     return app
@@ -0,0 +1,117 @@
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app import db
+from app.services.mail_queue import drain_queue, purge_emails
+from app.services.shipment_stats import get_stats, rebuild_stats
+from app.services.shipment_events import ensure_event_partitions
+from app.services.tracking_backfill import (
+    clear_checkpoint,
+    count_missing,
+    get_checkpoint,
+    iter_backfill_chunks,
+)
+
+
+@click.command("update-tracking")
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Shipments per transaction (default: BACKFILL_CHUNK_SIZE).",
+)
+@click.option("--dry-run", is_flag=True, help="Only count what would be updated.")
+@click.option(
+    "--restart", is_flag=True, help="Ignore the checkpoint of an interrupted run."
+)
+@with_appcontext
+def update_tracking_command(chunk_size, dry_run, restart):
+    """Give shipments with missing tracking numbers a new one."""
+    chunk_size = chunk_size or current_app.config["BACKFILL_CHUNK_SIZE"]
+
+    start_after = 0 if restart else get_checkpoint()
+    if start_after:
+        click.echo(f"Resuming after shipment ID {start_after}.")
+
+    total = count_missing(start_after)
+    click.echo(f"Found {total} shipments without tracking numbers.")
+    if dry_run or total == 0:
+        if total == 0:
+            click.echo("No shipments needed updating.")
+        return
+
+    updated_count = 0
+    with click.progressbar(length=total, label="Updating", show_pos=True) as bar:
+        for updated in iter_backfill_chunks(chunk_size, after_id=start_after):
+            updated_count += updated
+            bar.update(updated)
+
+    clear_checkpoint()
+    click.echo(f"Successfully updated {updated_count} shipments.")
+
+
+@click.command("send-mail")
+@click.option("--once", is_flag=True, help="Send what is due, then exit.")
+@with_appcontext
+def send_mail_command(once):
+    """Deliver queued emails and purge old ones (instead of MAIL_WORKER_THREAD)."""
+    interval = current_app.config["MAIL_POLL_INTERVAL"]
+    while True:
+        claimed = drain_queue()
+        if claimed:
+            click.echo(f"Processed {claimed} queued emails.")
+        purged = purge_emails()
+        if purged:
+            click.echo(f"Purged {purged} finished emails.")
+        db.session.remove()
+        if once:
+            return
+        time.sleep(interval)
+
+
+@click.command("reconcile-stats")
+@with_appcontext
+def reconcile_stats_command():
+    """Rebuild the dashboard's shipment_stats from the shipments table."""
+    before = get_stats()
+    buckets = rebuild_stats()
+    db.session.commit()
+    after = get_stats()
+
+    click.echo(
+        f"Rebuilt {buckets} buckets: {after['total']['shipments']} shipments, "
+        f"{after['total']['weight']} kg."
+    )
+    if before != after:
+        click.echo(
+            f"Corrected drift (was {before['total']['shipments']} shipments, "
+            f"{before['total']['weight']} kg)."
+        )
+
+
+@click.command("create-event-partitions")
+@click.option(
+    "--months",
+    type=click.IntRange(min=0),
+    default=3,
+    show_default=True,
+    help="How many months ahead of the current one to prepare.",
+)
+@with_appcontext
+def create_event_partitions_command(months):
+    """Create upcoming monthly shipment_events partitions (PostgreSQL)."""
+    names = ensure_event_partitions(months)
+    db.session.commit()
+    if not names:
+        click.echo("shipment_events is not partitioned on this database.")
+        return
+    click.echo(f"Partitions ready: {', '.join(names)}")
+
+
+def init_commands(app):
+    """Registers the `flask ...` maintenance commands."""
+    app.cli.add_command(update_tracking_command)
+    app.cli.add_command(send_mail_command)
+    app.cli.add_command(reconcile_stats_command)
+    app.cli.add_command(create_event_partitions_command)
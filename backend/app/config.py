@@ -24,3 +24,75 @@ class Config:
     MAIL_DEFAULT_SENDER = (
         os.environ.get("MAIL_DEFAULT_SENDER") or "noreply@globallink.com"
     )
+
+    # Outbound mail queue: emails per SMTP connection, retry backoff, and
+    # the in-process worker thread (off = run `flask send-mail` instead)
+    MAIL_WORKER_THREAD = os.environ.get("MAIL_WORKER_THREAD", "1") != "0"
+    MAIL_POLL_INTERVAL = int(os.environ.get("MAIL_POLL_INTERVAL") or 30)
+    MAIL_BATCH_SIZE = int(os.environ.get("MAIL_BATCH_SIZE") or 50)
+    MAIL_MAX_ATTEMPTS = int(os.environ.get("MAIL_MAX_ATTEMPTS") or 8)
+    MAIL_RETRY_BASE_DELAY = int(os.environ.get("MAIL_RETRY_BASE_DELAY") or 30)
+    MAIL_RETRY_MAX_DELAY = int(os.environ.get("MAIL_RETRY_MAX_DELAY") or 3600)
+    MAIL_CLAIM_TIMEOUT = int(os.environ.get("MAIL_CLAIM_TIMEOUT") or 300)
+    # Days sent and failed emails are kept (bodies already cleared) before
+    # the mail worker deletes them
+    MAIL_RETENTION_DAYS = int(os.environ.get("MAIL_RETENTION_DAYS") or 7)
+
+    # Seconds a token's role claim is trusted without checking the users
+    # table, how many users' (role, role_version) each worker caches, and
+    # for how long. A role change is seen after at most
+    # ROLE_CLAIM_TTL + ROLE_CACHE_TTL seconds (at once in the worker that
+    # made it), so keep the cache TTL short.
+    ROLE_CLAIM_TTL = int(os.environ.get("ROLE_CLAIM_TTL") or 300)
+    ROLE_CACHE_SIZE = int(os.environ.get("ROLE_CACHE_SIZE") or 10000)
+    ROLE_CACHE_TTL = int(os.environ.get("ROLE_CACHE_TTL") or 15)
+
+    # Password hashing: bcrypt cost, and the size of the process pool that
+    # runs it (0 = hash inline in the request thread)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS") or 12)
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS") or 2)
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get("PASSWORD_HASH_TIMEOUT") or 10)
+
+    # Pagination (keyset / cursor based list endpoints)
+    PAGE_SIZE_DEFAULT = int(os.environ.get("PAGE_SIZE_DEFAULT") or 50)
+    PAGE_SIZE_MAX = int(os.environ.get("PAGE_SIZE_MAX") or 200)
+
+    # Rows fetched per round-trip when streaming exports
+    EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE") or 1000)
+
+    # Public tracking lookup cache (per worker process)
+    TRACKING_CACHE_SIZE = int(os.environ.get("TRACKING_CACHE_SIZE") or 10000)
+    TRACKING_CACHE_TTL = int(os.environ.get("TRACKING_CACHE_TTL") or 30)
+    TRACKING_CACHE_NEGATIVE_TTL = int(
+        os.environ.get("TRACKING_CACHE_NEGATIVE_TTL") or 5
+    )
+
+    # Seconds a worker may reuse the driver directory (/api/admin/drivers)
+    # even if no assignment or status change has been seen
+    DRIVER_DIRECTORY_TTL = int(os.environ.get("DRIVER_DIRECTORY_TTL") or 10)
+
+    # Default load (kg) a driver may carry when POST /api/admin/dispatch
+    # hands out Pending shipments
+    DISPATCH_DRIVER_CAPACITY = float(os.environ.get("DISPATCH_DRIVER_CAPACITY") or 1000)
+
+    # Max tracking numbers accepted by POST /api/shipments/track/batch
+    TRACKING_BATCH_MAX = int(os.environ.get("TRACKING_BATCH_MAX") or 500)
+
+    # Max rows accepted by POST /api/shipments/bulk
+    BULK_SHIPMENT_MAX = int(os.environ.get("BULK_SHIPMENT_MAX") or 5000)
+
+    # Rows per transaction for POST /api/products/import
+    IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE") or 1000)
+
+    # Rows per transaction for `flask update-tracking`
+    BACKFILL_CHUNK_SIZE = int(os.environ.get("BACKFILL_CHUNK_SIZE") or 1000)
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    # Cheap hashing profile: minimum bcrypt cost, no process pool
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    # Tests drain the mail queue explicitly
+    MAIL_WORKER_THREAD = False
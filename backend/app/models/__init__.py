@@ -2,3 +2,9 @@ from .user import User
 from .shipment import Shipment
 from .product import Product
 from .shipment_item import ShipmentItem
+from .cache_version import CacheVersion
+from .sequence_counter import SequenceCounter
+from .outbound_email import OutboundEmail
+from .shipment_stat import ShipmentStat
+from .shipment_event import ShipmentEvent
+from . import shipment_search
@@ -0,0 +1,18 @@
+from app import db
+
+
+class CacheVersion(db.Model):
+    """
+    A monotonically increasing counter per cache scope (e.g. "products",
+    "shipments:customer:7"). Write routes bump the scopes they touch in the
+    same transaction as the write, so every gunicorn worker can tell with one
+    primary-key lookup whether something it cached is still current.
+    """
+
+    __tablename__ = "cache_versions"
+
+    scope = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion {self.scope}={self.version}>"
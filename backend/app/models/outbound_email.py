@@ -0,0 +1,43 @@
+from datetime import datetime
+from app import db
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+
+class OutboundEmail(db.Model):
+    """
+    A queued email. Requests only insert a row (in the same transaction as
+    the change the email is about); a mail worker delivers it later.
+
+    `next_attempt_at` doubles as the claim: a worker that takes a row pushes
+    it forward by MAIL_CLAIM_TIMEOUT, so a row held by a worker that died is
+    picked up again once that lease runs out.
+
+    The body is cleared once the email is sent or has failed for good, since
+    it may carry secrets such as password reset codes; finished rows are
+    deleted after MAIL_RETENTION_DAYS (see services/mail_queue.py).
+    """
+
+    __tablename__ = "outbound_emails"
+    __table_args__ = (
+        db.Index("ix_outbound_emails_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String(255), nullable=True)
+    recipients = db.Column(db.JSON, nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=True)
+
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OutboundEmail {self.id} {self.status}>"
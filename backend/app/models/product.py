@@ -9,4 +9,12 @@ class Product(db.Model):
     sku = db.Column(db.String(50), unique=True, nullable=False)
     quantity = db.Column(db.Integer, default=0)
 
+    __table_args__ = (
+        # GET /products?limit=: ORDER BY name, id with a (name, id) seek
+        db.Index("ix_products_name_id", "name", "id"),
+        # GET /products?q=: case-insensitive prefix match on name or SKU
+        db.Index("ix_products_name_lower", db.func.lower(name)),
+        db.Index("ix_products_sku_lower", db.func.lower(sku)),
+    )
+
     # Removed to_dict method - using Marshmallow schemas for serialization
@@ -0,0 +1,31 @@
+from app import db
+
+# Tracking numbers are handed out in blocks of this many values; the
+# PostgreSQL sequence below steps by exactly one block per nextval().
+TRACKING_BLOCK_SIZE = 1000
+
+# On PostgreSQL each nextval() reserves the block [value, value + size).
+# Sequences are non-transactional, so a block is never handed out twice,
+# even if the transaction that fetched it rolls back.
+tracking_number_seq = db.Sequence(
+    "tracking_number_seq",
+    start=1,
+    increment=TRACKING_BLOCK_SIZE,
+    metadata=db.metadata,
+)
+
+
+class SequenceCounter(db.Model):
+    """
+    A named counter standing in for a sequence on dialects without them
+    (SQLite). `value` is the last number handed out; it is advanced by a
+    whole block at a time on a separate connection that commits at once.
+    """
+
+    __tablename__ = "sequence_counters"
+
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SequenceCounter {self.name}={self.value}>"
@@ -1,6 +1,4 @@
 from datetime import datetime
-import json
-import uuid
 from app import db
 
 # shipment.py - Shipment Model
@@ -9,8 +7,13 @@ from app import db
 
 
 def generate_tracking_number():
-    """Generate a unique 8-character uppercase alphanumeric tracking number."""
-    return str(uuid.uuid4())[:8].upper()
+    """
+    Generate a unique 8-character uppercase alphanumeric tracking number,
+    taken from this worker's pre-reserved block (see services/tracking_numbers.py).
+    """
+    from app.services.tracking_numbers import next_tracking_number
+
+    return next_tracking_number()
 
 
 class Shipment(db.Model):
@@ -29,6 +32,18 @@ class Shipment(db.Model):
 
     __tablename__ = "shipments"
 
+    # Composite indexes matching the list queries: filter by owner, then
+    # walk (created_at, id) newest first for keyset pagination.
+    __table_args__ = (
+        db.Index("ix_shipments_customer_created", "customer_id", "created_at", "id"),
+        db.Index("ix_shipments_driver_created", "driver_id", "created_at", "id"),
+        db.Index("ix_shipments_created_id", "created_at", "id"),
+        db.Index("ix_shipments_status_created", "status", "created_at"),
+        # Never hand a deleted shipment's id to a new one: its events are kept
+        # (see ShipmentEvent) and would show up on the new shipment's timeline.
+        {"sqlite_autoincrement": True},
+    )
+
     # 1. Primary Key: Essential for database indexing and identifying unique orders.
     id = db.Column(db.Integer, primary_key=True)
 
@@ -57,9 +72,6 @@ class Shipment(db.Model):
     # weight in kg
     weight = db.Column(db.Float, nullable=True)
 
-    # items as JSON string
-    items = db.Column(db.Text, nullable=True)
-
     # created_at uses datetime.utcnow to maintain a standardized timeline across timezones.
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -103,7 +115,10 @@ class Shipment(db.Model):
             "customer_id": self.customer_id,
             "driver_id": self.driver_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "items": json.loads(self.items) if self.items else [],
+            "items": [
+                {"product_id": item.product_id, "quantity": item.quantity}
+                for item in self.shipment_items
+            ],
         }
 
     def __repr__(self):
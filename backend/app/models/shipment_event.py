@@ -0,0 +1,38 @@
+from datetime import datetime
+from app import db
+
+
+class ShipmentEvent(db.Model):
+    """
+    Append-only history of a shipment: one row when it is created and one
+    per change of status, driver or payment status. Rows are never updated
+    and are kept when the shipment is deleted, so there is no foreign key.
+
+    Timelines are read with one range scan on (shipment_id, occurred_at).
+    On PostgreSQL the table is partitioned by month on occurred_at (see the
+    migration and `flask create-event-partitions`), which is why the
+    database primary key there is (id, occurred_at).
+    """
+
+    __tablename__ = "shipment_events"
+    __table_args__ = (
+        db.Index("ix_shipment_events_shipment_occurred", "shipment_id", "occurred_at"),
+    )
+
+    # Plain INTEGER on SQLite so it stays the autoincrementing rowid
+    id = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True
+    )
+    shipment_id = db.Column(db.Integer, nullable=False)
+    occurred_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # "created", "status", "driver_id" or "payment_status"
+    kind = db.Column(db.String(20), nullable=False)
+    old_value = db.Column(db.String(50), nullable=True)
+    new_value = db.Column(db.String(50), nullable=True)
+
+    # The user who made the change (None for system jobs)
+    actor_id = db.Column(db.Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<ShipmentEvent {self.shipment_id} {self.kind}={self.new_value}>"
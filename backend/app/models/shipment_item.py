@@ -7,7 +7,9 @@ class ShipmentItem(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
 
-    shipment_id = db.Column(db.Integer, db.ForeignKey("shipments.id"), nullable=False)
+    shipment_id = db.Column(
+        db.Integer, db.ForeignKey("shipments.id"), nullable=False, index=True
+    )
 
     product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
 
@@ -0,0 +1,57 @@
+# models/shipment_search.py
+# Full-text search over shipments (destination, recipient, notes, tracking_number).
+#
+# - PostgreSQL: a GIN index on a 'simple' tsvector expression.
+# - SQLite: an external-content FTS5 table kept in sync by triggers.
+#
+# The DDL hangs off the shipments table's create/drop events so db.create_all()
+# (tests, seed.py) builds it too; the migration issues the same statements.
+from sqlalchemy import DDL, event
+from app.models.shipment import Shipment
+
+SEARCH_COLUMNS = ("destination", "recipient", "notes", "tracking_number")
+
+# The expression must be written identically in queries for PostgreSQL to use
+# the index, so both sides are built from this one string.
+PG_SEARCH_DOCUMENT = "to_tsvector('simple', {})".format(
+    " || ' ' || ".join(f"coalesce({c}, '')" for c in SEARCH_COLUMNS)
+)
+
+PG_CREATE = [
+    f"CREATE INDEX IF NOT EXISTS ix_shipments_search ON shipments "
+    f"USING GIN ({PG_SEARCH_DOCUMENT})",
+]
+
+_cols = ", ".join(SEARCH_COLUMNS)
+_new = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+_old = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+SQLITE_CREATE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS shipments_fts USING fts5("
+    f"{_cols}, content='shipments', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS shipments_fts_ai AFTER INSERT ON shipments BEGIN "
+    f"INSERT INTO shipments_fts(rowid, {_cols}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS shipments_fts_ad AFTER DELETE ON shipments BEGIN "
+    f"INSERT INTO shipments_fts(shipments_fts, rowid, {_cols}) "
+    f"VALUES ('delete', old.id, {_old}); END",
+    # Only re-index when a searchable column changes, not on every status update
+    f"CREATE TRIGGER IF NOT EXISTS shipments_fts_au AFTER UPDATE OF {_cols} "
+    f"ON shipments BEGIN "
+    f"INSERT INTO shipments_fts(shipments_fts, rowid, {_cols}) "
+    f"VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO shipments_fts(rowid, {_cols}) VALUES (new.id, {_new}); END",
+]
+SQLITE_DROP = ["DROP TABLE IF EXISTS shipments_fts"]
+
+for statement in PG_CREATE:
+    event.listen(
+        Shipment.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_CREATE:
+    event.listen(
+        Shipment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+for statement in SQLITE_DROP:
+    event.listen(
+        Shipment.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite")
+    )
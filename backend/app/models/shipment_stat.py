@@ -0,0 +1,21 @@
+from app import db
+
+
+class ShipmentStat(db.Model):
+    """
+    Running totals of shipments per (status, payment_status) bucket, kept
+    up to date by every shipment write in the same transaction (see
+    services/shipment_stats.py). The dashboard reads these few rows instead
+    of aggregating the shipments table; `flask reconcile-stats` rebuilds
+    them from scratch.
+    """
+
+    __tablename__ = "shipment_stats"
+
+    status = db.Column(db.String(20), primary_key=True)
+    payment_status = db.Column(db.String(20), primary_key=True)
+    shipments = db.Column(db.BigInteger, nullable=False, default=0)
+    weight = db.Column(db.Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ShipmentStat {self.status}/{self.payment_status}={self.shipments}>"
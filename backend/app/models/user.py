@@ -1,4 +1,4 @@
-from app import db, bcrypt
+from app import db
 from datetime import datetime
 
 
@@ -11,18 +11,52 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
 
     # Role: 'admin', 'driver', 'customer'
-    role = db.Column(db.String(20), default="customer", nullable=False)
+    role = db.Column(db.String(20), default="customer", nullable=False, index=True)
+
+    # Bumped whenever the role changes; tokens carry the value they were
+    # issued with, so a stale role claim is detected (see utils/identity.py)
+    role_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     # Password reset fields
     reset_token = db.Column(db.String(128), nullable=True)
     token_expiry = db.Column(db.DateTime, nullable=True)
 
+    def set_role(self, role):
+        """
+        Changes the role and invalidates tokens issued with the old one.
+        Every role change must go through here: it also drops the user from
+        this worker's role cache (other workers see it within ROLE_CACHE_TTL).
+        """
+        if role != self.role:
+            from app.utils.identity import role_cache
+
+            if "driver" in (role, self.role):
+                from app.services import cache_versions
+
+                cache_versions.bump(cache_versions.DRIVERS)
+            self.role = role
+            self.role_version = (self.role_version or 0) + 1
+            if self.id is not None:
+                role_cache().invalidate(self.id)
+
+    # Hashing runs in the app's bounded bcrypt process pool
+    # (see services/password_hashing.py)
     def set_password(self, password):
         """Creates a hash of the password."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        from app.services.password_hashing import hash_password
+
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """Checks if the provided password matches the hash."""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        from app.services.password_hashing import check_password
+
+        return check_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True if the stored hash uses a lower bcrypt cost than configured."""
+        from app.services.password_hashing import password_hasher
+
+        return password_hasher().needs_rehash(self.password_hash)
 
     # Removed to_dict method - using Marshmallow schemas for serialization
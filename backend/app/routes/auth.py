@@ -1,8 +1,22 @@
-from flask import Blueprint, request, jsonify, current_app
-from app import db, mail
+from flask import Blueprint, request, jsonify
+from app import db
 from app.models.user import User
-from app.schemas import user_register_schema, user_login_schema, user_schema
-from app.utils.decorators import login_required
+from app.schemas import (
+    user_register_schema,
+    user_login_schema,
+    user_role_schema,
+    user_schema,
+)
+from app.utils.decorators import login_required, admin_required
+from app.services.password_hashing import (
+    PasswordHashTimeout,
+    hash_password,
+    check_password,
+)
+from app.utils.identity import token_claims
+from app.services.mail_queue import enqueue_email, notify_mail_worker
+from app.services import cache_versions
+from app.services.driver_directory import driver_directory
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
@@ -10,7 +24,6 @@ from flask_jwt_extended import (
     get_jwt_identity,
     get_jwt,
 )
-from flask_mail import Message
 import random
 import string
 from datetime import datetime, timedelta
@@ -19,6 +32,13 @@ from datetime import datetime, timedelta
 auth_bp = Blueprint("auth", __name__)
 
 
+def _hashing_busy(key="message"):
+    """503 for requests whose password hashing timed out in the pool."""
+    response = jsonify({key: "Server is busy, please try again shortly"})
+    response.headers["Retry-After"] = "5"
+    return response, 503
+
+
 # REGISTRATION
 @auth_bp.route("/register", methods=["POST"])
 def register():
@@ -36,12 +56,17 @@ def register():
         # Hash Password & Save
         new_user.set_password(data["password"])
         db.session.add(new_user)
+        if new_user.role == "driver":
+            cache_versions.bump(cache_versions.DRIVERS)
         db.session.commit()
 
         # Return user data (without password)
         result = user_schema.dump(new_user)
         return jsonify({"message": "User registered successfully", "user": result}), 201
 
+    except PasswordHashTimeout:
+        db.session.rollback()
+        return _hashing_busy()
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 400
@@ -59,13 +84,19 @@ def login():
 
         # Check Password
         if user and user.check_password(data["password"]):
-            # Create Tokens
-            access_token = create_access_token(
-                identity={"id": user.id, "role": user.role}
-            )
-            refresh_token = create_refresh_token(
-                identity={"id": user.id, "role": user.role}
-            )
+            # Upgrade hashes made with an older, cheaper cost while we
+            # still have the plaintext
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(data["password"])
+                    db.session.commit()
+                except Exception:
+                    # The old hash still works; try again on the next login
+                    db.session.rollback()
+
+            # Create Tokens (role + role-version claims, see utils/identity.py)
+            access_token = create_access_token(**token_claims(user))
+            refresh_token = create_refresh_token(**token_claims(user))
 
             # Return user data using schema (safe serialization)
             result = user_schema.dump(user)
@@ -79,6 +110,8 @@ def login():
         else:
             return jsonify({"message": "Invalid email or password"}), 401
 
+    except PasswordHashTimeout:
+        return _hashing_busy()
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -91,7 +124,12 @@ def refresh():
         # For now, accept any valid JWT token and create a new access token
         # In production, you might want to restrict this to refresh tokens only
         current_user = get_jwt_identity()
-        access_token = create_access_token(identity=current_user)
+
+        # Re-read the role so the new token carries current claims
+        user = db.session.get(User, current_user["id"])
+        if not user:
+            return jsonify({"message": "User not found"}), 401
+        access_token = create_access_token(**token_claims(user))
 
         return jsonify({
             "message": "Token refreshed successfully",
@@ -124,37 +162,30 @@ def forgot_password():
         reset_code = "".join(random.choices(string.digits, k=6))
 
         # Hash the code for storage
-        from app import bcrypt
-
-        hashed_code = bcrypt.generate_password_hash(reset_code).decode("utf-8")
+        hashed_code = hash_password(reset_code)
 
         # Set expiry to 15 minutes from now
         expiry = datetime.utcnow() + timedelta(minutes=15)
 
         user.reset_token = hashed_code
         user.token_expiry = expiry
-        db.session.commit()
 
-        # Send email
-        try:
-            print(
-                f"Mail config - SERVER: {current_app.config.get('MAIL_SERVER')}, USERNAME: {current_app.config.get('MAIL_USERNAME')}, PORT: {current_app.config.get('MAIL_PORT')}"
-            )  # Debugging
-            msg = Message(
-                subject="Password Reset Code - GlobalLink Logistics",
-                recipients=[email],
-                body=f"Your password reset code is: {reset_code}\n\nThis code expires in 15 minutes.",
-            )
-            mail.send(msg)
-            print("Email sent successfully")  # Debugging
-        except Exception as mail_error:
-            print(f"Mail sending failed: {mail_error}")  # Debugging
-            return jsonify({"error": f"Failed to send email: {str(mail_error)}"}), 500
+        # Queue the email with the code it carries; the mail worker sends it
+        enqueue_email(
+            subject="Password Reset Code - GlobalLink Logistics",
+            recipients=[email],
+            body=f"Your password reset code is: {reset_code}\n\nThis code expires in 15 minutes.",
+        )
+        db.session.commit()
+        notify_mail_worker()
 
         return jsonify({
             "message": "If the email exists, a reset code has been sent"
         }), 200
 
+    except PasswordHashTimeout:
+        db.session.rollback()
+        return _hashing_busy("error")
     except Exception as e:
         db.session.rollback()
         print(f"Forgot password error: {e}")  # Debugging
@@ -184,9 +215,7 @@ def reset_password():
             return jsonify({"message": "Reset code has expired"}), 400
 
         # Verify code
-        from app import bcrypt
-
-        if not bcrypt.check_password_hash(user.reset_token, code):
+        if not check_password(user.reset_token, code):
             return jsonify({"message": "Invalid reset code"}), 400
 
         # Update password
@@ -197,6 +226,32 @@ def reset_password():
 
         return jsonify({"message": "Password reset successfully"}), 200
 
+    except PasswordHashTimeout:
+        db.session.rollback()
+        return _hashing_busy()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 400
+
+
+# CHANGE ROLE
+@auth_bp.route("/users/<int:user_id>/role", methods=["PATCH"])
+@admin_required
+def change_role(user_id):
+    """
+    Admin only: Change a user's role. Tokens carrying the old role stop
+    working once their role claim is no longer trusted (see utils/identity.py).
+    """
+    try:
+        data = user_role_schema.load(request.get_json())
+        user = db.session.get(User, user_id)
+        if user is None:
+            return jsonify({"message": "User not found"}), 404
+
+        user.set_role(data["role"])
+        db.session.commit()
+        return jsonify({"message": "Role updated", "user": user_schema.dump(user)}), 200
+
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 400
@@ -207,9 +262,10 @@ def reset_password():
 @login_required
 def get_drivers():
     try:
-        drivers = User.query.filter_by(role="driver").all()
+        # Served from the cached driver directory (see /api/admin/drivers)
         return jsonify([
-            {"id": d.id, "email": d.email, "name": d.username} for d in drivers
+            {"id": d["id"], "email": d["email"], "name": d["name"]}
+            for d in driver_directory()
         ]), 200
     except Exception as e:
         return jsonify({"message": str(e)}), 400
@@ -1,17 +1,70 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db
 from app.models.product import Product
-from app.schemas import product_schema, products_schema
+from app.schemas import product_schema
 from app.utils.decorators import login_required, admin_required
+from app.utils.etag import conditional
+from app.services import cache_versions
+from app.services.product_catalog import product_catalog
+from app.services.product_queries import (
+    parse_fields,
+    product_list_query,
+    product_serializer,
+    search_products,
+)
+from app.utils.pagination import parse_limit, seek_paginate
+from app.services.product_import import (
+    import_products,
+    iter_csv_rows,
+    iter_ndjson_rows,
+)
 
 product_bp = Blueprint("product", __name__)
 
 
 @product_bp.route("/products", methods=["GET"])
 @login_required
+@conditional(lambda: (cache_versions.PRODUCTS, cache_versions.STOCK))
 def get_products():
-    products = Product.query.all()
-    return jsonify(products_schema.dump(products)), 200
+    # ?limit=, ?cursor=, ?fields= and ?q= go to the database; the bare list
+    # is served from this worker's catalog snapshot (rebuilt only after writes)
+    if request.args:
+        return _product_list_response()
+
+    catalog = product_catalog()
+    response = current_app.response_class(catalog.body, mimetype="application/json")
+    return response, 200
+
+
+def _product_list_response():
+    """
+    Sparse, searchable product list: selects only the ?fields= columns,
+    filters on the ?q= name/SKU prefix and, when ?limit= or ?cursor= is
+    given, returns a keyset page ({"products", "next_cursor"}) ordered by
+    name. Without them the plain (filtered) list is returned.
+    """
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        query = search_products(product_list_query(fields), request.args.get("q", ""))
+        serializer = product_serializer(fields)
+
+        if "limit" in request.args or "cursor" in request.args:
+            limit = parse_limit(request.args.get("limit"))
+            products, next_cursor = seek_paginate(
+                query,
+                (Product.name, Product.id),
+                limit,
+                cursor=request.args.get("cursor"),
+            )
+            return jsonify({
+                "products": serializer.dump(products),
+                "next_cursor": next_cursor,
+            }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    products = query.order_by(Product.name, Product.id).all()
+    return jsonify(serializer.dump(products)), 200
 
 
 @product_bp.route("/products", methods=["POST"])
@@ -22,10 +75,11 @@ def create_product():
         product_data = product_schema.load(request.get_json(), session=db.session)
 
         # Check for duplicate SKU
-        if Product.query.filter_by(sku=product_data.sku).first():
+        if product_data.sku in product_catalog().sku_index:
             return jsonify({"message": "SKU already exists"}), 409
 
         db.session.add(product_data)
+        cache_versions.bump(cache_versions.PRODUCTS)
         db.session.commit()
 
         return jsonify(product_schema.dump(product_data)), 201
@@ -41,18 +95,20 @@ def update_product(product_id):
     product = Product.query.get_or_404(product_id)
     data = request.get_json()
 
+    # Check the SKU before touching the product, so the catalog snapshot
+    # can't be rebuilt from unsaved changes
+    if data.get("sku"):
+        if data["sku"] != product.sku and data["sku"] in product_catalog().sku_index:
+            return jsonify({"message": "SKU already exists"}), 409
+
     if data.get("name"):
         product.name = data["name"]
     if data.get("sku"):
-        if (
-            Product.query.filter_by(sku=data["sku"]).first()
-            and data["sku"] != product.sku
-        ):
-            return jsonify({"message": "SKU already exists"}), 409
         product.sku = data["sku"]
     if data.get("quantity") is not None:
         product.quantity = data["quantity"]
 
+    cache_versions.bump(cache_versions.PRODUCTS)
     db.session.commit()
     return jsonify(product_schema.dump(product)), 200
 
@@ -62,5 +118,36 @@ def update_product(product_id):
 def delete_product(product_id):
     product = Product.query.get_or_404(product_id)
     db.session.delete(product)
+    cache_versions.bump(cache_versions.PRODUCTS)
     db.session.commit()
     return jsonify({"message": "Product deleted"}), 200
+
+
+@product_bp.route("/products/import", methods=["POST"])
+@admin_required
+def import_products_route():
+    """
+    Admin only: Upsert products by SKU from a CSV (name,sku,quantity header)
+    or NDJSON file. Send it as the raw request body (Content-Type text/csv or
+    application/x-ndjson) or as a multipart upload in the "file" field.
+    The file is read and written in batches, never loaded whole.
+    """
+    upload = request.files.get("file")
+    if upload is not None:
+        stream = upload.stream
+        is_ndjson = (upload.filename or "").lower().endswith((".ndjson", ".jsonl"))
+    else:
+        stream = request.stream
+        is_ndjson = request.mimetype in ("application/x-ndjson", "application/jsonl")
+
+    if request.args.get("format") in ("csv", "ndjson"):
+        is_ndjson = request.args["format"] == "ndjson"
+
+    rows = iter_ndjson_rows(stream) if is_ndjson else iter_csv_rows(stream)
+
+    try:
+        report = import_products(rows, current_app.config["IMPORT_BATCH_SIZE"])
+    except Exception as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify(report), 200
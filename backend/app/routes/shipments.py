@@ -1,28 +1,136 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    current_app,
+    stream_with_context,
+)
 from app import db
-from app.models.user import User
 from app.models.shipment import Shipment
-from app.models.shipment_item import ShipmentItem
 from app.schemas import (
-    shipments_schema,
+    fast_shipment_rows_schema,
     shipment_schema,
     shipment_create_schema,
     shipment_status_schema,
+    tracking_batch_schema,
+    dispatch_schema,
+    shipment_bulk_create_schema,
+    shipment_bulk_update_schema,
 )
 from app.utils.decorators import login_required, admin_required, driver_required
-from datetime import datetime
+from app.utils.identity import current_identity
+from app.utils.pagination import keyset_paginate, parse_limit
+from app.services.export_service import iter_shipments_ndjson, iter_shipments_csv
+from app.services.shipment_queries import (
+    shipment_list_query,
+    filter_shipments,
+    parse_sort,
+)
+from app.services import cache_versions
+from app.services.driver_directory import driver_directory
+from app.services.dispatch import dispatch_pending
+from app.services.shipment_stats import StatsDelta, get_stats
+from app.services.shipment_events import EventLog, TRACKED_FIELDS
+from app.services.inventory import (
+    CANCELLED,
+    InsufficientStock,
+    apply_status_stock,
+)
+from app.services.shipment_service import (
+    create_shipment_logic,
+    bulk_insert_shipments,
+    bulk_update_shipments,
+    editable_changes,
+    PAYMENT_PENDING_ERROR,
+    DELIVERED_CANCEL_ERROR,
+)
+from app.services.tracking_numbers import is_generated_tracking_number
+from app.services.tracking_service import (
+    lookup_tracking,
+    lookup_tracking_many,
+    invalidate_tracking,
+    tracking_cache,
+)
+from app.utils.etag import conditional
 import uuid
 import json
-from sqlalchemy.orm import joinedload
+from marshmallow import ValidationError
+from sqlalchemy.orm import selectinload
 
 shipment_bp = Blueprint("shipment", __name__)
 
-#
+
+def _wants_full_list():
+    """
+    ?all=1 opts out of pagination and returns the plain, unbounded list
+    (the response shape from before pagination existed).
+    """
+    return request.args.get("all") in ("1", "true")
+
+
+def _list_response(query):
+    """
+    Applies the request's filters and sort to `query` and serializes the
+    result as a keyset page ({"shipments", "next_cursor"}) of ?limit= rows,
+    PAGE_SIZE_DEFAULT when not given. Only ?all=1 returns the plain list.
+    """
+    try:
+        query = filter_shipments(query, request.args)
+        newest_first = parse_sort(request.args.get("sort"))
+
+        if not _wants_full_list():
+            limit = parse_limit(request.args.get("limit"))
+            shipments, next_cursor = keyset_paginate(
+                query,
+                Shipment.created_at,
+                Shipment.id,
+                limit,
+                cursor=request.args.get("cursor"),
+                descending=newest_first,
+            )
+            return jsonify({
+                "shipments": fast_shipment_rows_schema.dump(shipments),
+                "next_cursor": next_cursor,
+            }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if "sort" in request.args:
+        direction = "desc" if newest_first else "asc"
+        query = query.order_by(
+            getattr(Shipment.created_at, direction)(),
+            getattr(Shipment.id, direction)(),
+        )
+
+    shipments = query.all()
+
+    try:
+        data = fast_shipment_rows_schema.dump(shipments)
+        return jsonify(data), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 422
+
+
+def _list_scope():
+    """The CacheVersion scope of the list the current user is allowed to see."""
+    user = current_identity()
+
+    if user.role == "admin":
+        return cache_versions.ALL_SHIPMENTS
+    if user.role == "driver":
+        return cache_versions.driver_shipments(user.id)
+    return cache_versions.customer_shipments(user.id)
+
+
+def _admin_list_scope():
+    scope = _list_scope()
+    return scope if scope == cache_versions.ALL_SHIPMENTS else None
 
 
 @shipment_bp.route("/shipments/", methods=["GET"], strict_slashes=False)
 @login_required
+@conditional(_list_scope)
 def get_shipments():
     """
     Get all shipments based on user role.
@@ -30,88 +138,94 @@ def get_shipments():
     - Driver: Sees ALL (to find assignments)
     - Customer: Sees ONLY their own
     """
-    current_user = get_jwt_identity()
-    user_id = current_user["id"]
-    user = User.query.get(user_id)
+    # Role and id come from the token claims; no users-table lookup
+    user = current_identity()
 
-    if user.role == "admin":
-        shipments = Shipment.query.options(
-            joinedload(Shipment.shipment_items),
-            joinedload(Shipment.customer),
-            joinedload(Shipment.driver),
-        ).all()
-    elif user.role == "driver":
-        shipments = (
-            Shipment.query
-            .filter_by(driver_id=user.id)
-            .options(
-                joinedload(Shipment.shipment_items),
-                joinedload(Shipment.customer),
-                joinedload(Shipment.driver),
-            )
-            .all()
-        )
-    else:
-        shipments = (
-            Shipment.query
-            .filter_by(customer_id=user.id)
-            .options(
-                joinedload(Shipment.shipment_items),
-                joinedload(Shipment.customer),
-                joinedload(Shipment.driver),
-            )
-            .all()
-        )
+    query = shipment_list_query()
 
-    try:
-        data = shipments_schema.dump(shipments)
-        return jsonify(data), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 422
+    if user.role == "driver":
+        query = query.filter(Shipment.driver_id == user.id)
+    elif user.role != "admin":
+        query = query.filter(Shipment.customer_id == user.id)
+
+    return _list_response(query)
 
 
 @shipment_bp.route("/admin/all", methods=["GET"], strict_slashes=False)
-@jwt_required()
+@login_required
+@conditional(_admin_list_scope)
 def get_all_shipments():
     """
     Admin only: Get all shipments.
     """
     try:
-        # 1. Get the User ID from the Token
-        current_user_data = get_jwt_identity()
+        # 1. Verify Admin Role (from the token claims)
+        if current_identity().role != "admin":
+            return jsonify({"error": "Access denied. Admins only."}), 403
 
-        # Handle cases where identity might be just an ID or a Dict
-        if isinstance(current_user_data, dict):
-            user_id = current_user_data.get("id")
-        else:
-            user_id = current_user_data
+        # 2. Fetch All Shipments (filtered / one page at a time if asked for)
+        return _list_response(shipment_list_query())
 
-        # 2. Verify Admin Role in Database
-        user = User.query.get(user_id)
+    except Exception as e:
+        print(f"Error in Admin Route: {e}")
+        return jsonify({"error": str(e)}), 500
 
-        if not user or user.role != "admin":
-            return jsonify({"error": "Access denied. Admins only."}), 403
 
-        # 3. Fetch All Shipments
-        shipments = Shipment.query.options(
-            joinedload(Shipment.shipment_items),
-            joinedload(Shipment.customer),
-            joinedload(Shipment.driver),
-        ).all()
-
-        # Debug: Check if customer is loaded
-        if shipments:
-            print(f"First shipment customer: {shipments[0].customer}")
-            print(
-                f"Customer username: {shipments[0].customer.username if shipments[0].customer else 'None'}"
-            )
+@shipment_bp.route("/admin/shipments/export", methods=["GET"], strict_slashes=False)
+@admin_required
+def export_shipments():
+    """
+    Admin only: Stream every shipment as NDJSON (default) or CSV.
+    Rows are read and written in batches, so memory stays flat
+    regardless of how many shipments exist.
+    """
+    export_format = request.args.get("format", "ndjson").lower()
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+
+    if export_format == "ndjson":
+        body = iter_shipments_ndjson(batch_size)
+        mimetype = "application/x-ndjson"
+    elif export_format == "csv":
+        body = iter_shipments_csv(batch_size)
+        mimetype = "text/csv"
+    else:
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+
+    # stream_with_context keeps the app context (and DB session) open
+    # while the generator is being consumed by the WSGI server
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=shipments.{export_format}"
+        },
+    )
 
-        # 4. Return Data
-        data = shipments_schema.dump(shipments)
-        return jsonify(data), 200
 
+@shipment_bp.route("/admin/stats", methods=["GET"], strict_slashes=False)
+@admin_required
+def get_dashboard_stats():
+    """
+    Admin only: shipment counts and total weight overall, by status and by
+    payment status, read from the incrementally maintained shipment_stats.
+    """
+    try:
+        return jsonify(get_stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@shipment_bp.route("/admin/drivers", methods=["GET"], strict_slashes=False)
+@admin_required
+@conditional(lambda: cache_versions.DRIVERS)
+def get_driver_directory():
+    """
+    Admin only: every driver with their active shipment count and the
+    total weight (kg) they have in transit, to pick who to assign next.
+    """
+    try:
+        return jsonify(driver_directory()), 200
     except Exception as e:
-        print(f"Error in Admin Route: {e}")
         return jsonify({"error": str(e)}), 500
 
 
@@ -119,37 +233,23 @@ def get_all_shipments():
 @login_required
 def create_shipment():
     """
-    Creates a new shipment with recipient, weight, and items as JSON string.
+    Creates a new shipment with recipient, weight, and items.
+    Items go into shipment_items and their stock is reserved in the same
+    transaction (see services/shipment_service.py).
     """
     try:
-        current_user = get_jwt_identity()
-        user_id = current_user["id"]
+        user_id = current_identity().id
 
         # Validate and load data
         data = shipment_create_schema.load(request.get_json())
 
-        # Create the Shipment record
-        target_id = data.get("customer_id", user_id)
-
-        new_shipment = Shipment(
-            origin=data["origin"],
-            destination=data["destination"],
-            recipient=data["recipient"],
-            weight=data["weight"],
-            status="Pending",
-            payment_status="Unpaid",
-            notes=data.get("notes"),
-            customer_id=target_id,
-            driver_id=data.get("driver_id"),  # Optional: Admin might assign later
-            created_at=datetime.utcnow(),
-        )
-
         try:
-            db.session.add(new_shipment)
-            db.session.commit()
+            new_shipment = create_shipment_logic(data, user_id)
+            invalidate_tracking(new_shipment.tracking_number)
             return jsonify(shipment_schema.dump(new_shipment)), 201
+        except InsufficientStock as e:
+            return jsonify(e.to_dict()), 409
         except Exception as e:
-            db.session.rollback()
             print(str(e))
             return jsonify({"error": str(e)}), 400
 
@@ -159,6 +259,105 @@ def create_shipment():
         return jsonify({"error": str(e)}), 400
 
 
+@shipment_bp.route("/shipments/bulk", methods=["POST"])
+@admin_required
+def bulk_create_shipments():
+    """
+    Admin only: Create many shipments in one transaction.
+    Body: a list of shipment objects (same fields as POST /shipments), or
+    {"shipments": [...]}. Rows that fail validation or whose items are out
+    of stock are reported by index in "errors"; every other row is inserted
+    with one batched INSERT.
+    """
+    current_user = current_identity()
+    payload = request.get_json(silent=True)
+    rows = payload.get("shipments") if isinstance(payload, dict) else payload
+
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "Expected a non-empty list of shipments"}), 400
+    limit = current_app.config["BULK_SHIPMENT_MAX"]
+    if len(rows) > limit:
+        return jsonify({"error": f"At most {limit} shipments per request"}), 400
+
+    # 1. Validate every row; keep the valid ones and collect per-row errors
+    try:
+        loaded = shipment_bulk_create_schema.load(rows)
+        errors = {}
+    except ValidationError as e:
+        loaded = e.valid_data
+        errors = e.messages
+
+    valid = [(i, data) for i, data in enumerate(loaded) if i not in errors]
+
+    # 2. Client-supplied tracking numbers must be unique (checked in one query)
+    requested = [
+        data["tracking_number"].upper()
+        for _, data in valid
+        if data.get("tracking_number")
+    ]
+    taken = {
+        number
+        for (number,) in db.session.query(Shipment.tracking_number).filter(
+            Shipment.tracking_number.in_(requested)
+        )
+    }
+    seen = set()
+    for i, data in list(valid):
+        number = data.get("tracking_number")
+        if not number:
+            continue
+        data["tracking_number"] = number = number.upper()
+        if number in taken or number in seen:
+            errors[i] = {"tracking_number": ["Tracking number already exists."]}
+            valid.remove((i, data))
+        elif is_generated_tracking_number(number):
+            # Could collide with a number the allocator hands out later
+            errors[i] = {
+                "tracking_number": ["Tracking number is reserved for generated numbers."]
+            }
+            valid.remove((i, data))
+        seen.add(number)
+
+    if not valid:
+        return jsonify({"created": [], "errors": errors}), 400
+
+    # 3. Insert all valid rows that have stock and commit once
+    try:
+        created, values, shortfalls = bulk_insert_shipments(
+            [data for _, data in valid], current_user.id
+        )
+        for position in sorted(shortfalls, reverse=True):
+            i, _ = valid.pop(position)
+            errors[i] = {"items": [str(shortfalls[position])]}
+        if not created:
+            db.session.rollback()
+            return jsonify({"created": [], "errors": errors}), 409
+
+        scopes = set()
+        for row in values:
+            scopes |= cache_versions.shipment_scopes(
+                row["customer_id"], row["driver_id"]
+            )
+        cache_versions.bump(*scopes)
+        db.session.commit()
+    except InsufficientStock as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+    invalidate_tracking(*(number for _, number in created))
+
+    return jsonify({
+        "created": [
+            {"index": i, "id": shipment_id, "tracking_number": number}
+            for (i, _), (shipment_id, number) in zip(valid, created)
+        ],
+        "errors": errors,
+    }), 201
+
+
 @shipment_bp.route(
     "/shipments/<int:shipment_id>", methods=["GET"], strict_slashes=False
 )
@@ -168,12 +367,12 @@ def get_shipment(shipment_id):
     Get a single shipment.
     Security: Ensures users can't spy on other people's shipments.
     """
-    current_user = get_jwt_identity()
-    user_id = current_user["id"]
-    role = current_user["role"]
+    current_user = current_identity()
+    user_id = current_user.id
+    role = current_user.role
 
     shipment = Shipment.query.options(
-        joinedload(Shipment.shipment_items).joinedload(ShipmentItem.product)
+        selectinload(Shipment.shipment_items)
     ).get_or_404(shipment_id)
 
     # Security Check
@@ -191,49 +390,161 @@ def update_shipment(shipment_id):
     - Drivers can update Status.
     - Admins can update Driver Assignment.
     """
-    current_user = get_jwt_identity()
-    role = current_user["role"]
+    current_user = current_identity()
+    role = current_user.role
 
-    shipment = Shipment.query.get_or_404(shipment_id)
+    # Locked (on PostgreSQL) until commit, so the stats delta and events
+    # below are computed from the values this update really replaces
+    shipment = Shipment.query.filter_by(id=shipment_id).with_for_update().first_or_404()
     data = request.get_json()
+    previous_driver_id = shipment.driver_id
+    previous_stats = (shipment.status, shipment.payment_status, shipment.weight)
+    previous = {field: getattr(shipment, field) for field in TRACKED_FIELDS}
 
     try:
         new_status = data.get("status")
 
         # Business Rule: No Pay, No Delivery
         if new_status == "Delivered" and shipment.payment_status != "Paid":
-            return jsonify({
-                "error": "Cannot mark as Delivered. Payment is pending."
-            }), 400
-
-        # Admin Logic: Can assign drivers and update payment
-        if role == "admin":
-            if "driver_id" in data:
-                shipment.driver_id = data["driver_id"]
-            if "status" in data:
-                shipment.status = data["status"]
-            if "payment_status" in data:
-                shipment.payment_status = data["payment_status"]
-
-        # Driver Logic: Can only update status
-        if role == "driver":
-            if "status" in data:
-                shipment.status = data["status"]
-
+            return jsonify({"error": PAYMENT_PENDING_ERROR}), 400
+        # Delivered goods can't go back on the shelf
+        if new_status == "Cancelled" and shipment.status == "Delivered":
+            return jsonify({"error": DELIVERED_CANCEL_ERROR}), 400
+
+        # Admins can assign drivers and update payment; drivers only status
+        changes = editable_changes(role, data)
+
+        # Cancelling releases the items' stock; reinstating reserves it again
+        apply_status_stock(Shipment.id == shipment_id, changes.get("status"))
+
+        for field, value in changes.items():
+            setattr(shipment, field, value)
+
+        EventLog(actor_id=current_user.id).changed(
+            shipment.id, previous, changes
+        ).write()
+        StatsDelta().move(
+            previous_stats,
+            (shipment.status, shipment.payment_status, shipment.weight),
+        ).apply()
+        cache_versions.bump(
+            *cache_versions.shipment_scopes(
+                shipment.customer_id, previous_driver_id, shipment.driver_id
+            )
+        )
         db.session.commit()
+        invalidate_tracking(shipment.tracking_number)
         return jsonify(shipment_schema.dump(shipment)), 200
 
+    except InsufficientStock as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 400
+
+
+@shipment_bp.route("/shipments/bulk", methods=["PATCH"])
+@driver_required
+def bulk_update_shipments_route():
+    """
+    Bulk version of update_shipment, e.g. a driver marking a whole route
+    Delivered. Body: {"ids": [1, 2, 3], "status": "Delivered"}; admins may
+    also send "driver_id" and "payment_status". The same role and No Pay,
+    No Delivery rules apply, but all rows are changed by one UPDATE and one
+    commit. Returns {"updated": [ids], "rejected": {id: reason}}.
+    """
+    current_user = current_identity()
+    role = current_user.role
+
+    try:
+        data = shipment_bulk_update_schema.load(request.get_json() or {})
+    except ValidationError as e:
+        return jsonify({"error": e.messages}), 400
+
+    limit = current_app.config["BULK_SHIPMENT_MAX"]
+    if not data["ids"] or len(data["ids"]) > limit:
+        return jsonify({"error": f"ids must contain 1 to {limit} shipment ids"}), 400
+
+    try:
+        updated, rejected, before = bulk_update_shipments(
+            data["ids"],
+            data.get("status"),
+            editable_changes(role, data),
+            actor_id=current_user.id,
+        )
+
+        scopes = set()
+        for row in updated:
+            old = before[row.id]
+            scopes |= cache_versions.shipment_scopes(
+                old.customer_id, old.driver_id, row.driver_id
+            )
+        cache_versions.bump(*scopes)
+        db.session.commit()
+    except InsufficientStock as e:
+        db.session.rollback()
+        return jsonify(e.to_dict()), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 400
 
+    invalidate_tracking(*(before[row.id].tracking_number for row in updated))
+
+    return jsonify({
+        "updated": sorted(row.id for row in updated),
+        "rejected": rejected,
+    }), 200
+
+
+@shipment_bp.route("/admin/dispatch", methods=["POST"])
+@admin_required
+def dispatch_shipments():
+    """
+    Admin only: assign every unassigned Pending shipment to a driver in one
+    go, clustered by destination and within each driver's weight capacity.
+    Body (all optional): {"capacity": 800, "capacities": {"7": 1200},
+    "dry_run": true}. Returns the plan's summary; with dry_run nothing is
+    written.
+    """
+    try:
+        data = dispatch_schema.load(request.get_json(silent=True) or {})
+    except ValidationError as e:
+        return jsonify({"error": e.messages}), 400
+
+    capacity = data.get("capacity", current_app.config["DISPATCH_DRIVER_CAPACITY"])
+    try:
+        summary, tracking_numbers = dispatch_pending(
+            capacity,
+            data["capacities"],
+            dry_run=data["dry_run"],
+            actor_id=current_identity().id,
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    invalidate_tracking(*tracking_numbers)
+    return jsonify(summary), 200
+
 
 @shipment_bp.route("/shipments/<int:shipment_id>", methods=["DELETE"])
 @admin_required
 def delete_shipment(shipment_id):
-    shipment = Shipment.query.get_or_404(shipment_id)
+    shipment = Shipment.query.filter_by(id=shipment_id).with_for_update().first_or_404()
+    tracking_number = shipment.tracking_number
+    StatsDelta().remove(
+        shipment.status, shipment.payment_status, shipment.weight
+    ).apply()
+    # Stock of an undelivered shipment goes back on the shelf
+    apply_status_stock(Shipment.id == shipment_id, CANCELLED)
     db.session.delete(shipment)
+    cache_versions.bump(
+        *cache_versions.shipment_scopes(shipment.customer_id, shipment.driver_id)
+    )
     db.session.commit()
+    invalidate_tracking(tracking_number)
     return jsonify({"message": "Shipment deleted"}), 200
 
 
@@ -241,10 +552,46 @@ def delete_shipment(shipment_id):
 def track_shipment(tracking_number):
     """
     Public route to track a shipment by tracking number.
+    Served from the in-process tracking cache (see services/tracking_service.py).
     """
-    print(f"Searching for: {tracking_number}")
-    shipment = Shipment.query.filter_by(tracking_number=tracking_number.upper()).first()
-    print(f"Found shipment: {shipment}")
+    shipment = lookup_tracking(tracking_number)
     if not shipment:
         return jsonify({"error": "Shipment not found"}), 404
-    return jsonify(shipment_schema.dump(shipment)), 200
+    return jsonify(shipment), 200
+
+
+@shipment_bp.route("/shipments/track/batch", methods=["POST"])
+def track_shipments_batch():
+    """
+    Public route to track many shipments at once.
+    Body: {"tracking_numbers": ["ABC12345", ...]} (at most TRACKING_BATCH_MAX).
+    Returns {"results": {tracking_number: shipment}}, where unknown numbers map
+    to {"error": "Shipment not found"}.
+    """
+    try:
+        data = tracking_batch_schema.load(request.get_json() or {})
+    except ValidationError as e:
+        return jsonify({"error": e.messages}), 400
+
+    tracking_numbers = data["tracking_numbers"]
+    limit = current_app.config["TRACKING_BATCH_MAX"]
+    if not tracking_numbers:
+        return jsonify({"error": "tracking_numbers must not be empty"}), 400
+    if len(tracking_numbers) > limit:
+        return jsonify({
+            "error": f"At most {limit} tracking numbers per request"
+        }), 400
+
+    found = lookup_tracking_many(tracking_numbers)
+    results = {
+        key: shipment if shipment else {"error": "Shipment not found"}
+        for key, shipment in found.items()
+    }
+    return jsonify({"results": results}), 200
+
+
+@shipment_bp.route("/admin/cache/tracking", methods=["GET"])
+@admin_required
+def tracking_cache_stats():
+    """Admin only: hit/miss/eviction counters of this worker's tracking cache."""
+    return jsonify(tracking_cache().stats()), 200
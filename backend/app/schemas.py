@@ -5,6 +5,7 @@ from app.models.shipment import Shipment
 from app.models.shipment_item import ShipmentItem
 from marshmallow import fields, validates, ValidationError
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema, auto_field
+from app.utils.serializers import compile_serializer
 import re
 
 
@@ -36,6 +37,12 @@ class UserLoginSchema(ma.Schema):
     password = fields.Str(required=True, validate=lambda x: len(x) >= 6)
 
 
+class UserRoleSchema(ma.Schema):
+    role = fields.Str(
+        required=True, validate=lambda x: x in ["customer", "driver", "admin"]
+    )
+
+
 class UserRegisterSchema(ma.Schema):
     username = fields.Str(required=True, validate=lambda x: len(x) >= 2)
     email = fields.Email(required=True)
@@ -77,7 +84,6 @@ class ShipmentSchema(ma.Schema):
     customer_name = fields.Method("get_customer_name")
     customerEmail = fields.Method("get_customer_email")
     driverName = fields.Method("get_driver_name")
-    # items = fields.Nested(ShipmentItemSchema, many=True)
 
     def get_customer_name(self, obj):
         return obj.customer.username if obj.customer else "Unknown Customer"
@@ -89,6 +95,40 @@ class ShipmentSchema(ma.Schema):
         return obj.driver.username if obj.driver else None
 
 
+class ShipmentDetailSchema(ShipmentSchema):
+    """
+    ShipmentSchema plus the shipment's items, for single-shipment responses.
+    Load shipment_items with selectinload to avoid a query per shipment.
+    """
+
+    items = fields.Nested(ShipmentItemSchema, many=True, attribute="shipment_items")
+
+
+class ShipmentRowSchema(ma.Schema):
+    """
+    Same output as ShipmentSchema, but reads the flat rows produced by
+    services.shipment_queries.shipment_list_query (names already joined in).
+    """
+
+    id = fields.Int()
+    tracking = fields.Str(attribute="tracking_number")
+    status = fields.Str()
+    origin = fields.Str()
+    destination = fields.Str()
+    payment = fields.Str(attribute="payment_status")
+    customer_id = fields.Int()
+    driver_id = fields.Int()
+    created_at = fields.DateTime()
+    customer_name = fields.Str()
+    customerEmail = fields.Str()
+    driverName = fields.Str()
+
+
+class ShipmentItemInputSchema(ma.Schema):
+    product_id = fields.Int(required=True)
+    quantity = fields.Int(required=True, validate=lambda x: x >= 1)
+
+
 class ShipmentCreateSchema(ma.Schema):
     tracking_number = fields.Str(required=False)  # Will be generated if not provided
     origin = fields.Str(required=True)
@@ -98,6 +138,8 @@ class ShipmentCreateSchema(ma.Schema):
     notes = fields.Str(required=False)
     driver_id = fields.Int(required=False, allow_none=True)
     customer_id = fields.Int(required=False)
+    # Products to ship; their stock is reserved when the shipment is created
+    items = fields.List(fields.Nested(ShipmentItemInputSchema), load_default=list)
 
 
 class ShipmentStatusUpdateSchema(ma.Schema):
@@ -107,19 +149,63 @@ class ShipmentStatusUpdateSchema(ma.Schema):
     )
 
 
+class ShipmentBulkUpdateSchema(ma.Schema):
+    ids = fields.List(fields.Int(), required=True)
+    status = fields.Str(
+        validate=lambda x: x in ["Pending", "In Transit", "Delivered", "Cancelled"],
+    )
+    driver_id = fields.Int(allow_none=True)
+    payment_status = fields.Str()
+
+
+class TrackingBatchSchema(ma.Schema):
+    tracking_numbers = fields.List(
+        fields.Str(validate=lambda x: len(x.strip()) > 0), required=True
+    )
+
+
+class ShipmentEventSchema(ma.Schema):
+    """One entry of a shipment's timeline (actor ids are not exposed)."""
+
+    event = fields.Str(attribute="kind")
+    old = fields.Str(attribute="old_value", data_key="from", allow_none=True)
+    new = fields.Str(attribute="new_value", data_key="to", allow_none=True)
+    occurred_at = fields.DateTime()
+
+
+class DispatchSchema(ma.Schema):
+    # Default per-driver capacity in kg, and overrides for single drivers
+    capacity = fields.Float(validate=lambda x: x > 0)
+    capacities = fields.Dict(
+        keys=fields.Int(), values=fields.Float(validate=lambda x: x >= 0),
+        load_default=dict,
+    )
+    dry_run = fields.Bool(load_default=False)
+
+
 # Create schema instances
 user_schema = UserSchema()
 users_schema = UserSchema(many=True)
 user_login_schema = UserLoginSchema()
 user_register_schema = UserRegisterSchema()
+user_role_schema = UserRoleSchema()
 
 product_schema = ProductSchema()
 products_schema = ProductSchema(many=True)
 
-shipment_schema = ShipmentSchema()
+shipment_schema = ShipmentDetailSchema()
 shipments_schema = ShipmentSchema(many=True)
+shipment_rows_schema = ShipmentRowSchema(many=True)
+# Precompiled equivalents (same output, no per-field dispatch) for hot list paths
+fast_shipments_schema = compile_serializer(shipments_schema)
+fast_shipment_rows_schema = compile_serializer(shipment_rows_schema)
 shipment_create_schema = ShipmentCreateSchema()
+shipment_bulk_create_schema = ShipmentCreateSchema(many=True)
+shipment_bulk_update_schema = ShipmentBulkUpdateSchema()
 shipment_status_schema = ShipmentStatusUpdateSchema()
+tracking_batch_schema = TrackingBatchSchema()
+dispatch_schema = DispatchSchema()
+shipment_events_schema = ShipmentEventSchema(many=True)
 
 shipment_item_schema = ShipmentItemSchema()
 shipment_items_schema = ShipmentItemSchema(many=True)
@@ -3,6 +3,7 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.shipment import Shipment
 from app.models.shipment_item import ShipmentItem
+from app.services.shipment_stats import rebuild_stats
 
 
 def seed_database():
@@ -76,6 +77,9 @@ def seed_database():
         )
 
         db.session.add_all([item1, item2, item3])
+
+        # Shipments were added directly, so build the dashboard stats
+        rebuild_stats()
         db.session.commit()
 
         print("Database seeded successfully!")
@@ -1 +1,3 @@
 from .shipment_service import create_shipment_logic
+from .export_service import iter_shipments_ndjson, iter_shipments_csv
+from .shipment_queries import shipment_list_query
@@ -0,0 +1,70 @@
+from sqlalchemy import select
+from app import db
+from app.models.cache_version import CacheVersion
+from app.utils.sql import dialect_insert
+
+# Scope names
+PRODUCTS = "products"
+# Product quantities only: reserved and released by shipments, so bumped on
+# every order without invalidating the rest of the catalog
+STOCK = "stock"
+ALL_SHIPMENTS = "shipments"
+# Driver directory: driver accounts and the load of their active shipments
+DRIVERS = "drivers"
+
+
+def customer_shipments(customer_id):
+    return f"shipments:customer:{customer_id}"
+
+
+def driver_shipments(driver_id):
+    return f"shipments:driver:{driver_id}"
+
+
+def shipment_scopes(customer_id, *driver_ids):
+    """
+    Every list scope a shipment with these owners appears in, plus the
+    driver directory if any driver is involved (their load may change).
+    """
+    scopes = {ALL_SHIPMENTS, customer_shipments(customer_id)}
+    drivers = {d for d in driver_ids if d is not None}
+    scopes.update(driver_shipments(d) for d in drivers)
+    if drivers:
+        scopes.add(DRIVERS)
+    return scopes
+
+
+def bump(*scopes):
+    """
+    Increments the version of each scope inside the current transaction.
+    Call it before db.session.commit() so the bump and the write commit
+    (or roll back) together.
+    """
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    # One executemany for all scopes, in a fixed order so concurrent
+    # writers lock the rows the same way
+    stmt = dialect_insert(CacheVersion).values(version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CacheVersion.scope],
+        set_={"version": CacheVersion.version + 1},
+    )
+    db.session.execute(stmt, [{"scope": scope} for scope in scopes])
+
+
+def get_version(scope):
+    """Current version of `scope`; 0 if it has never been bumped."""
+    version = db.session.execute(
+        select(CacheVersion.version).where(CacheVersion.scope == scope)
+    ).scalar()
+    return version or 0
+
+
+def get_versions(*scopes):
+    """Current versions of `scopes` (a tuple in the same order), one query."""
+    rows = dict(db.session.execute(
+        select(CacheVersion.scope, CacheVersion.version)
+        .where(CacheVersion.scope.in_(scopes))
+    ).all())
+    return tuple(rows.get(scope) or 0 for scope in scopes)
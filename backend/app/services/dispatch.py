@@ -0,0 +1,193 @@
+import heapq
+from collections import defaultdict
+from sqlalchemy import bindparam, func, select, update
+from app import db
+from app.models.shipment import Shipment
+from app.models.user import User
+from app.services import cache_versions
+from app.services.driver_directory import ACTIVE_STATUSES
+from app.services.shipment_events import EventLog
+
+PENDING = "Pending"
+
+
+def _destination_key(destination):
+    return " ".join((destination or "").split()).lower()
+
+
+def plan_assignments(shipments, drivers, capacity, capacities=None):
+    """
+    Splits `shipments` over `drivers` without exceeding anyone's capacity.
+
+    `shipments` are (id, destination, weight) tuples and `drivers` are
+    (id, current_load) tuples, weights in kg. A driver's capacity is
+    `capacities[driver_id]` if given, else `capacity`.
+
+    Shipments are grouped by destination so each driver gets clustered
+    stops. Clusters are placed heaviest first (first-fit decreasing), each
+    on the driver with the most spare capacity, which keeps the loads
+    balanced; a cluster that doesn't fit anywhere whole is split, heaviest
+    shipments first, across the next drivers in line. Runs in
+    O(n log n + n log m) for n shipments and m drivers, with no per
+    (shipment, driver) work.
+
+    Returns ({shipment_id: driver_id}, [shipment ids that fit nowhere]).
+    """
+    capacities = capacities or {}
+
+    clusters = defaultdict(list)
+    for shipment_id, destination, weight in shipments:
+        clusters[_destination_key(destination)].append((weight or 0.0, shipment_id))
+    ordered = sorted(
+        clusters.values(), key=lambda c: (-sum(w for w, _ in c), min(i for _, i in c))
+    )
+
+    # Max-heap on spare capacity; ties go to the driver with fewer new
+    # stops, then the lower id, so equal drivers take turns
+    heap = []
+    for driver_id, load in drivers:
+        spare = capacities.get(driver_id, capacity) - (load or 0.0)
+        heap.append((-spare, 0, driver_id))
+    heapq.heapify(heap)
+
+    assignments = {}
+    unassigned = []
+    for cluster in ordered:
+        cluster.sort(key=lambda item: (-item[0], item[1]))
+        remaining = cluster
+        while remaining and heap:
+            neg_spare, stops, driver_id = heapq.heappop(heap)
+            spare = -neg_spare
+            taken = []
+            left = []
+            for weight, shipment_id in remaining:
+                if weight <= spare:
+                    spare -= weight
+                    taken.append(shipment_id)
+                else:
+                    left.append((weight, shipment_id))
+            heapq.heappush(heap, (-spare, stops + len(taken), driver_id))
+            if not taken:
+                # The driver with the most room can't take any of them
+                break
+            for shipment_id in taken:
+                assignments[shipment_id] = driver_id
+            remaining = left
+        unassigned.extend(shipment_id for _, shipment_id in remaining)
+
+    return assignments, sorted(unassigned)
+
+
+def _driver_loads():
+    """(driver id, kg on active shipments) for every driver, one GROUP BY."""
+    load = (
+        select(
+            Shipment.driver_id,
+            func.sum(func.coalesce(Shipment.weight, 0)).label("weight"),
+        )
+        .where(
+            Shipment.driver_id.isnot(None),
+            Shipment.status.in_(ACTIVE_STATUSES),
+        )
+        .group_by(Shipment.driver_id)
+        .subquery()
+    )
+    return db.session.execute(
+        select(User.id, func.coalesce(load.c.weight, 0))
+        .outerjoin(load, load.c.driver_id == User.id)
+        .where(User.role == "driver")
+        .order_by(User.id)
+    ).all()
+
+
+def dispatch_pending(capacity, capacities=None, dry_run=False, actor_id=None):
+    """
+    Assigns every unassigned Pending shipment to a driver (see
+    plan_assignments) and writes the plan with one executemany UPDATE.
+
+    Rows are only updated while still unassigned and Pending, so a shipment
+    assigned by hand in the meantime is left alone (counted as "skipped").
+    Logs a driver event per assignment, bumps the affected cache scopes but
+    does not commit. Returns (summary dict, tracking numbers of the
+    assigned shipments).
+    """
+    pending = db.session.execute(
+        select(
+            Shipment.id,
+            Shipment.destination,
+            Shipment.weight,
+            Shipment.customer_id,
+            Shipment.tracking_number,
+        )
+        .where(Shipment.driver_id.is_(None), Shipment.status == PENDING)
+        .order_by(Shipment.id)
+    ).all()
+    drivers = _driver_loads()
+
+    assignments, unassigned = plan_assignments(
+        [(row.id, row.destination, row.weight) for row in pending],
+        drivers,
+        capacity,
+        capacities,
+    )
+
+    per_driver = defaultdict(lambda: {"shipments": 0, "weight": 0.0})
+    by_id = {row.id: row for row in pending}
+    for shipment_id, driver_id in assignments.items():
+        per_driver[driver_id]["shipments"] += 1
+        per_driver[driver_id]["weight"] += by_id[shipment_id].weight or 0.0
+
+    summary = {
+        "pending": len(pending),
+        "drivers": len(drivers),
+        "assigned": len(assignments),
+        "skipped": 0,
+        "unassigned": unassigned,
+        "by_driver": {str(d): stats for d, stats in sorted(per_driver.items())},
+        "dry_run": dry_run,
+    }
+    if dry_run or not assignments:
+        return summary, []
+
+    # Core table, not the ORM entity: an ORM executemany UPDATE would be
+    # treated as a by-primary-key bulk update and drop the extra conditions
+    shipments = Shipment.__table__
+    result = db.session.execute(
+        update(shipments)
+        .where(
+            shipments.c.id == bindparam("b_id"),
+            shipments.c.driver_id.is_(None),
+            shipments.c.status == PENDING,
+        )
+        .values(driver_id=bindparam("b_driver_id")),
+        [
+            {"b_id": shipment_id, "b_driver_id": driver_id}
+            for shipment_id, driver_id in assignments.items()
+        ],
+    )
+    if result.rowcount != len(assignments):
+        # Some rows changed under us: keep only the assignments that stuck
+        applied = db.session.execute(
+            select(shipments.c.id, shipments.c.driver_id).where(
+                shipments.c.id.in_(list(assignments))
+            )
+        ).all()
+        assignments = {
+            shipment_id: driver_id
+            for shipment_id, driver_id in applied
+            if assignments[shipment_id] == driver_id
+        }
+        summary["skipped"] = summary["assigned"] - len(assignments)
+        summary["assigned"] = len(assignments)
+
+    log = EventLog(actor_id=actor_id)
+    for shipment_id, driver_id in sorted(assignments.items()):
+        log.changed(shipment_id, {"driver_id": None}, {"driver_id": driver_id})
+    log.write()
+
+    scopes = {cache_versions.DRIVERS}
+    for shipment_id, driver_id in assignments.items():
+        scopes |= cache_versions.shipment_scopes(by_id[shipment_id].customer_id, driver_id)
+    cache_versions.bump(*scopes)
+
+    return summary, [by_id[shipment_id].tracking_number for shipment_id in assignments]
@@ -0,0 +1,81 @@
+from flask import current_app
+from sqlalchemy import case, func, select
+from app import db
+from app.models.shipment import Shipment
+from app.models.user import User
+from app.services import cache_versions
+from app.utils.cache import TTLCache
+
+# Shipments that still occupy a driver
+ACTIVE_STATUSES = ("Pending", "In Transit")
+IN_TRANSIT = "In Transit"
+
+
+def init_driver_directory(app):
+    """Per-worker cache of the driver directory, keyed by the "drivers" version."""
+    app.extensions["driver_directory"] = TTLCache(
+        maxsize=4, ttl=app.config["DRIVER_DIRECTORY_TTL"]
+    )
+
+
+def driver_directory_cache():
+    return current_app.extensions["driver_directory"]
+
+
+def _load_directory():
+    """
+    Every driver with their number of active shipments and the total weight
+    of those in transit, from a single GROUP BY over shipments.driver_id
+    outer-joined to the driver accounts.
+    """
+    load = (
+        select(
+            Shipment.driver_id,
+            func.count().label("active_shipments"),
+            func.sum(
+                case((Shipment.status == IN_TRANSIT, Shipment.weight), else_=0)
+            ).label("in_transit_weight"),
+        )
+        .where(
+            Shipment.driver_id.isnot(None),
+            Shipment.status.in_(ACTIVE_STATUSES),
+        )
+        .group_by(Shipment.driver_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(
+            User.id,
+            User.username,
+            User.email,
+            func.coalesce(load.c.active_shipments, 0),
+            func.coalesce(load.c.in_transit_weight, 0),
+        )
+        .outerjoin(load, load.c.driver_id == User.id)
+        .where(User.role == "driver")
+        .order_by(User.username, User.id)
+    ).all()
+    return [
+        {
+            "id": driver_id,
+            "name": username,
+            "email": email,
+            "active_shipments": active,
+            "in_transit_weight": float(weight),
+        }
+        for driver_id, username, email, active, weight in rows
+    ]
+
+
+def driver_directory():
+    """
+    The driver directory as a list of dicts, ordered by name.
+
+    Entries are cached per worker under the current "drivers" CacheVersion,
+    which assignment, status and driver-account changes bump, so a change is
+    visible on the next request in every worker. DRIVER_DIRECTORY_TTL bounds
+    how long a snapshot is reused even without a bump (e.g. after writes
+    made outside the app).
+    """
+    version = cache_versions.get_version(cache_versions.DRIVERS)
+    return driver_directory_cache().get_or_load(version, _load_directory)
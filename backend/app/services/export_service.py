@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from app import db
+from app.models.shipment import Shipment
+from app.schemas import shipment_rows_schema, fast_shipment_rows_schema
+from app.services.shipment_queries import shipment_list_query
+
+# Column order for CSV exports, taken straight from the list schema so the
+# export always matches what the JSON endpoints return.
+EXPORT_FIELDS = list(shipment_rows_schema.dump_fields)
+
+
+def iter_shipment_batches(batch_size):
+    """
+    Yields serialized shipments in lists of at most `batch_size`.
+
+    yield_per turns on a server-side cursor (stream_results) where the driver
+    supports one, so only a single batch of rows is alive at a time. The
+    column-projected list query returns plain rows, so nothing accumulates
+    in the session's identity map while streaming.
+    """
+    stmt = (
+        shipment_list_query()
+        .order_by(Shipment.id)
+        .statement.execution_options(yield_per=batch_size)
+    )
+
+    result = db.session.execute(stmt)
+    for partition in result.partitions():
+        yield fast_shipment_rows_schema.dump(partition)
+
+
+def iter_shipments_ndjson(batch_size):
+    """Newline-delimited JSON: one shipment object per line."""
+    for rows in iter_shipment_batches(batch_size):
+        yield "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def iter_shipments_csv(batch_size):
+    """CSV with a header row, written one batch at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    for rows in iter_shipment_batches(batch_size):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(rows)
+        yield buffer.getvalue()
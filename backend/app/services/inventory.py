@@ -0,0 +1,201 @@
+from collections import Counter
+from sqlalchemy import func, select, update
+from app import db
+from app.models.product import Product
+from app.models.shipment import Shipment
+from app.models.shipment_item import ShipmentItem
+from app.services import cache_versions
+
+# Stock is held by every shipment that is not Cancelled: it is taken when the
+# shipment is created and given back when it is cancelled (or deleted before
+# delivery), and taken again if a cancelled shipment is reinstated. Delivered
+# goods have left the warehouse and are never given back.
+CANCELLED = "Cancelled"
+DELIVERED = "Delivered"
+
+
+class InsufficientStock(Exception):
+    """Raised when a reservation would take a product's quantity below zero."""
+
+    def __init__(self, product_id, requested, available):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        if available is None:
+            message = f"Product {product_id} does not exist"
+        else:
+            message = (
+                f"Insufficient stock for product {product_id}: "
+                f"requested {requested}, available {available}"
+            )
+        super().__init__(message)
+
+    def to_dict(self):
+        return {
+            "error": str(self),
+            "product_id": self.product_id,
+            "requested": self.requested,
+            "available": self.available,
+        }
+
+
+def _totals(items):
+    """[(product_id, quantity)] summed per product, in product_id order."""
+    totals = Counter()
+    for item in items:
+        totals[item["product_id"]] += item["quantity"]
+    return sorted(totals.items())
+
+
+def reserve_stock(items):
+    """
+    Takes `items` ([{"product_id", "quantity"}]) out of stock.
+
+    Each product is decremented with a conditional
+    UPDATE products SET quantity = quantity - n WHERE id = ? AND quantity >= n,
+    so two writers can never both take the last units: the second UPDATE
+    matches no row. Products are always visited in product_id order, so
+    concurrent reservations lock rows in the same order and can't deadlock.
+
+    Raises InsufficientStock on the first product that can't be covered;
+    the caller must roll back, which also undoes the earlier decrements.
+    Does not commit.
+    """
+    totals = _totals(items)
+    for product_id, quantity in totals:
+        result = db.session.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.quantity >= quantity)
+            .values(quantity=Product.quantity - quantity),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount != 1:
+            available = db.session.execute(
+                select(Product.quantity).where(Product.id == product_id)
+            ).scalar_one_or_none()
+            raise InsufficientStock(product_id, quantity, available)
+
+    if totals:
+        cache_versions.bump(cache_versions.STOCK)
+
+
+def reserve_stock_per_row(item_lists):
+    """
+    Reserves stock for several rows (one list of {"product_id", "quantity"}
+    per row) where each row is all or nothing but one short row doesn't
+    sink the others.
+
+    Current quantities are read with one SELECT (FOR UPDATE on PostgreSQL,
+    in product_id order) and the rows are allocated in order; a row that
+    can't be covered from what is left is skipped. The accepted rows are
+    then taken with reserve_stock, whose conditional UPDATEs still refuse
+    to oversell if another writer got in first on a database without row
+    locks (it raises InsufficientStock for the whole call).
+
+    Returns {row index: InsufficientStock} for the skipped rows. Does not
+    commit.
+    """
+    product_ids = sorted({
+        item["product_id"] for items in item_lists for item in items
+    })
+    if not product_ids:
+        return {}
+    query = (
+        select(Product.id, Product.quantity)
+        .where(Product.id.in_(product_ids))
+        .order_by(Product.id)
+    )
+    if db.engine.dialect.name == "postgresql":
+        query = query.with_for_update()
+    available = {
+        product_id: quantity or 0
+        for product_id, quantity in db.session.execute(query)
+    }
+
+    accepted = []
+    shortfalls = {}
+    for index, items in enumerate(item_lists):
+        totals = _totals(items)
+        short = next(
+            (
+                (product_id, quantity)
+                for product_id, quantity in totals
+                if quantity > available.get(product_id, -1)
+            ),
+            None,
+        )
+        if short is not None:
+            product_id, quantity = short
+            shortfalls[index] = InsufficientStock(
+                product_id, quantity, available.get(product_id)
+            )
+            continue
+        for product_id, quantity in totals:
+            available[product_id] -= quantity
+        accepted.extend(items)
+
+    reserve_stock(accepted)
+    return shortfalls
+
+
+def release_stock(items):
+    """Puts `items` back into stock (same ordering as reserve_stock). Does not commit."""
+    totals = _totals(items)
+    for product_id, quantity in totals:
+        db.session.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(quantity=func.coalesce(Product.quantity, 0) + quantity),
+            execution_options={"synchronize_session": False},
+        )
+
+    if totals:
+        cache_versions.bump(cache_versions.STOCK)
+
+
+def shipment_item_totals(shipment_ids):
+    """[{"product_id", "quantity"}] summed over the items of `shipment_ids`."""
+    if not shipment_ids:
+        return []
+    rows = db.session.execute(
+        select(ShipmentItem.product_id, func.sum(ShipmentItem.quantity))
+        .where(ShipmentItem.shipment_id.in_(shipment_ids))
+        .group_by(ShipmentItem.product_id)
+    )
+    return [{"product_id": product_id, "quantity": int(total)} for product_id, total in rows]
+
+
+def apply_status_stock(condition, new_status):
+    """
+    Moves stock for the shipments matching `condition` whose change to
+    `new_status` crosses the Cancelled boundary: cancelling releases their
+    items, reinstating a cancelled shipment reserves them again. Delivered
+    shipments never cross (the routes refuse to cancel them).
+
+    The crossing shipments are switched to `new_status` by one
+    UPDATE ... WHERE <condition> AND status [!]= 'Cancelled' RETURNING id,
+    so a shipment cancelled by two requests at once is released only once.
+    Returns the ids that crossed. May raise InsufficientStock. Does not commit.
+    """
+    if new_status is None:
+        return []
+
+    if new_status == CANCELLED:
+        crossing = Shipment.status.notin_([CANCELLED, DELIVERED])
+    else:
+        crossing = Shipment.status == CANCELLED
+
+    shipment_ids = db.session.execute(
+        update(Shipment)
+        .where(condition, crossing)
+        .values(status=new_status)
+        .returning(Shipment.id),
+        execution_options={"synchronize_session": False},
+    ).scalars().all()
+
+    items = shipment_item_totals(shipment_ids)
+    if new_status == CANCELLED:
+        release_stock(items)
+    else:
+        reserve_stock(items)
+    return shipment_ids
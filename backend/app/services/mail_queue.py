@@ -0,0 +1,263 @@
+import os
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import delete, select, update
+from app import db, mail
+from app.models.outbound_email import OutboundEmail, PENDING, SENT, FAILED
+
+
+def enqueue_email(subject, recipients, body, sender=None):
+    """
+    Queues an email in the current transaction. Nothing is sent until the
+    caller commits; call notify_mail_worker() after the commit to have it
+    delivered right away rather than at the next poll.
+    """
+    email = OutboundEmail(
+        subject=subject, recipients=list(recipients), body=body, sender=sender
+    )
+    db.session.add(email)
+    return email
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2 x base, 4 x base, ... capped at the max."""
+    config = current_app.config
+    delay = config["MAIL_RETRY_BASE_DELAY"] * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, config["MAIL_RETRY_MAX_DELAY"]))
+
+
+def _is_permanent(error):
+    """5xx replies and refused recipients won't succeed on a retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def _connection_lost(error):
+    # SMTPException subclasses OSError; only socket errors and a dropped
+    # session mean the connection can't be reused
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def claim_batch(limit):
+    """
+    Takes up to `limit` due emails for this worker and commits the claim, so
+    concurrent workers (threads or `flask send-mail` processes) never send
+    the same row twice.
+    """
+    now = datetime.utcnow()
+    due = (
+        select(OutboundEmail.id)
+        .where(OutboundEmail.status == PENDING, OutboundEmail.next_attempt_at <= now)
+        .order_by(OutboundEmail.next_attempt_at, OutboundEmail.id)
+        .limit(limit)
+    )
+    if db.engine.dialect.name == "postgresql":
+        due = due.with_for_update(skip_locked=True)
+    ids = db.session.execute(due).scalars().all()
+    if not ids:
+        db.session.commit()
+        return []
+
+    lease = now + timedelta(seconds=current_app.config["MAIL_CLAIM_TIMEOUT"])
+    claimed = db.session.execute(
+        update(OutboundEmail)
+        .where(
+            OutboundEmail.id.in_(ids),
+            OutboundEmail.status == PENDING,
+            OutboundEmail.next_attempt_at <= now,
+        )
+        .values(next_attempt_at=lease)
+        .returning(OutboundEmail.id),
+        execution_options={"synchronize_session": False},
+    ).scalars().all()
+    db.session.commit()
+    if not claimed:
+        return []
+    return db.session.execute(
+        select(OutboundEmail)
+        .where(OutboundEmail.id.in_(claimed))
+        .order_by(OutboundEmail.id)
+    ).scalars().all()
+
+
+def _record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"[:1000]
+    if _is_permanent(error) or email.attempts >= current_app.config["MAIL_MAX_ATTEMPTS"]:
+        email.status = FAILED
+        email.body = None
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def deliver_batch(batch_size=None):
+    """
+    Sends one batch of due emails over a single SMTP connection.
+
+    Each email's outcome is committed as soon as it is known, and the body
+    of a sent or permanently failed email is cleared in the same commit. If
+    the connection can't be opened or drops mid-batch, the email being sent
+    counts as a failed attempt and the rest of the batch goes back to the
+    queue for the next run. Returns the number of emails claimed.
+    """
+    batch_size = batch_size or current_app.config["MAIL_BATCH_SIZE"]
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0
+
+    remaining = list(emails)
+    connected = False
+    try:
+        with mail.connect() as connection:
+            connected = True
+            while remaining:
+                email = remaining[0]
+                now = datetime.utcnow()
+                try:
+                    connection.send(
+                        Message(
+                            subject=email.subject,
+                            recipients=email.recipients,
+                            body=email.body,
+                            sender=email.sender,
+                        )
+                    )
+                except Exception as error:
+                    _record_failure(email, error, now)
+                    remaining.pop(0)
+                    db.session.commit()
+                    if _connection_lost(error):
+                        break
+                    continue
+                email.status = SENT
+                email.sent_at = now
+                email.last_error = None
+                # Don't keep reset codes and the like around once delivered
+                email.body = None
+                remaining.pop(0)
+                db.session.commit()
+    except Exception as error:
+        # Opening the connection failed (or closing a dropped one)
+        if not connected:
+            _record_failure(remaining.pop(0), error, datetime.utcnow())
+            db.session.commit()
+        current_app.logger.warning("SMTP connection failed: %s", error)
+
+    if remaining:
+        # Not attempted: release the claim so the next run picks them up
+        retry_at = datetime.utcnow() + retry_delay(1)
+        for email in remaining:
+            email.next_attempt_at = retry_at
+        db.session.commit()
+    return len(emails)
+
+
+def drain_queue(batch_size=None):
+    """Delivers batches until no full batch is due. Returns emails claimed."""
+    batch_size = batch_size or current_app.config["MAIL_BATCH_SIZE"]
+    total = 0
+    while True:
+        claimed = deliver_batch(batch_size)
+        total += claimed
+        if claimed < batch_size:
+            return total
+
+
+def purge_emails(retention_days=None):
+    """
+    Deletes sent and failed emails last claimed more than `retention_days`
+    (default MAIL_RETENTION_DAYS) ago and commits. Returns the number of
+    rows deleted.
+    """
+    if retention_days is None:
+        retention_days = current_app.config["MAIL_RETENTION_DAYS"]
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    # next_attempt_at is the last claim's lease, so this is a range scan on
+    # ix_outbound_emails_status_next_attempt for each finished status
+    result = db.session.execute(
+        delete(OutboundEmail).where(
+            OutboundEmail.status.in_([SENT, FAILED]),
+            OutboundEmail.next_attempt_at < cutoff,
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+class MailWorker:
+    """
+    Background thread that drains the mail queue inside a web worker.
+
+    It is started lazily by notify() (after gunicorn has forked), wakes as
+    soon as a request queues an email, and otherwise polls every
+    MAIL_POLL_INTERVAL seconds, so emails left over by a crashed process are
+    still delivered, and purges finished emails past MAIL_RETENTION_DAYS.
+    Rows live in the database, so nothing is lost if the process exits
+    while emails are queued.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def notify(self):
+        self._ensure_started()
+        self._wake.set()
+
+    def _ensure_started(self):
+        with self._lock:
+            alive = self._thread is not None and self._thread.is_alive()
+            if alive and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="mail-worker", daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            with self.app.app_context():
+                try:
+                    drain_queue()
+                    purge_emails()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Mail worker failed to drain the queue")
+                finally:
+                    db.session.remove()
+            self._wake.wait(self.app.config["MAIL_POLL_INTERVAL"])
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+
+def init_mail_queue(app):
+    """Gives each app its own mail worker (only started if MAIL_WORKER_THREAD)."""
+    app.extensions["mail_worker"] = MailWorker(app)
+
+
+def notify_mail_worker():
+    """Wakes this process's mail worker; no-op when MAIL_WORKER_THREAD is off."""
+    if current_app.config["MAIL_WORKER_THREAD"]:
+        current_app.extensions["mail_worker"].notify()
@@ -0,0 +1,129 @@
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt as _bcrypt
+from flask import current_app
+
+
+# Worker-side functions: module level so the process pool can pickle them.
+def _hash(password, rounds):
+    return _bcrypt.hashpw(password, _bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _check(password, pw_hash):
+    return hmac.compare_digest(_bcrypt.hashpw(password, pw_hash), pw_hash)
+
+
+class PasswordHashTimeout(Exception):
+    """Raised when the hashing pool doesn't answer within PASSWORD_HASH_TIMEOUT."""
+
+
+def hash_cost(pw_hash):
+    """The log2 cost of a "$2b$12$..." hash, or None if it isn't a bcrypt hash."""
+    parts = pw_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing with a configurable cost (BCRYPT_LOG_ROUNDS), run in a
+    bounded process pool (PASSWORD_HASH_WORKERS processes) so a burst of
+    logins queues for a fixed number of CPUs instead of tying up every
+    request thread of the worker. With 0 workers hashing runs inline, which
+    is what the test profile uses.
+
+    Hashes are standard "$2b$" strings, so they stay interchangeable with
+    Flask-Bcrypt's. The pool is created lazily in each process, after
+    gunicorn has forked, and its workers come from a forkserver rather than
+    a fork of the (multi-threaded) web worker, so they never inherit locks
+    held by other request threads. If no answer comes within `timeout`
+    seconds, PasswordHashTimeout is raised.
+    """
+
+    def __init__(self, rounds=12, workers=0, timeout=None, handle_long_passwords=False):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self.handle_long_passwords = handle_long_passwords
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def _executor(self):
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        executor = self._executor()
+        if executor is None:
+            return fn(*args)
+        future = executor.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHashTimeout(
+                f"Password hashing took longer than {self.timeout}s"
+            ) from None
+
+    def _prepare(self, password):
+        if not password:
+            raise ValueError("Password must be non-empty.")
+        password = password.encode("utf-8")
+        if self.handle_long_passwords:
+            password = hashlib.sha256(password).hexdigest().encode("utf-8")
+        return password
+
+    def hash(self, password):
+        return self._run(_hash, self._prepare(password), self.rounds)
+
+    def check(self, pw_hash, password):
+        if not pw_hash or not password:
+            return False
+        return self._run(_check, self._prepare(password), pw_hash.encode("utf-8"))
+
+    def needs_rehash(self, pw_hash):
+        """True if `pw_hash` was made with a lower cost than the current one."""
+        cost = hash_cost(pw_hash)
+        return cost is not None and cost < self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def init_password_hasher(app):
+    """Gives each app its own hasher, configured from BCRYPT_* / PASSWORD_HASH_*."""
+    app.extensions["password_hasher"] = PasswordHasher(
+        rounds=app.config["BCRYPT_LOG_ROUNDS"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+        handle_long_passwords=app.config.get("BCRYPT_HANDLE_LONG_PASSWORDS", False),
+    )
+
+
+def password_hasher():
+    return current_app.extensions["password_hasher"]
+
+
+def hash_password(password):
+    return password_hasher().hash(password)
+
+
+def check_password(pw_hash, password):
+    return password_hasher().check(pw_hash, password)
@@ -0,0 +1,74 @@
+import threading
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models.product import Product
+from app.schemas import products_schema
+from app.services import cache_versions
+
+
+class ProductCatalog:
+    """
+    Per-worker snapshot of the whole product catalog: the serialized list,
+    its pre-encoded JSON body, and a SKU -> id index.
+
+    Freshness is checked against two CacheVersion counters, read with one
+    query: "products", which every product write bumps, and "stock", which
+    shipments bump as they reserve and release quantities. A product change
+    rebuilds the snapshot; a stock change only re-reads (id, quantity) and
+    patches the quantities, so orders don't throw the catalog away.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.stock_version = None
+        self.products = []
+        self.body = b"[]"
+        self.sku_index = {}
+        self.rebuilds = 0
+
+    def current(self):
+        version, stock_version = cache_versions.get_versions(
+            cache_versions.PRODUCTS, cache_versions.STOCK
+        )
+        if (version, stock_version) != (self.version, self.stock_version):
+            with self._lock:
+                # Another thread may have refreshed while we waited for the lock
+                if version != self.version:
+                    self._rebuild(version, stock_version)
+                elif stock_version != self.stock_version:
+                    self._refresh_stock(stock_version)
+        return self
+
+    def _rebuild(self, version, stock_version):
+        # The versions are read before the rows, so the snapshot is never
+        # older than the versions it is labelled with
+        products = products_schema.dump(Product.query.order_by(Product.id).all())
+        self.products = products
+        self.body = current_app.json.dumps(products).encode("utf-8")
+        self.sku_index = {p["sku"]: p["id"] for p in products}
+        self.version = version
+        self.stock_version = stock_version
+        self.rebuilds += 1
+
+    def _refresh_stock(self, stock_version):
+        quantities = dict(
+            db.session.execute(select(Product.id, Product.quantity)).all()
+        )
+        products = [
+            {**p, "quantity": quantities.get(p["id"], p["quantity"])}
+            for p in self.products
+        ]
+        self.products = products
+        self.body = current_app.json.dumps(products).encode("utf-8")
+        self.stock_version = stock_version
+
+
+def init_product_catalog(app):
+    app.extensions["product_catalog"] = ProductCatalog()
+
+
+def product_catalog():
+    """The current, freshness-checked catalog snapshot for this worker."""
+    return current_app.extensions["product_catalog"].current()
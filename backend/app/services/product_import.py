@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+from itertools import islice
+from marshmallow import EXCLUDE, ValidationError
+from app import db
+from app.models.product import Product
+from app.schemas import ProductSchema
+from app.services import cache_versions
+from app.utils.sql import dialect_insert
+
+# Validates rows into plain dicts: no Product instances, and columns other
+# than name/sku/quantity (including id) are ignored
+product_import_schema = ProductSchema(
+    many=True, load_instance=False, exclude=("id",), unknown=EXCLUDE
+)
+
+# Only the first few row errors are returned in full; the rest are counted
+MAX_ERROR_DETAILS = 100
+
+
+def iter_csv_rows(stream):
+    """(line_number, row) pairs from a binary CSV stream, read line by line."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for row in reader:
+        # Empty cells mean "not given", so optional fields fall back to defaults
+        yield reader.line_num, {k: v for k, v in row.items() if k and v != ""}
+
+
+def iter_ndjson_rows(stream):
+    """(line_number, row) pairs from a binary NDJSON stream, one object per line."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def _upsert(rows, update_quantity):
+    """One INSERT ... ON CONFLICT (sku) DO UPDATE for a list of rows."""
+    stmt = dialect_insert(Product).values(rows)
+    set_ = {"name": stmt.excluded.name}
+    if update_quantity:
+        set_["quantity"] = stmt.excluded.quantity
+    db.session.execute(stmt.on_conflict_do_update(index_elements=["sku"], set_=set_))
+
+
+def _import_batch(batch, report):
+    lines = [line for line, _ in batch]
+    rows = [row if isinstance(row, dict) else {} for _, row in batch]
+
+    try:
+        valid = product_import_schema.load(rows)
+        errors = {}
+    except ValidationError as e:
+        valid, errors = e.valid_data, e.messages
+    for index, (_, row) in enumerate(batch):
+        if row is None:
+            errors[index] = {"_schema": ["Invalid JSON."]}
+
+    # Later rows for the same SKU win
+    by_sku = {}
+    for index, row in enumerate(valid):
+        if index in errors:
+            continue
+        if row["sku"] in by_sku:
+            report["updated"] += 1
+        by_sku[row["sku"]] = row
+
+    for index in sorted(errors):
+        report["errors"] += 1
+        if len(report["error_details"]) < MAX_ERROR_DETAILS:
+            report["error_details"].append(
+                {"line": lines[index], "messages": errors[index]}
+            )
+
+    if not by_sku:
+        return
+
+    existing = {
+        sku
+        for (sku,) in db.session.query(Product.sku).filter(
+            Product.sku.in_(list(by_sku))
+        )
+    }
+    report["updated"] += len(existing)
+    report["inserted"] += len(by_sku) - len(existing)
+
+    # A missing quantity means 0 for a new product and "unchanged" for an
+    # existing one, which needs a different SET clause
+    with_quantity = [r for r in by_sku.values() if r.get("quantity") is not None]
+    without_quantity = [
+        {"name": r["name"], "sku": r["sku"], "quantity": 0}
+        for r in by_sku.values()
+        if r.get("quantity") is None
+    ]
+    if with_quantity:
+        _upsert(with_quantity, update_quantity=True)
+    if without_quantity:
+        _upsert(without_quantity, update_quantity=False)
+
+    cache_versions.bump(cache_versions.PRODUCTS)
+    db.session.commit()
+
+
+def import_products(rows, batch_size):
+    """
+    Upserts products by SKU from an iterator of (line_number, row) pairs.
+
+    Rows are consumed `batch_size` at a time, so the file is never fully in
+    memory; each batch is validated through ProductSchema, written with one
+    or two INSERT ... ON CONFLICT (sku) DO UPDATE statements and committed.
+    Returns counts of inserted/updated/invalid rows plus per-line errors.
+    """
+    report = {"inserted": 0, "updated": 0, "errors": 0, "error_details": []}
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        try:
+            _import_batch(batch, report)
+        except Exception:
+            db.session.rollback()
+            raise
+    return report
@@ -0,0 +1,61 @@
+from functools import lru_cache
+from sqlalchemy import and_, func, or_
+from app import db
+from app.models.product import Product
+from app.schemas import ProductSchema
+from app.utils.serializers import compile_serializer
+
+PRODUCT_FIELDS = ("id", "name", "sku", "quantity")
+
+
+def parse_fields(raw_fields):
+    """?fields=id,name,sku -> ("id", "name", "sku"), in canonical order."""
+    if not raw_fields:
+        return PRODUCT_FIELDS
+    requested = {f.strip() for f in raw_fields.split(",") if f.strip()}
+    unknown = requested - set(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown product fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    return tuple(f for f in PRODUCT_FIELDS if f in requested)
+
+
+@lru_cache(maxsize=None)
+def product_serializer(fields):
+    """Compiled ProductSchema limited to `fields`, built once per combination."""
+    return compile_serializer(ProductSchema(only=fields, many=True))
+
+
+def product_list_query(fields):
+    """
+    Selects only the requested columns (plus name and id, which the keyset
+    cursor needs) as plain rows.
+    """
+    columns = dict.fromkeys(("id", "name") + tuple(fields))
+    return db.session.query(*[getattr(Product, c) for c in columns])
+
+
+def _prefix_match(column, prefix):
+    """
+    Case-insensitive "starts with" that can use an index on lower(column):
+    the range bounds let the planner seek, and LIKE rechecks the exact rule.
+    """
+    lowered = func.lower(column)
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return and_(
+        lowered >= prefix,
+        lowered < upper_bound,
+        lowered.like(escaped + "%", escape="\\"),
+    )
+
+
+def search_products(query, q):
+    """Products whose name or SKU starts with `q` (case-insensitive)."""
+    prefix = q.strip().lower()
+    if not prefix:
+        return query
+    return query.filter(
+        or_(_prefix_match(Product.name, prefix), _prefix_match(Product.sku, prefix))
+    )
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy import insert, select, text
+from app import db
+from app.models.shipment_event import ShipmentEvent
+from app.schemas import shipment_events_schema
+
+CREATED = "created"
+# Shipment columns whose changes are logged
+TRACKED_FIELDS = ("status", "driver_id", "payment_status")
+
+
+def _as_text(value):
+    return None if value is None else str(value)
+
+
+class EventLog:
+    """
+    Events produced by one write, inserted together with a single batched
+    INSERT (executemany) in the caller's transaction.
+
+        log = EventLog(actor_id=user.id)
+        log.changed(shipment.id, {"status": "Pending"}, {"status": "In Transit"})
+        log.write()
+
+    Every event of one write shares the same occurred_at.
+    """
+
+    def __init__(self, actor_id=None, occurred_at=None):
+        self.actor_id = actor_id
+        self.occurred_at = occurred_at or datetime.utcnow()
+        self._rows = []
+
+    def _append(self, shipment_id, kind, old_value, new_value):
+        self._rows.append({
+            "shipment_id": shipment_id,
+            "occurred_at": self.occurred_at,
+            "kind": kind,
+            "old_value": _as_text(old_value),
+            "new_value": _as_text(new_value),
+            "actor_id": self.actor_id,
+        })
+
+    def created(self, shipment_id, status, driver_id=None):
+        self._append(shipment_id, CREATED, None, status)
+        if driver_id is not None:
+            self._append(shipment_id, "driver_id", None, driver_id)
+        return self
+
+    def changed(self, shipment_id, old, new):
+        """
+        Logs each TRACKED_FIELDS entry of `new` that differs from `old`
+        (both {field: value} dicts).
+        """
+        for field in TRACKED_FIELDS:
+            if field in new and new[field] != old.get(field):
+                self._append(shipment_id, field, old.get(field), new[field])
+        return self
+
+    def write(self):
+        """Inserts the collected events. Does not commit."""
+        if self._rows:
+            db.session.execute(insert(ShipmentEvent), self._rows)
+            self._rows = []
+
+
+def timelines(shipment_ids):
+    """
+    {shipment_id: [serialized events, oldest first]} for `shipment_ids`,
+    read with one range query on (shipment_id, occurred_at).
+    """
+    result = {shipment_id: [] for shipment_id in shipment_ids}
+    if not result:
+        return result
+    events = db.session.execute(
+        select(ShipmentEvent)
+        .where(ShipmentEvent.shipment_id.in_(list(result)))
+        .order_by(ShipmentEvent.shipment_id, ShipmentEvent.occurred_at, ShipmentEvent.id)
+    ).scalars().all()
+
+    grouped = defaultdict(list)
+    for event in events:
+        grouped[event.shipment_id].append(event)
+    for shipment_id, rows in grouped.items():
+        result[shipment_id] = shipment_events_schema.dump(rows)
+    return result
+
+
+def shipment_timeline(shipment_id):
+    return timelines([shipment_id])[shipment_id]
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_event_partitions(months_ahead=3, today=None):
+    """
+    PostgreSQL only: creates the monthly partitions of shipment_events from
+    the current month through `months_ahead` months ahead, if missing.
+    Returns the names of the partitions that were checked/created (empty on
+    other databases, where the table isn't partitioned). Does not commit.
+
+    Run it ahead of time (e.g. daily from cron): events for a month without
+    a partition go to the DEFAULT one, and that month can then no longer
+    be given its own partition without moving those rows first.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return []
+
+    first = (today or date.today()).replace(day=1)
+    names = []
+    for offset in range(months_ahead + 1):
+        start = _add_months(first, offset)
+        end = _add_months(start, 1)
+        name = f"shipment_events_{start:%Y_%m}"
+        db.session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF shipment_events "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        names.append(name)
+    return names
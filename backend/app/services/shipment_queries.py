@@ -0,0 +1,145 @@
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.orm import aliased
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipment_search import PG_SEARCH_DOCUMENT, SEARCH_COLUMNS
+from app.models.user import User
+
+
+def shipment_list_query():
+    """
+    Read-only query for shipment listings.
+
+    Selects just the columns ShipmentSchema emits, pulling the customer and
+    driver names through explicit outer joins instead of loading full User
+    rows and the (unused) shipment_items collection. Results are plain Row
+    tuples - no ORM identities are hydrated or tracked by the session.
+
+    Dump the rows with shipment_rows_schema; the output is the same as
+    shipments_schema would give for the equivalent Shipment objects.
+    """
+    customer = aliased(User, name="customer")
+    driver = aliased(User, name="driver")
+
+    return (
+        db.session.query(
+            Shipment.id,
+            Shipment.tracking_number,
+            Shipment.status,
+            Shipment.origin,
+            Shipment.destination,
+            Shipment.payment_status,
+            Shipment.customer_id,
+            Shipment.driver_id,
+            Shipment.created_at,
+            func.coalesce(customer.username, "Unknown Customer").label(
+                "customer_name"
+            ),
+            customer.email.label("customerEmail"),
+            driver.username.label("driverName"),
+        )
+        .outerjoin(customer, customer.id == Shipment.customer_id)
+        .outerjoin(driver, driver.id == Shipment.driver_id)
+    )
+
+
+# ?sort= value -> newest first?
+SORT_OPTIONS = {"-created_at": True, "created_at": False}
+
+
+def parse_sort(raw_sort):
+    """Returns True for newest-first (the default), False for oldest-first."""
+    if raw_sort in (None, ""):
+        return True
+    if raw_sort not in SORT_OPTIONS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_OPTIONS)}")
+    return SORT_OPTIONS[raw_sort]
+
+
+def _parse_datetime(raw, name):
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or datetime")
+
+
+def search_condition(q):
+    """
+    Prefix match of every word in `q` against destination, recipient, notes
+    and tracking_number, through the dialect's full-text index (see
+    models/shipment_search.py). Returns None when `q` has no searchable words.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsquery = " & ".join(f"{word}:*" for word in words)
+        return text(
+            f"{PG_SEARCH_DOCUMENT} @@ to_tsquery('simple', :search_q)"
+        ).bindparams(search_q=tsquery)
+    if dialect == "sqlite":
+        match = " ".join(f'"{word}"*' for word in words)
+        return Shipment.id.in_(
+            text("SELECT rowid FROM shipments_fts WHERE shipments_fts MATCH :search_q")
+            .bindparams(search_q=match)
+            .columns(rowid=db.Integer)
+        )
+
+    # No text index on this backend; fall back to a plain scan
+    return and_(*[
+        or_(*[getattr(Shipment, c).ilike(f"%{word}%") for c in SEARCH_COLUMNS])
+        for word in words
+    ])
+
+
+def filter_shipments(query, args):
+    """
+    Applies the list filters from the request query string, all in SQL:
+
+        status, payment_status   exact match, comma separated for several
+        driver_id                a driver's id, or "none" for unassigned
+        created_from, created_to ISO date/datetime bounds (a bare created_to
+                                 date includes that whole day)
+        q                        full-text search (see search_condition)
+
+    Raises ValueError on malformed values.
+    """
+    if args.get("status"):
+        query = query.filter(Shipment.status.in_(args["status"].split(",")))
+
+    if args.get("payment_status"):
+        query = query.filter(
+            Shipment.payment_status.in_(args["payment_status"].split(","))
+        )
+
+    if args.get("driver_id"):
+        if args["driver_id"].lower() == "none":
+            query = query.filter(Shipment.driver_id.is_(None))
+        else:
+            try:
+                driver_id = int(args["driver_id"])
+            except ValueError:
+                raise ValueError("driver_id must be an integer or 'none'")
+            query = query.filter(Shipment.driver_id == driver_id)
+
+    if args.get("created_from"):
+        created_from = _parse_datetime(args["created_from"], "created_from")
+        query = query.filter(Shipment.created_at >= created_from)
+
+    if args.get("created_to"):
+        created_to = _parse_datetime(args["created_to"], "created_to")
+        if len(args["created_to"]) == 10:
+            query = query.filter(Shipment.created_at < created_to + timedelta(days=1))
+        else:
+            query = query.filter(Shipment.created_at <= created_to)
+
+    if args.get("q"):
+        condition = search_condition(args["q"])
+        if condition is not None:
+            query = query.filter(condition)
+
+    return query
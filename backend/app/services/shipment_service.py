@@ -1,55 +1,284 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import selectinload
 from app import db
 from app.models.shipment import Shipment
 from app.models.shipment_item import ShipmentItem
+from app.services import cache_versions
+from app.services.inventory import (
+    apply_status_stock,
+    reserve_stock,
+    reserve_stock_per_row,
+)
+from app.services.shipment_stats import StatsDelta
+from app.services.shipment_events import EventLog
+from app.services.tracking_numbers import allocate_tracking_numbers, next_tracking_number
 from datetime import datetime
-import uuid
 
 
 def create_shipment_logic(data, user_id):
     """
-    Handles creating a shipment and its associated items (products).
-    Expects data to look like:
+    Creates a shipment and its items in one transaction.
+    Expects validated ShipmentCreateSchema output, e.g.:
     {
+        "origin": "Nairobi",
         "destination": "Mombasa",
+        "recipient": "Jane",
+        "weight": 2.5,
         "items": [
             {"product_id": 1, "quantity": 50},
             {"product_id": 2, "quantity": 10}
         ]
     }
+    The shipment belongs to data["customer_id"] if given, otherwise to
+    `user_id`. Raises InsufficientStock if the items can't be reserved.
+    Returns the committed shipment with its items already loaded.
     """
+    items = data.get("items", [])
     try:
-        # 1. Create the Shipment record
-        tracking_number = str(uuid.uuid4())[
-            :8
-        ].upper()  # Generate unique tracking number
+        # 1. Create the Shipment record. The tracking number is taken before
+        # any write, since reserving a new block may need its own transaction.
         new_shipment = Shipment(
-            tracking_number=tracking_number,
-            origin=data.get("origin", "Nairobi"),  # Default origin
-            destination=data.get("destination"),
+            tracking_number=next_tracking_number(),
+            origin=data["origin"],
+            destination=data["destination"],
+            recipient=data["recipient"],
+            weight=data["weight"],
             status="Pending",
             payment_status="Unpaid",
-            user_id=user_id,
+            notes=data.get("notes"),
+            customer_id=data.get("customer_id", user_id),
+            driver_id=data.get("driver_id"),  # Optional: Admin might assign later
             created_at=datetime.utcnow(),
         )
 
-        # Add to session to get the ID 
+        # 2. Take the items out of stock (raises InsufficientStock)
+        reserve_stock(items)
+
+        # Add to session to get the ID
         db.session.add(new_shipment)
         db.session.flush()
 
-        # 2. Loop through items and add to the Join Table (ShipmentItem)
-        if "items" in data:
-            for item in data["items"]:
-                link = ShipmentItem(
-                    shipment_id=new_shipment.id,
-                    product_id=item["product_id"],
-                    quantity=item["quantity"],  # <-- The User Submittable Attribute
-                )
-                db.session.add(link)
-
-        # 3. Commit everything at once (Transaction)
+        # 3. Write every item into the join table with one batched INSERT
+        if items:
+            db.session.execute(
+                insert(ShipmentItem),
+                [
+                    {
+                        "shipment_id": new_shipment.id,
+                        "product_id": item["product_id"],
+                        "quantity": item["quantity"],
+                    }
+                    for item in items
+                ],
+            )
+
+        # 4. Log it, count it in the dashboard stats, then commit everything
+        EventLog(actor_id=user_id, occurred_at=new_shipment.created_at).created(
+            new_shipment.id, new_shipment.status, new_shipment.driver_id
+        ).write()
+        StatsDelta().add(
+            new_shipment.status, new_shipment.payment_status, new_shipment.weight
+        ).apply()
+        cache_versions.bump(
+            *cache_versions.shipment_scopes(
+                new_shipment.customer_id, new_shipment.driver_id
+            )
+        )
         db.session.commit()
-        return new_shipment
 
     except Exception as e:
         db.session.rollback()  # Undo changes if anything fails
         raise e
+
+    # Read the shipment back with its items in one extra SELECT
+    return db.session.get(
+        Shipment,
+        new_shipment.id,
+        options=[selectinload(Shipment.shipment_items)],
+        populate_existing=True,
+    )
+
+
+def bulk_insert_shipments(rows, default_customer_id):
+    """
+    Inserts already-validated shipment rows (ShipmentCreateSchema output) in
+    a single executemany / insertmanyvalues INSERT.
+
+    Stock for each row's items is reserved first, row by row: a row whose
+    items can't be covered is left out and reported instead of failing the
+    batch. Returns (created, values, shortfalls): the new
+    [(id, tracking_number)] rows and the inserted values, both in input
+    order without the skipped rows, and {index in `rows`: InsufficientStock}.
+    Does not commit; the caller owns the transaction.
+    """
+    now = datetime.utcnow()
+    # Tracking numbers are taken before any write, since reserving a new
+    # block may need its own transaction (which would wait on ours on
+    # SQLite). Numbers of rows skipped below are simply never used.
+    tracking_numbers = allocate_tracking_numbers(
+        sum(1 for row in rows if not row.get("tracking_number"))
+    )
+
+    shortfalls = reserve_stock_per_row([row.get("items", []) for row in rows])
+    rows = [row for i, row in enumerate(rows) if i not in shortfalls]
+
+    values = []
+    for row in rows:
+        values.append({
+            "tracking_number": row.get("tracking_number") or tracking_numbers.pop(),
+            "origin": row["origin"],
+            "destination": row["destination"],
+            "recipient": row["recipient"],
+            "weight": row["weight"],
+            "status": "Pending",
+            "payment_status": "Unpaid",
+            "notes": row.get("notes"),
+            "customer_id": row.get("customer_id", default_customer_id),
+            "driver_id": row.get("driver_id"),
+            "created_at": now,
+        })
+
+    if not values:
+        return [], values, shortfalls
+
+    created = db.session.execute(
+        insert(Shipment).returning(
+            Shipment.id, Shipment.tracking_number, sort_by_parameter_order=True
+        ),
+        values,
+    ).all()
+
+    # Items of every row are inserted with one more batched INSERT
+    item_values = [
+        {"shipment_id": shipment_id, **item}
+        for (shipment_id, _), row in zip(created, rows)
+        for item in row.get("items", [])
+    ]
+    if item_values:
+        db.session.execute(insert(ShipmentItem), item_values)
+
+    delta = StatsDelta()
+    log = EventLog(actor_id=default_customer_id, occurred_at=now)
+    for (shipment_id, _), row in zip(created, values):
+        delta.add(row["status"], row["payment_status"], row["weight"])
+        log.created(shipment_id, row["status"], row["driver_id"])
+    delta.apply()
+    log.write()
+
+    return created, values, shortfalls
+
+
+# Which columns each role may change through the update routes:
+# admins can assign drivers and update payment, drivers can only update status.
+EDITABLE_FIELDS = {
+    "admin": ("driver_id", "status", "payment_status"),
+    "driver": ("status",),
+}
+
+PAYMENT_PENDING_ERROR = "Cannot mark as Delivered. Payment is pending."
+DELIVERED_CANCEL_ERROR = "Cannot cancel a Delivered shipment."
+
+
+def editable_changes(role, data):
+    """The subset of `data` that `role` is allowed to write."""
+    allowed = EDITABLE_FIELDS.get(role, ())
+    return {field: data[field] for field in allowed if field in data}
+
+
+def bulk_update_shipments(shipment_ids, requested_status, changes, actor_id=None):
+    """
+    Applies `changes` to every shipment in `shipment_ids` with one UPDATE.
+
+    `requested_status` is the status the caller asked for (even if their role
+    may not set it) so the No Pay, No Delivery rule, and the refusal to
+    cancel a Delivered shipment, are enforced exactly as in update_shipment.
+    Both are checked up front for a useful error message and again in the
+    UPDATE's WHERE clause, so a concurrent change can't slip through.
+
+    Returns (updated, rejected, before): the UPDATE's RETURNING rows, a
+    {id: reason} dict, and the pre-update rows for the requested ids.
+    Cancelling releases the shipments' stock and reinstating reserves it
+    again (raises InsufficientStock). The dashboard stats are adjusted and
+    the changes logged as shipment events (by `actor_id`). Does not commit.
+    """
+    # Locked (on PostgreSQL) so the stats delta is computed from the values
+    # the UPDATE actually replaces
+    before = {
+        row.id: row
+        for row in db.session.query(
+            Shipment.id,
+            Shipment.customer_id,
+            Shipment.driver_id,
+            Shipment.tracking_number,
+            Shipment.status,
+            Shipment.payment_status,
+            Shipment.weight,
+        )
+        .filter(Shipment.id.in_(shipment_ids))
+        .with_for_update()
+    }
+
+    rejected = {}
+    candidates = []
+    for shipment_id in dict.fromkeys(shipment_ids):
+        row = before.get(shipment_id)
+        if row is None:
+            rejected[shipment_id] = "Shipment not found"
+        elif requested_status == "Delivered" and row.payment_status != "Paid":
+            rejected[shipment_id] = PAYMENT_PENDING_ERROR
+        elif requested_status == "Cancelled" and row.status == "Delivered":
+            rejected[shipment_id] = DELIVERED_CANCEL_ERROR
+        else:
+            candidates.append(shipment_id)
+
+    if not candidates:
+        return [], rejected, before
+
+    stmt = update(Shipment).where(Shipment.id.in_(candidates))
+    if requested_status == "Delivered":
+        stmt = stmt.where(Shipment.payment_status == "Paid")
+    elif requested_status == "Cancelled":
+        stmt = stmt.where(Shipment.status != "Delivered")
+
+    # Release or re-reserve stock for rows entering or leaving Cancelled
+    # (may raise InsufficientStock)
+    apply_status_stock(stmt.whereclause, changes.get("status"))
+
+    if changes:
+        updated = db.session.execute(
+            stmt.values(**changes).returning(Shipment.id, Shipment.driver_id),
+            execution_options={"synchronize_session": False},
+        ).all()
+    else:
+        # Nothing this role may change; the request still "succeeds" for
+        # every row that passed the checks, as update_shipment does
+        updated = db.session.execute(
+            select(Shipment.id, Shipment.driver_id).where(stmt.whereclause)
+        ).all()
+
+    updated_ids = {row.id for row in updated}
+    for shipment_id in candidates:
+        if shipment_id not in updated_ids:
+            rejected[shipment_id] = (
+                DELIVERED_CANCEL_ERROR
+                if requested_status == "Cancelled"
+                else PAYMENT_PENDING_ERROR
+            )
+
+    delta = StatsDelta()
+    log = EventLog(actor_id=actor_id)
+    for shipment_id in sorted(updated_ids):
+        old = before[shipment_id]
+        log.changed(shipment_id, old._asdict(), changes)
+        delta.move(
+            (old.status, old.payment_status, old.weight),
+            (
+                changes.get("status", old.status),
+                changes.get("payment_status", old.payment_status),
+                old.weight,
+            ),
+        )
+    delta.apply()
+    log.write()
+
+    return updated, rejected, before
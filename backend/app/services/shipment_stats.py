@@ -0,0 +1,122 @@
+from collections import defaultdict
+from sqlalchemy import delete, func, insert, select, text
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipment_stat import ShipmentStat
+from app.utils.sql import dialect_insert
+
+STATUSES = ("Pending", "In Transit", "Delivered", "Cancelled")
+
+
+class StatsDelta:
+    """
+    Changes to the shipment_stats buckets made by one write, collected in
+    memory and applied with a single executemany upsert.
+
+        delta = StatsDelta()
+        delta.move(("Pending", "Unpaid", 2.5), ("In Transit", "Unpaid", 2.5))
+        delta.apply()
+    """
+
+    def __init__(self):
+        self._buckets = defaultdict(lambda: [0, 0.0])
+
+    def add(self, status, payment_status, weight, count=1):
+        bucket = self._buckets[(status, payment_status)]
+        bucket[0] += count
+        bucket[1] += count * (weight or 0.0)
+        return self
+
+    def remove(self, status, payment_status, weight):
+        return self.add(status, payment_status, weight, count=-1)
+
+    def move(self, old, new):
+        """old/new are (status, payment_status, weight) of the same shipment."""
+        if old != new:
+            self.remove(*old)
+            self.add(*new)
+        return self
+
+    def apply(self):
+        """
+        Adds the deltas to shipment_stats inside the current transaction.
+        Buckets are written in key order, so concurrent writers lock the
+        rows the same way. Does not commit.
+        """
+        rows = [
+            {
+                "status": status,
+                "payment_status": payment_status,
+                "shipments": count,
+                "weight": weight,
+            }
+            for (status, payment_status), (count, weight) in sorted(self._buckets.items())
+            if count or weight
+        ]
+        self._buckets.clear()
+        if not rows:
+            return
+
+        stmt = dialect_insert(ShipmentStat)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ShipmentStat.status, ShipmentStat.payment_status],
+            set_={
+                "shipments": ShipmentStat.shipments + stmt.excluded.shipments,
+                "weight": ShipmentStat.weight + stmt.excluded.weight,
+            },
+        )
+        db.session.execute(stmt, rows)
+
+
+def get_stats():
+    """
+    Dashboard totals from the shipment_stats rows (one per bucket, so the
+    cost doesn't depend on the number of shipments).
+    """
+    rows = db.session.execute(select(ShipmentStat)).scalars().all()
+
+    def empty():
+        return {"shipments": 0, "weight": 0.0}
+
+    total = empty()
+    by_status = {status: empty() for status in STATUSES}
+    by_payment_status = defaultdict(empty)
+    for row in rows:
+        for group in (total, by_status.setdefault(row.status, empty()),
+                      by_payment_status[row.payment_status]):
+            group["shipments"] += row.shipments
+            group["weight"] += row.weight
+
+    for group in (total, *by_status.values(), *by_payment_status.values()):
+        group["weight"] = round(group["weight"], 3)
+    return {
+        "total": total,
+        "by_status": by_status,
+        "by_payment_status": dict(by_payment_status),
+    }
+
+
+def rebuild_stats():
+    """
+    Recomputes shipment_stats with one GROUP BY over shipments, replacing
+    the current rows. On PostgreSQL the table is locked first, so writers
+    that already applied a delta commit before the aggregate runs and
+    writers that come later wait and apply theirs on top. Does not commit.
+    Returns the number of buckets written.
+    """
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("LOCK TABLE shipment_stats IN EXCLUSIVE MODE"))
+
+    db.session.execute(delete(ShipmentStat))
+    aggregate = select(
+        Shipment.status,
+        Shipment.payment_status,
+        func.count(),
+        func.coalesce(func.sum(Shipment.weight), 0),
+    ).group_by(Shipment.status, Shipment.payment_status)
+    result = db.session.execute(
+        insert(ShipmentStat).from_select(
+            ["status", "payment_status", "shipments", "weight"], aggregate
+        )
+    )
+    return result.rowcount
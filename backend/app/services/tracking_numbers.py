@@ -0,0 +1,152 @@
+import os
+import threading
+from flask import current_app
+from app import db
+from app.models.sequence_counter import (
+    SequenceCounter,
+    TRACKING_BLOCK_SIZE,
+    tracking_number_seq,
+)
+from app.utils.sql import dialect_insert
+
+# Tracking numbers are 8 characters of Crockford base32 (no I, L, O, U):
+#
+#   [G-Z] [6 x base32] [check]
+#
+# The 34-bit payload is a scrambled sequence value, so numbers are unique by
+# construction and don't reveal order volume. The first character is always
+# one of the upper 16 letters (G..Z), which never appear in the legacy
+# uuid4-hex numbers, so new numbers can't collide with old ones either.
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+BASE = len(ALPHABET)
+PAYLOAD_BITS = 34
+CAPACITY = 1 << PAYLOAD_BITS
+_MASK = CAPACITY - 1
+_INDEX = {char: index for index, char in enumerate(ALPHABET)}
+
+COUNTER_NAME = "tracking_number"
+
+
+def _scramble(value):
+    """A fixed bijection on 34-bit integers (xorshift / odd multiply rounds)."""
+    value ^= value >> 17
+    value = (value * 0x2545F491) & _MASK
+    value ^= value >> 15
+    value = (value * 0x1B873593) & _MASK
+    value ^= value >> 16
+    return value
+
+
+def _check_char(payload):
+    """
+    Luhn mod 32 check character: catches every single-character typo and
+    nearly every swap of two adjacent characters.
+    """
+    total = 0
+    factor = 2
+    for char in reversed(payload):
+        addend = factor * _INDEX[char]
+        total += addend // BASE + addend % BASE
+        factor = 1 if factor == 2 else 2
+    return ALPHABET[(BASE - total % BASE) % BASE]
+
+
+def encode_tracking_number(value):
+    """The tracking number for sequence value `value` (0 <= value < CAPACITY)."""
+    if not 0 <= value < CAPACITY:
+        raise ValueError("Tracking number space exhausted")
+    value = _scramble(value)
+
+    chars = []
+    for _ in range(6):
+        value, digit = divmod(value, BASE)
+        chars.append(ALPHABET[digit])
+    # The remaining 4 bits pick the lead letter from G..Z
+    chars.append(ALPHABET[16 + value])
+    payload = "".join(reversed(chars))
+    return payload + _check_char(payload)
+
+
+def is_generated_tracking_number(number):
+    """True if `number` has the allocator's format and a valid check character."""
+    number = number.strip().upper()
+    if len(number) != 8 or number[0] not in ALPHABET[16:]:
+        return False
+    if any(char not in _INDEX for char in number):
+        return False
+    return _check_char(number[:-1]) == number[-1]
+
+
+def _reserve_block():
+    """
+    Reserves the next block of sequence values, returned as range(start, stop).
+
+    PostgreSQL: one nextval() on tracking_number_seq. Elsewhere: the
+    sequence_counters row is advanced on its own connection and committed
+    immediately, so the block stays reserved whatever happens to the
+    caller's transaction.
+    """
+    if db.engine.dialect.name == "postgresql":
+        start = db.session.execute(tracking_number_seq.next_value()).scalar_one()
+        return range(start, start + TRACKING_BLOCK_SIZE)
+
+    stmt = dialect_insert(SequenceCounter).values(
+        name=COUNTER_NAME, value=TRACKING_BLOCK_SIZE
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SequenceCounter.name],
+        set_={"value": SequenceCounter.value + TRACKING_BLOCK_SIZE},
+    ).returning(SequenceCounter.value)
+    with db.engine.begin() as connection:
+        end = connection.execute(stmt).scalar_one()
+    return range(end - TRACKING_BLOCK_SIZE + 1, end + 1)
+
+
+class TrackingNumberAllocator:
+    """
+    Per-worker source of tracking numbers.
+
+    Numbers come out of a block reserved from the database, so a worker only
+    touches the database once per TRACKING_BLOCK_SIZE shipments, and two
+    workers can never be handed the same value - no uniqueness check or
+    retry loop is needed. Values left in a block when a worker exits are
+    simply never used.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._block = iter(())
+        self._pid = None
+        self.blocks_reserved = 0
+
+    def allocate(self, count=1):
+        numbers = []
+        with self._lock:
+            # A block inherited through fork() (gunicorn --preload) is also
+            # held by the parent and its other children: start a fresh one
+            if self._pid != os.getpid():
+                self._block = iter(())
+                self._pid = os.getpid()
+
+            while len(numbers) < count:
+                value = next(self._block, None)
+                if value is None:
+                    self._block = iter(_reserve_block())
+                    self.blocks_reserved += 1
+                    continue
+                numbers.append(encode_tracking_number(value))
+        return numbers
+
+
+def init_tracking_numbers(app):
+    """Gives each app its own tracking number allocator."""
+    app.extensions["tracking_numbers"] = TrackingNumberAllocator()
+
+
+def allocate_tracking_numbers(count):
+    """`count` new, never-used tracking numbers."""
+    return current_app.extensions["tracking_numbers"].allocate(count)
+
+
+def next_tracking_number():
+    return allocate_tracking_numbers(1)[0]
@@ -0,0 +1,92 @@
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from app.models.shipment import Shipment
+from app.schemas import shipment_schema
+from app.services.shipment_events import shipment_timeline, timelines
+from app.utils.cache import TTLCache
+
+
+def init_tracking_cache(app):
+    """Gives each app its own tracking cache, sized from config."""
+    app.extensions["tracking_cache"] = TTLCache(
+        maxsize=app.config["TRACKING_CACHE_SIZE"],
+        ttl=app.config["TRACKING_CACHE_TTL"],
+        negative_ttl=app.config["TRACKING_CACHE_NEGATIVE_TTL"],
+    )
+
+
+def tracking_cache():
+    return current_app.extensions["tracking_cache"]
+
+
+def _normalize(tracking_number):
+    return tracking_number.strip().upper()
+
+
+def lookup_tracking(tracking_number):
+    """
+    Serialized shipment and its event timeline for a public tracking lookup.
+    Returns None if there is no such tracking number. Answers, including
+    "not found", are cached per worker process, so a change made through
+    another worker shows up within TRACKING_CACHE_TTL seconds.
+    """
+    key = _normalize(tracking_number)
+
+    def load():
+        shipment = (
+            Shipment.query.options(selectinload(Shipment.shipment_items))
+            .filter_by(tracking_number=key)
+            .first()
+        )
+        if not shipment:
+            return None
+        data = shipment_schema.dump(shipment)
+        data["timeline"] = shipment_timeline(shipment.id)
+        return data
+
+    return tracking_cache().get_or_load(key, load)
+
+
+def lookup_tracking_many(tracking_numbers):
+    """
+    {normalized tracking number: serialized shipment or None} for a batch.
+    Cached answers are used as-is; all remaining numbers are resolved with a
+    single IN (...) query on the unique tracking_number index, and the
+    results (including misses) are written back to the cache.
+    """
+    cache = tracking_cache()
+    results = {}
+    missing = []
+    for key in dict.fromkeys(_normalize(t) for t in tracking_numbers):
+        found, value = cache.peek(key)
+        if found:
+            results[key] = value
+        else:
+            missing.append(key)
+
+    if missing:
+        shipments = (
+            Shipment.query.options(selectinload(Shipment.shipment_items))
+            .filter(Shipment.tracking_number.in_(missing))
+            .all()
+        )
+        loaded = {s.tracking_number: s for s in shipments}
+        events = timelines([s.id for s in shipments])
+        for key in missing:
+            shipment = loaded.get(key)
+            if shipment:
+                results[key] = shipment_schema.dump(shipment)
+                results[key]["timeline"] = events[shipment.id]
+            else:
+                results[key] = None
+            cache.put(key, results[key])
+
+    return results
+
+
+def invalidate_tracking(*tracking_numbers):
+    """Drops cached answers after a shipment is created, changed or deleted."""
+    cache = tracking_cache()
+    for tracking_number in tracking_numbers:
+        if tracking_number:
+            cache.invalidate(_normalize(tracking_number))
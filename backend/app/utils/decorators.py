@@ -1,6 +1,9 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.utils.identity import load_identity
+
+STALE_TOKEN_ERROR = "Session expired. Please log in again."
 
 
 def login_required(f):
@@ -11,6 +14,9 @@ def login_required(f):
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
+        # Role and id come from the verified token claims (see utils/identity.py)
+        if load_identity() is None:
+            return jsonify({"error": STALE_TOKEN_ERROR}), 401
         return f(*args, **kwargs)
 
     return decorated_function
@@ -26,16 +32,13 @@ def role_required(required_roles):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user = get_jwt_identity()
-
-            # Ensure current_user is a dictionary (depends on how you create the token)
-            # If your token only stores ID, you might need to query the DB here.
-            # Assuming token payload is: {"id": 1, "role": "admin"}
-            user_role = (
-                current_user.get("role") if isinstance(current_user, dict) else None
-            )
+            # Token payload is {"id": 1, "role": "admin"}, trusted while its
+            # role-version claim is fresh (see utils/identity.py)
+            identity = load_identity()
+            if identity is None:
+                return jsonify({"error": STALE_TOKEN_ERROR}), 401
 
-            if user_role not in required_roles:
+            if identity.role not in required_roles:
                 return jsonify({"error": "Access denied."}), 403
 
             return f(*args, **kwargs)
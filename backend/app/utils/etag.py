@@ -0,0 +1,53 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from app.services.cache_versions import get_version, get_versions
+
+
+def list_etag(scope):
+    """
+    Weak ETag for a list view: the scope's version plus the query string,
+    so each page/filter combination gets its own validator. `scope` may
+    also be a tuple of scopes, whose versions are all included.
+    """
+    query = hashlib.sha1(request.query_string).hexdigest()[:12]
+    if isinstance(scope, tuple):
+        versions = ".".join(str(v) for v in get_versions(*scope))
+        return f"{'+'.join(scope)}:{versions}:{query}"
+    return f"{scope}:{get_version(scope)}:{query}"
+
+
+def conditional(scope_for_request):
+    """
+    Decorator for list routes backed by a CacheVersion scope.
+
+    `scope_for_request(*args, **kwargs)` returns the scope (or tuple of
+    scopes) the current caller sees, or None to skip caching (e.g. on an
+    auth failure). If the client's If-None-Match still matches, a 304 is
+    returned before the view - and so the list query and serializer - ever
+    runs.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            scope = scope_for_request(*args, **kwargs)
+            if scope is None:
+                return f(*args, **kwargs)
+
+            etag = list_etag(scope)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                # Let the browser keep the body but always revalidate it
+                response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,85 @@
+import time
+from dataclasses import dataclass
+from flask import current_app, g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import select
+from app import db
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+# JWT claim carrying the user's role_version when the token was issued
+ROLE_VERSION_CLAIM = "rv"
+
+
+@dataclass(frozen=True)
+class Identity:
+    """The authenticated caller, as read from verified JWT claims."""
+
+    id: int
+    role: str
+
+
+def token_claims(user):
+    """identity + additional_claims for create_access_token/create_refresh_token."""
+    return {
+        "identity": {"id": user.id, "role": user.role},
+        "additional_claims": {ROLE_VERSION_CLAIM: user.role_version},
+    }
+
+
+def init_identity(app):
+    """Per-worker cache of (role, role_version) for tokens past ROLE_CLAIM_TTL."""
+    app.extensions["role_versions"] = TTLCache(
+        maxsize=app.config["ROLE_CACHE_SIZE"],
+        ttl=app.config["ROLE_CACHE_TTL"],
+        negative_ttl=app.config["ROLE_CACHE_TTL"],
+    )
+
+
+def role_cache():
+    return current_app.extensions["role_versions"]
+
+
+def _stored_role(user_id):
+    def load():
+        row = db.session.execute(
+            select(User.role, User.role_version).where(User.id == user_id)
+        ).first()
+        return tuple(row) if row else None
+
+    return role_cache().get_or_load(user_id, load)
+
+
+def load_identity():
+    """
+    Builds g.identity from the verified JWT (call after jwt_required).
+
+    The role in a token is trusted as-is for ROLE_CLAIM_TTL seconds after it
+    was issued, so ordinary requests never touch the users table. Older
+    tokens are checked against the user's role and role_version (one
+    primary-key lookup, cached per worker for ROLE_CACHE_TTL; User.set_role
+    drops the entry in its own worker). Returns None if the user is gone or
+    their role changed since the token was issued.
+    """
+    claims = get_jwt()
+    subject = get_jwt_identity()
+    if not isinstance(subject, dict) or subject.get("id") is None:
+        return None
+    identity = Identity(id=subject["id"], role=subject.get("role"))
+
+    issued_at = claims.get("iat", 0)
+    if time.time() - issued_at > current_app.config["ROLE_CLAIM_TTL"]:
+        stored = _stored_role(identity.id)
+        if stored != (identity.role, claims.get(ROLE_VERSION_CLAIM, 0)):
+            return None
+
+    g.identity = identity
+    return identity
+
+
+def current_identity():
+    """The Identity loaded for this request by login_required/role_required."""
+    identity = g.get("identity")
+    if identity is None:
+        identity = load_identity()
+    return identity
@@ -0,0 +1,105 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at, row_id):
+    """Packs the (created_at, id) keyset of the last row into an opaque token."""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Unpacks a token made by encode_cursor.
+    Raises ValueError if the token was tampered with or is malformed.
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_limit(raw_limit):
+    """Clamps the ?limit= query value to the configured page size bounds."""
+    default = current_app.config["PAGE_SIZE_DEFAULT"]
+    maximum = current_app.config["PAGE_SIZE_MAX"]
+
+    if raw_limit in (None, ""):
+        return default
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, maximum)
+
+
+def keyset_paginate(query, created_col, id_col, limit, cursor=None, descending=True):
+    """
+    Returns one page of `query` plus the cursor for the next page.
+
+    Ordering is on (created_at, id) - newest first unless descending=False -
+    so ties on the timestamp are still stable, and the WHERE clause seeks
+    straight to the cursor position instead of using OFFSET, so the cost of
+    a page does not grow with the table.
+    """
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        position = tuple_(created_col, id_col)
+        if descending:
+            query = query.filter(position < (created_at, row_id))
+        else:
+            query = query.filter(position > (created_at, row_id))
+
+    # Fetch one extra row so we know whether another page exists
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
+
+
+def seek_paginate(query, columns, limit, cursor=None):
+    """
+    Ascending keyset pagination over `columns` (the last one must be unique,
+    e.g. (Product.name, Product.id)). Column values must be JSON-native,
+    since they are carried in the cursor as-is.
+    """
+    query = query.order_by(*[c.asc() for c in columns])
+
+    if cursor:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        query = query.filter(tuple_(*columns) > tuple(values))
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        payload = json.dumps([getattr(last, c.key) for c in columns])
+        next_cursor = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    return rows, next_cursor
@@ -0,0 +1,15 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+
+def dialect_insert(model):
+    """
+    An INSERT for `model` that supports .on_conflict_do_update() /
+    .on_conflict_do_nothing() on the current database (PostgreSQL or SQLite).
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"No upsert for dialect {dialect!r}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: POST /api/admin/dispatch on a large morning backlog.
+
+Usage:
+    python benchmarks/dispatch.py
+    python benchmarks/dispatch.py --shipments 10000 --drivers 200 --destinations 300
+
+Seeds a temporary SQLite database with unassigned Pending shipments spread
+over `--destinations` towns and `--drivers` drivers, then times planning
+alone and the whole dispatch (load, plan, executemany UPDATE, commit).
+Exits non-zero if either takes longer than --max-plan-ms / --max-dispatch-ms
+(a per-(shipment, driver) loop would take seconds at the default size).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.models.shipment import Shipment  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.dispatch import dispatch_pending, plan_assignments  # noqa: E402
+
+
+def seed(shipments, drivers, destinations):
+    rng = random.Random(42)
+    customer = User(username="customer", email="customer@example.com", role="customer")
+    customer.password_hash = "x"
+    db.session.add(customer)
+    db.session.flush()
+    db.session.execute(
+        insert(User),
+        [
+            {
+                "username": f"driver{i}",
+                "email": f"driver{i}@example.com",
+                "password_hash": "x",
+                "role": "driver",
+            }
+            for i in range(drivers)
+        ],
+    )
+    db.session.execute(
+        insert(Shipment),
+        [
+            {
+                "tracking_number": f"BENCH{i:06d}",
+                "origin": "Nairobi",
+                "destination": f"Town {rng.randrange(destinations)}",
+                "weight": round(rng.uniform(0.5, 40), 1),
+                "customer_id": customer.id,
+            }
+            for i in range(shipments)
+        ],
+    )
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shipments", type=int, default=10000)
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--destinations", type=int, default=300)
+    parser.add_argument("--capacity", type=float, default=1500)
+    parser.add_argument("--max-plan-ms", type=float, default=250)
+    parser.add_argument("--max-dispatch-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            seed(args.shipments, args.drivers, args.destinations)
+
+            rows = [
+                (s.id, s.destination, s.weight)
+                for s in db.session.query(Shipment.id, Shipment.destination, Shipment.weight)
+            ]
+            drivers = [(u.id, 0.0) for u in User.query.filter_by(role="driver")]
+            started = time.perf_counter()
+            plan_assignments(rows, drivers, args.capacity)
+            plan_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            summary, _ = dispatch_pending(args.capacity)
+            db.session.commit()
+            total_ms = (time.perf_counter() - started) * 1000
+            db.engine.dispose()
+
+    print(f"{args.shipments} shipments x {args.drivers} drivers, {args.destinations} destinations")
+    print(f"plan only:      {plan_ms:8.1f} ms")
+    print(f"full dispatch:  {total_ms:8.1f} ms")
+    print(f"assigned {summary['assigned']}, unassigned {len(summary['unassigned'])}")
+    if plan_ms > args.max_plan_ms or total_ms > args.max_dispatch_ms:
+        sys.exit(
+            f"FAIL: over budget ({args.max_plan_ms:.0f} ms plan, "
+            f"{args.max_dispatch_ms:.0f} ms dispatch)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent orders reserving the same products, 32 writers vs one.
+
+Usage:
+    python benchmarks/inventory_writers.py
+    python benchmarks/inventory_writers.py --writers 32 --orders 8
+    python benchmarks/inventory_writers.py --database-url postgresql://localhost/bench
+
+Every order (POST /api/shipments) takes one laptop and one mouse, so all
+writers contend for the same two product rows. The same number of orders is
+placed first by a single writer, then by `--writers` threads, and the stock
+left is checked for overselling. Runs on a temporary SQLite file unless an
+empty database is given with --database-url (SQLite serializes writers, so
+the comparison is only meaningful on PostgreSQL). Exits non-zero if the
+parallel run is more than --max-slowdown times slower than the single writer.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.config import TestConfig  # noqa: E402
+from app.models.product import Product  # noqa: E402
+
+
+def make_app(database_url, writers):
+    options = {"pool_size": writers, "max_overflow": 0}
+    if database_url.startswith("sqlite"):
+        options["connect_args"] = {"timeout": 30}
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = options
+
+    return create_app(BenchConfig)
+
+
+def run_writers(app, token, writers, orders):
+    """Places writers x orders orders from `writers` threads: (statuses, seconds)."""
+    statuses = []
+    lock = threading.Lock()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def writer(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        for _ in range(orders):
+            # Items in random order: reservations must still lock by product_id
+            items = [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 1}]
+            rng.shuffle(items)
+            response = client.post(
+                "/api/shipments",
+                json={
+                    "origin": "Nairobi",
+                    "destination": "Mombasa",
+                    "recipient": "Jane",
+                    "weight": 1.5,
+                    "items": items,
+                },
+                headers=headers,
+            )
+            with lock:
+                statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses, time.perf_counter() - started
+
+
+def bench(app, writers, orders):
+    client = app.test_client()
+    client.post(
+        "/api/auth/register",
+        json={"username": "admin", "email": "admin@example.com",
+              "password": "pass123", "role": "admin"},
+    )
+    token = client.post(
+        "/api/auth/login", json={"email": "admin@example.com", "password": "pass123"}
+    ).get_json()["access_token"]
+    total = writers * orders
+    stock = 2 * total + writers
+    for name, sku in (("Laptop", "LAP001"), ("Mouse", "MOU001")):
+        client.post(
+            "/api/products",
+            json={"name": name, "sku": sku, "quantity": stock},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    # Warm up the connection pool and the per-worker caches
+    run_writers(app, token, writers, 1)
+    serial, baseline = run_writers(app, token, 1, total)
+    parallel, elapsed = run_writers(app, token, writers, orders)
+
+    db.session.expire_all()
+    left = sorted(p.quantity for p in Product.query)
+    placed = serial.count(201) + parallel.count(201) + writers
+    oversold = left != [stock - placed] * 2
+    return baseline, elapsed, set(serial) | set(parallel), oversold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--orders", type=int, default=8, help="orders per writer")
+    parser.add_argument("--max-slowdown", type=float, default=1.5)
+    parser.add_argument(
+        "--database-url",
+        help="an EMPTY database to run against (default: a temporary SQLite file)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = make_app(url, args.writers)
+        with app.app_context():
+            if inspect(db.engine).get_table_names():
+                sys.exit(f"Refusing to run: {db.engine.url!r} already has tables")
+            backend = db.engine.url.get_backend_name()
+            db.create_all()
+            try:
+                baseline, elapsed, statuses, oversold = bench(
+                    app, args.writers, args.orders
+                )
+            finally:
+                db.session.remove()
+                db.drop_all()
+                db.engine.dispose()
+
+    total = args.writers * args.orders
+    print(f"{total} orders on {backend}")
+    print(f"1 writer:       {baseline:8.2f} s")
+    print(f"{args.writers} writers:     {elapsed:8.2f} s ({elapsed / baseline:.2f}x)")
+    if statuses != {201} or oversold:
+        sys.exit(f"FAIL: unexpected statuses {sorted(statuses)} or oversold stock")
+    if elapsed > args.max_slowdown * baseline:
+        sys.exit(f"FAIL: parallel writers more than {args.max_slowdown}x slower")
+
+
+if __name__ == "__main__":
+    main()
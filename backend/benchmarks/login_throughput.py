@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login throughput under concurrency, inline bcrypt vs the process pool.
+
+Usage:
+    python benchmarks/login_throughput.py
+    python benchmarks/login_throughput.py --threads 16 --logins 400 --rounds 12 --workers 0 2 4
+
+Each configuration runs `--threads` client threads that log in `--logins`
+times in total against a temporary SQLite database, while one more thread
+keeps hitting a cheap endpoint (public tracking lookup of an unknown number)
+to show how much a login burst delays the other requests of the worker.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+USERS = 20
+PASSWORD = "benchmark-pass"
+
+
+def make_app(database, rounds, workers):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30}}
+        BCRYPT_LOG_ROUNDS = rounds
+        PASSWORD_HASH_WORKERS = workers
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        if not User.query.count():
+            for i in range(USERS):
+                user = User(username=f"user{i}", email=f"user{i}@example.com", role="customer")
+                user.set_password(PASSWORD)
+                db.session.add(user)
+            db.session.commit()
+    return app
+
+
+def run(app, threads, logins):
+    per_thread = logins // threads
+    probe_latencies = []
+    done = threading.Event()
+
+    def login_worker(offset):
+        client = app.test_client()
+        for i in range(per_thread):
+            email = f"user{(offset + i) % USERS}@example.com"
+            response = client.post(
+                "/api/auth/login", json={"email": email, "password": PASSWORD}
+            )
+            assert response.status_code == 200, response.data
+
+    def probe():
+        client = app.test_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get("/api/shipments/track/NOSUCH00")
+            probe_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.005)
+
+    prober = threading.Thread(target=probe)
+    workers = [threading.Thread(target=login_worker, args=(i,)) for i in range(threads)]
+    prober.start()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    prober.join()
+
+    probe_latencies.sort()
+    p95 = probe_latencies[int(len(probe_latencies) * 0.95) - 1] if probe_latencies else 0.0
+    median = statistics.median(probe_latencies) if probe_latencies else 0.0
+    return per_thread * threads / elapsed, median, p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=320)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, os.cpu_count() or 2])
+    args = parser.parse_args()
+
+    print(f"bcrypt cost {args.rounds}, {args.threads} threads, {args.logins} logins")
+    print(f"{'pool':<10} {'logins/s':>9} {'probe p50':>11} {'probe p95':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "bench.db")
+        for workers in args.workers:
+            app = make_app(database, args.rounds, workers)
+            with app.app_context():
+                rate, p50, p95 = run(app, args.threads, args.logins)
+                app.extensions["password_hasher"].shutdown()
+                db.engine.dispose()
+            label = "inline" if workers == 0 else f"{workers} procs"
+            print(f"{label:<10} {rate:>9.1f} {p50:>8.1f} ms {p95:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
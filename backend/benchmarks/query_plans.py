@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark: query plans and timings for the shipment list queries,
+before and after the hot-path indexes (migration 3f9c2a7d5b61).
+
+Usage:
+    python benchmarks/query_plans.py --shipments 200000
+    python benchmarks/query_plans.py --database-url postgresql://localhost/bench
+
+Runs on a throwaway SQLite file unless an EMPTY database is given with
+--database-url; DATABASE_URL is never read, since the script creates and
+drops every table. It drops the indexes, prints EXPLAIN output and
+timings, recreates them and repeats.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, inspect, select, text  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.models.shipment import Shipment  # noqa: E402
+from app.models.shipment_item import ShipmentItem  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def benchmark_config(database_url):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    return BenchmarkConfig
+
+
+def seed(n_shipments, n_customers, n_drivers):
+    users = [
+        {
+            "username": f"user{i}",
+            "email": f"user{i}@bench.local",
+            "password_hash": "x",
+            "role": "driver" if i < n_drivers else "customer",
+        }
+        for i in range(n_customers + n_drivers)
+    ]
+    db.session.execute(insert(User), users)
+
+    start = datetime(2025, 1, 1)
+    statuses = ["Pending", "In Transit", "Delivered", "Cancelled"]
+    batch = []
+    for i in range(n_shipments):
+        batch.append({
+            "tracking_number": f"B{i:09d}",
+            "status": random.choice(statuses),
+            "origin": "Nairobi",
+            "destination": f"Stop {i % 500}",
+            "payment_status": "Paid",
+            "created_at": start + timedelta(seconds=i * 7),
+            "customer_id": random.randint(n_drivers + 1, n_drivers + n_customers),
+            "driver_id": random.randint(1, n_drivers),
+        })
+        if len(batch) == 10000:
+            db.session.execute(insert(Shipment), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(Shipment), batch)
+
+    db.session.execute(
+        insert(ShipmentItem),
+        [
+            {"shipment_id": i, "product_id": 1, "quantity": 1}
+            for i in range(1, n_shipments + 1, 3)
+        ],
+    )
+    db.session.commit()
+
+
+def query_shapes(customer_id, driver_id):
+    newest = (Shipment.created_at.desc(), Shipment.id.desc())
+    return {
+        "customer list": select(Shipment)
+        .where(Shipment.customer_id == customer_id)
+        .order_by(*newest)
+        .limit(50),
+        "driver list": select(Shipment)
+        .where(Shipment.driver_id == driver_id)
+        .order_by(*newest)
+        .limit(50),
+        "admin list": select(Shipment).order_by(*newest).limit(50),
+        "status filter": select(Shipment)
+        .where(Shipment.status == "Pending")
+        .order_by(Shipment.created_at.desc())
+        .limit(50),
+        "items join": select(ShipmentItem).where(ShipmentItem.shipment_id == 4),
+        "get_drivers": select(User).where(User.role == "driver"),
+    }
+
+
+def explain(stmt):
+    dialect = db.engine.dialect.name
+    sql = str(stmt.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN" if dialect == "sqlite" else "EXPLAIN ANALYZE"
+    rows = db.session.execute(text(f"{prefix} {sql}")).all()
+    # SQLite returns (id, parent, notused, detail); PostgreSQL a single column
+    return [row[-1] for row in rows]
+
+
+def time_query(stmt, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        db.session.execute(stmt).all()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run_pass(label, shapes, repeat):
+    print(f"\n===== {label} =====")
+    for name, stmt in shapes.items():
+        ms = time_query(stmt, repeat)
+        print(f"\n-- {name}: {ms:.2f} ms/query")
+        for line in explain(stmt):
+            print(f"   {line}")
+
+
+def all_indexes():
+    indexes = list(Shipment.__table__.indexes)
+    indexes += list(ShipmentItem.__table__.indexes)
+    indexes += list(User.__table__.indexes)
+    return indexes
+
+
+def run(args):
+    print(f"Seeding {args.shipments} shipments into {db.engine.url!r} ...")
+    seed(args.shipments, args.customers, args.drivers)
+
+    shapes = query_shapes(customer_id=args.drivers + 1, driver_id=1)
+
+    for index in all_indexes():
+        index.drop(db.engine)
+    db.session.execute(text("ANALYZE"))
+    run_pass("BEFORE (no secondary indexes)", shapes, args.repeat)
+
+    for index in all_indexes():
+        index.create(db.engine)
+    db.session.execute(text("ANALYZE"))
+    run_pass("AFTER (hot-path indexes)", shapes, args.repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shipments", type=int, default=100000)
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--drivers", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--database-url",
+        help="an EMPTY database to run against (default: a temporary SQLite file)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_app(benchmark_config(database_url))
+        with app.app_context():
+            if inspect(db.engine).get_table_names():
+                sys.exit(f"Refusing to run: {db.engine.url!r} already has tables")
+            db.create_all()
+            try:
+                run(args)
+            finally:
+                db.session.remove()
+                db.drop_all()
+                db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: marshmallow vs the precompiled serializers for shipment lists.
+
+Usage:
+    python benchmarks/serializers.py
+    python benchmarks/serializers.py --sizes 1000 10000 100000 --repeat 5
+
+Both the ORM path (ShipmentSchema over Shipment objects) and the projected
+list path (ShipmentRowSchema over Row tuples) are measured in memory, so the
+numbers isolate serialization cost from the database. Every run also checks
+that the two outputs are identical.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.engine import result_tuple  # noqa: E402
+from app import create_app  # noqa: E402
+from app.models.shipment import Shipment  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas import (  # noqa: E402
+    shipments_schema,
+    shipment_rows_schema,
+    fast_shipments_schema,
+    fast_shipment_rows_schema,
+)
+
+ROW_FIELDS = [
+    "id",
+    "tracking_number",
+    "status",
+    "origin",
+    "destination",
+    "payment_status",
+    "customer_id",
+    "driver_id",
+    "created_at",
+    "customer_name",
+    "customerEmail",
+    "driverName",
+]
+
+
+def build_objects(n):
+    customer = User(id=1, username="cust", email="cust@example.com")
+    driver = User(id=2, username="drv", email="drv@example.com")
+    start = datetime(2026, 1, 1)
+    return [
+        Shipment(
+            id=i,
+            tracking_number=f"T{i:07d}",
+            status="Pending",
+            origin="Nairobi",
+            destination=f"Stop {i}",
+            payment_status="Unpaid",
+            customer_id=1,
+            driver_id=2 if i % 2 else None,
+            created_at=start + timedelta(seconds=i),
+            customer=customer,
+            driver=driver if i % 2 else None,
+        )
+        for i in range(n)
+    ]
+
+
+def build_rows(n):
+    make_row = result_tuple(ROW_FIELDS)
+    start = datetime(2026, 1, 1)
+    return [
+        make_row((
+            i,
+            f"T{i:07d}",
+            "Pending",
+            "Nairobi",
+            f"Stop {i}",
+            "Unpaid",
+            1,
+            2 if i % 2 else None,
+            start + timedelta(seconds=i),
+            "cust",
+            "cust@example.com",
+            "drv" if i % 2 else None,
+        ))
+        for i in range(n)
+    ]
+
+
+def best_of(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        cases = [
+            ("ORM objects", build_objects, shipments_schema, fast_shipments_schema),
+            ("Row tuples", build_rows, shipment_rows_schema, fast_shipment_rows_schema),
+        ]
+        print(f"{'input':<12} {'rows':>8} {'marshmallow':>13} {'compiled':>10} {'speedup':>8}")
+        for label, build, slow, fast in cases:
+            for n in args.sizes:
+                data = build(n)
+                assert app.json.dumps(fast.dump(data)) == app.json.dumps(slow.dump(data))
+                slow_ms = best_of(slow.dump, data, args.repeat)
+                fast_ms = best_of(fast.dump, data, args.repeat)
+                print(
+                    f"{label:<12} {n:>8} {slow_ms:>10.1f} ms {fast_ms:>7.1f} ms"
+                    f" {slow_ms / fast_ms:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
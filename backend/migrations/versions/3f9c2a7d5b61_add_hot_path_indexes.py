@@ -0,0 +1,60 @@
+"""Add hot-path indexes to shipments, shipment_items and users
+
+Revision ID: 3f9c2a7d5b61
+Revises: 7bd76a294d01
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d5b61'
+down_revision = '7bd76a294d01'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns) - each one mirrors a query in routes/shipments.py
+# or routes/auth.py:
+#   customer list:  WHERE customer_id = ? ORDER BY created_at DESC, id DESC
+#   driver list:    WHERE driver_id = ?   ORDER BY created_at DESC, id DESC
+#   admin list:     ORDER BY created_at DESC, id DESC
+#   status filter:  WHERE status = ?      ORDER BY created_at DESC
+#   items join:     shipment_items.shipment_id = shipments.id
+#   get_drivers:    WHERE role = 'driver'
+INDEXES = [
+    ('ix_shipments_customer_created', 'shipments', ['customer_id', 'created_at', 'id']),
+    ('ix_shipments_driver_created', 'shipments', ['driver_id', 'created_at', 'id']),
+    ('ix_shipments_created_id', 'shipments', ['created_at', 'id']),
+    ('ix_shipments_status_created', 'shipments', ['status', 'created_at']),
+    ('ix_shipment_items_shipment_id', 'shipment_items', ['shipment_id']),
+    ('ix_users_role', 'users', ['role']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL,
+    # so step out of the migration transaction. Other dialects ignore the flag.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
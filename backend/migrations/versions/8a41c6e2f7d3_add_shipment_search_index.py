@@ -0,0 +1,75 @@
+"""Add full-text search index over shipments
+
+Revision ID: 8a41c6e2f7d3
+Revises: 5d2e8b4c1a90
+Create Date: 2026-10-18 11:26:51.902364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a41c6e2f7d3'
+down_revision = '5d2e8b4c1a90'
+branch_labels = None
+depends_on = None
+
+
+# Keep in sync with app/models/shipment_search.py
+COLUMNS = ('destination', 'recipient', 'notes', 'tracking_number')
+PG_DOCUMENT = "to_tsvector('simple', {})".format(
+    " || ' ' || ".join(f"coalesce({c}, '')" for c in COLUMNS)
+)
+
+_cols = ', '.join(COLUMNS)
+_new = ', '.join(f'new.{c}' for c in COLUMNS)
+_old = ', '.join(f'old.{c}' for c in COLUMNS)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shipments_search '
+                f'ON shipments USING GIN ({PG_DOCUMENT})'
+            )
+
+    elif dialect == 'sqlite':
+        op.execute(
+            f'CREATE VIRTUAL TABLE shipments_fts USING fts5('
+            f"{_cols}, content='shipments', content_rowid='id')"
+        )
+        op.execute(
+            'CREATE TRIGGER shipments_fts_ai AFTER INSERT ON shipments BEGIN '
+            f'INSERT INTO shipments_fts(rowid, {_cols}) VALUES (new.id, {_new}); END'
+        )
+        op.execute(
+            'CREATE TRIGGER shipments_fts_ad AFTER DELETE ON shipments BEGIN '
+            f'INSERT INTO shipments_fts(shipments_fts, rowid, {_cols}) '
+            f"VALUES ('delete', old.id, {_old}); END"
+        )
+        op.execute(
+            f'CREATE TRIGGER shipments_fts_au AFTER UPDATE OF {_cols} ON shipments BEGIN '
+            f'INSERT INTO shipments_fts(shipments_fts, rowid, {_cols}) '
+            f"VALUES ('delete', old.id, {_old}); "
+            f'INSERT INTO shipments_fts(rowid, {_cols}) VALUES (new.id, {_new}); END'
+        )
+        # Index the rows that already exist
+        op.execute("INSERT INTO shipments_fts(shipments_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_shipments_search')
+
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS shipments_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS shipments_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS shipments_fts_ai')
+        op.execute('DROP TABLE IF EXISTS shipments_fts')
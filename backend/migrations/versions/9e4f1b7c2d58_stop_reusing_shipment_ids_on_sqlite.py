@@ -0,0 +1,75 @@
+"""Stop reusing shipment ids on SQLite
+
+Revision ID: 9e4f1b7c2d58
+Revises: 373480d07c1d
+Create Date: 2026-10-18 18:05:12.417330
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4f1b7c2d58'
+down_revision = '373480d07c1d'
+branch_labels = None
+depends_on = None
+
+
+# Keep in sync with app/models/shipment_search.py
+COLUMNS = ('destination', 'recipient', 'notes', 'tracking_number')
+
+_cols = ', '.join(COLUMNS)
+_new = ', '.join(f'new.{c}' for c in COLUMNS)
+_old = ', '.join(f'old.{c}' for c in COLUMNS)
+
+FTS_TRIGGERS = [
+    'CREATE TRIGGER IF NOT EXISTS shipments_fts_ai AFTER INSERT ON shipments BEGIN '
+    f'INSERT INTO shipments_fts(rowid, {_cols}) VALUES (new.id, {_new}); END',
+    'CREATE TRIGGER IF NOT EXISTS shipments_fts_ad AFTER DELETE ON shipments BEGIN '
+    f'INSERT INTO shipments_fts(shipments_fts, rowid, {_cols}) '
+    f"VALUES ('delete', old.id, {_old}); END",
+    f'CREATE TRIGGER IF NOT EXISTS shipments_fts_au AFTER UPDATE OF {_cols} '
+    'ON shipments BEGIN '
+    f'INSERT INTO shipments_fts(shipments_fts, rowid, {_cols}) '
+    f"VALUES ('delete', old.id, {_old}); "
+    f'INSERT INTO shipments_fts(rowid, {_cols}) VALUES (new.id, {_new}); END',
+]
+
+
+def _rebuild_shipments(autoincrement):
+    # Rebuilding the table drops its triggers, so the search index ones are
+    # put back afterwards
+    with op.batch_alter_table(
+        'shipments',
+        recreate='always',
+        table_kwargs={'sqlite_autoincrement': autoincrement},
+    ):
+        pass
+    for statement in FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    # PostgreSQL sequences never hand out an id twice; SQLite reuses the
+    # highest freed rowid unless the table is declared AUTOINCREMENT.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _rebuild_shipments(True)
+
+    # Ids already freed by deleted shipments still have events: start above them
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'shipments'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'shipments', max("
+        "(SELECT coalesce(max(id), 0) FROM shipments), "
+        "(SELECT coalesce(max(shipment_id), 0) FROM shipment_events))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _rebuild_shipments(False)
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'shipments'")
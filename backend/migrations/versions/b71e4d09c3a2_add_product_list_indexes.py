@@ -0,0 +1,50 @@
+"""Add product list and prefix search indexes
+
+Revision ID: b71e4d09c3a2
+Revises: 8a41c6e2f7d3
+Create Date: 2026-10-18 15:02:11.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e4d09c3a2'
+down_revision = '8a41c6e2f7d3'
+branch_labels = None
+depends_on = None
+
+
+# (name, columns) - mirrors the queries in services/product_queries.py:
+#   paged list:     ORDER BY name, id  (seek on (name, id) > cursor)
+#   prefix search:  lower(name) >= :q AND lower(name) < :q_next (same for sku)
+INDEXES = [
+    ('ix_products_name_id', ['name', 'id']),
+    ('ix_products_name_lower', [sa.text('lower(name)')]),
+    ('ix_products_sku_lower', [sa.text('lower(sku)')]),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name,
+                'products',
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name='products',
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
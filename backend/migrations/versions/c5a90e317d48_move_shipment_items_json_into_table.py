@@ -0,0 +1,124 @@
+"""Move shipments.items JSON into shipment_items
+
+Revision ID: c5a90e317d48
+Revises: b71e4d09c3a2
+Create Date: 2026-10-18 16:40:27.204385
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a90e317d48'
+down_revision = 'b71e4d09c3a2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+shipments = sa.table(
+    'shipments',
+    sa.column('id', sa.Integer),
+    sa.column('items', sa.Text),
+)
+shipment_items = sa.table(
+    'shipment_items',
+    sa.column('shipment_id', sa.Integer),
+    sa.column('product_id', sa.Integer),
+    sa.column('quantity', sa.Integer),
+)
+products = sa.table('products', sa.column('id', sa.Integer))
+
+
+def _parse_items(raw):
+    """[(product_id, quantity)] from one JSON items value; bad entries are skipped."""
+    try:
+        entries = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(entries, list):
+        return []
+
+    parsed = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            product_id = int(entry['product_id'])
+            quantity = int(entry.get('quantity', 1))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if quantity >= 1:
+            parsed.append((product_id, quantity))
+    return parsed
+
+
+def upgrade():
+    bind = op.get_bind()
+    product_ids = {row.id for row in bind.execute(sa.select(products.c.id))}
+
+    # Walk the shipments that have JSON items by id, one batch at a time,
+    # and write each batch's items with one executemany INSERT. Shipments
+    # that already have rows in shipment_items are left alone, so running
+    # upgrade again after a downgrade doesn't duplicate items.
+    already_linked = sa.exists().where(shipment_items.c.shipment_id == shipments.c.id)
+    last_id = 0
+    while True:
+        # c['items']: c.items is the ColumnCollection method
+        rows = bind.execute(
+            sa.select(shipments.c.id, shipments.c['items'])
+            .where(
+                shipments.c.id > last_id,
+                shipments.c['items'].isnot(None),
+                ~already_linked,
+            )
+            .order_by(shipments.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        values = [
+            {'shipment_id': shipment_id, 'product_id': product_id, 'quantity': quantity}
+            for shipment_id, raw_items in rows
+            for product_id, quantity in _parse_items(raw_items)
+            # Items pointing at deleted products can't satisfy the foreign key
+            if product_id in product_ids
+        ]
+        if values:
+            bind.execute(shipment_items.insert(), values)
+
+    # A plain ALTER TABLE (SQLite >= 3.35 supports DROP COLUMN): batch mode
+    # would rebuild shipments and lose the full-text search triggers
+    op.drop_column('shipments', 'items')
+
+
+def downgrade():
+    op.add_column('shipments', sa.Column('items', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    grouped = {}
+    for row in bind.execute(
+        sa.select(
+            shipment_items.c.shipment_id,
+            shipment_items.c.product_id,
+            shipment_items.c.quantity,
+        ).order_by(shipment_items.c.shipment_id)
+    ):
+        grouped.setdefault(row.shipment_id, []).append(
+            {'product_id': row.product_id, 'quantity': row.quantity}
+        )
+
+    if grouped:
+        bind.execute(
+            shipments.update()
+            .where(shipments.c.id == sa.bindparam('shipment_id'))
+            .values(items=sa.bindparam('items_json')),
+            [
+                {'shipment_id': shipment_id, 'items_json': json.dumps(items)}
+                for shipment_id, items in grouped.items()
+            ],
+        )
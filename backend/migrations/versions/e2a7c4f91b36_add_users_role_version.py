@@ -0,0 +1,25 @@
+"""Add users.role_version
+
+Revision ID: e2a7c4f91b36
+Revises: d8f3b62a1e05
+Create Date: 2026-10-18 19:21:48.093157
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c4f91b36'
+down_revision = 'd8f3b62a1e05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain ADD COLUMN: the constant server default fills existing rows
+    op.add_column('users', sa.Column('role_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('users', 'role_version')
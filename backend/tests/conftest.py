@@ -0,0 +1,114 @@
+import json
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.config import TestConfig
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def record_sql():
+    """
+    Collects the SQL statements run inside a block:
+
+        with record_sql() as statements:
+            client.get("/api/shipments", headers=headers)
+        assert not any("FROM users" in s for s in statements)
+    """
+
+    @contextmanager
+    def record():
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+    return record
+
+
+class FileConfig(TestConfig):
+    # SQLALCHEMY_DATABASE_URI is set per test by the file_app fixture
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "connect_args": {"timeout": 30},
+        "pool_size": 32,
+        "max_overflow": 0,
+    }
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """
+    An app on a temporary SQLite file: one connection per thread and real
+    database locks, both of which the shared in-memory database hides.
+    """
+    monkeypatch.setattr(
+        FileConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'test.db'}"
+    )
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def create_user(client, username, email, password, role):
+    response = client.post(
+        "/api/auth/register",
+        json={"username": username, "email": email, "password": password, "role": role},
+    )
+    return response
+
+
+def login_user(client, email, password):
+    response = client.post(
+        "/api/auth/login", json={"email": email, "password": password}
+    )
+    data = json.loads(response.data)
+    return data["access_token"]
+
+
+def create_product(client, token, name, sku, quantity):
+    response = client.post(
+        "/api/products",
+        json={"name": name, "sku": sku, "quantity": quantity},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return response
+
+
+def shipment(destination, **extra):
+    return {
+        "origin": "Nairobi",
+        "destination": destination,
+        "recipient": "Jane",
+        "weight": 1.5,
+        **extra,
+    }
+
+
+def admin_token(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    return login_user(client, "admin@example.com", "pass123")
@@ -0,0 +1,101 @@
+import json
+from app.models.shipment import Shipment
+from conftest import create_user, login_user, shipment, admin_token
+
+
+def test_bulk_create_inserts_valid_rows_and_reports_invalid(client):
+    token = admin_token(client)
+    rows = [
+        shipment("Mombasa"),
+        {"origin": "Nairobi"},  # missing required fields
+        shipment("Kisumu", tracking_number="custom01"),
+        shipment("Eldoret", tracking_number="CUSTOM01"),  # duplicate in batch
+        shipment("Nakuru", weight="heavy"),
+    ]
+
+    response = client.post(
+        "/api/shipments/bulk", json=rows, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201
+    body = json.loads(response.data)
+
+    assert [c["index"] for c in body["created"]] == [0, 2]
+    assert body["created"][1]["tracking_number"] == "CUSTOM01"
+    assert set(body["errors"]) == {"1", "3", "4"}
+
+    stored = Shipment.query.order_by(Shipment.id).all()
+    assert [s.destination for s in stored] == ["Mombasa", "Kisumu"]
+    assert len({s.tracking_number for s in stored}) == 2
+    assert all(s.customer_id == 1 and s.status == "Pending" for s in stored)
+
+
+def test_bulk_create_with_no_valid_rows_creates_nothing(client):
+    token = admin_token(client)
+    response = client.post(
+        "/api/shipments/bulk",
+        json={"shipments": [{"origin": "Nairobi"}]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 400
+    assert Shipment.query.count() == 0
+
+
+def test_bulk_create_is_admin_only(client):
+    create_user(client, "customer", "cust@example.com", "pass123", "customer")
+    token = login_user(client, "cust@example.com", "pass123")
+    response = client.post(
+        "/api/shipments/bulk",
+        json=[shipment("Mombasa")],
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 403
+
+
+def test_bulk_status_update_applies_payment_rule_per_row(client):
+    token = admin_token(client)
+    create_user(client, "driver", "driver@example.com", "pass123", "driver")
+    driver_token = login_user(client, "driver@example.com", "pass123")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.post(
+        "/api/shipments/bulk",
+        json=[shipment("A"), shipment("B"), shipment("C")],
+        headers=headers,
+    )
+    # Only shipments 1 and 2 are paid for
+    client.patch(
+        "/api/shipments/bulk",
+        json={"ids": [1, 2], "payment_status": "Paid", "driver_id": 2},
+        headers=headers,
+    )
+
+    response = client.patch(
+        "/api/shipments/bulk",
+        json={"ids": [1, 2, 3, 99], "status": "Delivered", "payment_status": "Unpaid"},
+        headers={"Authorization": f"Bearer {driver_token}"},
+    )
+    assert response.status_code == 200
+    body = json.loads(response.data)
+    assert body["updated"] == [1, 2]
+    assert body["rejected"] == {
+        "3": "Cannot mark as Delivered. Payment is pending.",
+        "99": "Shipment not found",
+    }
+
+    stored = {s.id: s for s in Shipment.query.all()}
+    assert stored[1].status == stored[2].status == "Delivered"
+    assert stored[3].status == "Pending"
+    # Drivers may only change status
+    assert stored[1].payment_status == "Paid"
+    assert stored[1].driver_id == 2
+
+
+def test_bulk_status_update_rejects_customers(client):
+    create_user(client, "customer", "cust@example.com", "pass123", "customer")
+    token = login_user(client, "cust@example.com", "pass123")
+    response = client.patch(
+        "/api/shipments/bulk",
+        json={"ids": [1], "status": "Delivered"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 403
@@ -0,0 +1,157 @@
+import json
+import random
+from sqlalchemy import insert
+from app import db
+from app.models.shipment import Shipment
+from app.models.user import User
+from app.services.dispatch import dispatch_pending, plan_assignments
+from conftest import create_user, shipment, admin_token
+
+
+def test_plan_respects_capacity_and_clusters_destinations():
+    shipments = [
+        (1, "Mombasa", 40.0),
+        (2, "Kisumu", 30.0),
+        (3, " mombasa ", 20.0),
+        (4, "Kisumu", 25.0),
+        (5, "Nakuru", 500.0),
+    ]
+    # Driver 1 already carries 30 kg; driver 2 may only take 60 kg
+    assignments, unassigned = plan_assignments(
+        shipments, [(1, 30.0), (2, 0.0)], capacity=100.0, capacities={2: 60.0}
+    )
+
+    # Each destination goes whole to the driver with the most room left;
+    # Nakuru is heavier than anyone can carry
+    assert assignments[1] == assignments[3] == 1
+    assert assignments[2] == assignments[4] == 2
+    assert unassigned == [5]
+
+    loads = {1: 30.0, 2: 0.0}
+    weights = {s[0]: s[2] for s in shipments}
+    for shipment_id, driver_id in assignments.items():
+        loads[driver_id] += weights[shipment_id]
+    assert loads[1] <= 100.0 and loads[2] <= 60.0
+
+
+def test_plan_splits_clusters_that_fit_nowhere_whole():
+    shipments = [(i, "Mombasa", 40.0) for i in range(1, 4)]
+    assignments, unassigned = plan_assignments(
+        shipments, [(1, 0.0), (2, 0.0)], capacity=100.0
+    )
+    assert not unassigned
+    assert sorted(list(assignments.values()).count(d) for d in (1, 2)) == [1, 2]
+
+
+def test_plan_spreads_load_over_drivers():
+    shipments = [(i, f"Town {i % 10}", 10.0) for i in range(100)]
+    assignments, unassigned = plan_assignments(
+        shipments, [(d, 0.0) for d in range(1, 6)], capacity=1000.0
+    )
+    assert not unassigned
+    counts = [list(assignments.values()).count(d) for d in range(1, 6)]
+    assert counts == [20] * 5
+
+
+def _backlog(shipments, destinations, seed=42):
+    rng = random.Random(seed)
+    return [
+        (i, f"Town {rng.randrange(destinations)}", round(rng.uniform(0.5, 40), 1))
+        for i in range(1, shipments + 1)
+    ]
+
+
+def test_plan_for_a_morning_backlog_places_every_shipment_within_capacity():
+    # Timings for this size live in benchmarks/dispatch.py
+    shipments = _backlog(10_000, 300)
+    drivers = [(d, 0.0) for d in range(1, 201)]
+
+    assignments, unassigned = plan_assignments(shipments, drivers, capacity=1000.0)
+
+    assert len(assignments) + len(unassigned) == len(shipments)
+    assert not set(assignments) & set(unassigned)
+    loads = dict.fromkeys(range(1, 201), 0.0)
+    weights = {shipment_id: weight for shipment_id, _, weight in shipments}
+    for shipment_id, driver_id in assignments.items():
+        loads[driver_id] += weights[shipment_id]
+    assert max(loads.values()) <= 1000.0 + 1e-6
+
+
+def test_dispatch_of_a_backlog_only_touches_unassigned_pending_shipments(app):
+    db.session.execute(insert(User), [
+        {"username": "customer", "email": "customer@example.com",
+         "password_hash": "x", "role": "customer"},
+    ] + [
+        {"username": f"driver{d}", "email": f"driver{d}@example.com",
+         "password_hash": "x", "role": "driver"}
+        for d in range(20)
+    ])
+    # Every 50th shipment is already on driver 2, every 7th is Cancelled
+    rows = []
+    for i, destination, weight in _backlog(1_000, 30):
+        row = {"tracking_number": f"BENCH{i:06d}", "origin": "Nairobi",
+               "destination": destination, "weight": weight, "customer_id": 1,
+               "driver_id": None, "status": "Pending"}
+        if i % 50 == 0:
+            row["driver_id"] = 2
+        elif i % 7 == 0:
+            row["status"] = "Cancelled"
+        rows.append(row)
+    db.session.execute(insert(Shipment), rows)
+    db.session.commit()
+    eligible = {r["tracking_number"] for r in rows
+                if r["driver_id"] is None and r["status"] == "Pending"}
+
+    summary, tracking_numbers = dispatch_pending(1000.0)
+    db.session.commit()
+
+    assert summary["pending"] == len(eligible)
+    assert summary["assigned"] + len(summary["unassigned"]) == len(eligible)
+    assert summary["assigned"] == len(tracking_numbers)
+    assert set(tracking_numbers) <= eligible
+
+    db.session.expire_all()
+    after = {s.tracking_number: s for s in Shipment.query.all()}
+    for row in rows:
+        if row["driver_id"] is not None:
+            assert after[row["tracking_number"]].driver_id == 2
+        elif row["status"] == "Cancelled":
+            assert after[row["tracking_number"]].driver_id is None
+
+    loads = {}
+    for s in after.values():
+        if s.driver_id is not None and s.status == "Pending":
+            loads[s.driver_id] = loads.get(s.driver_id, 0.0) + s.weight
+    assert max(loads.values()) <= 1000.0 + 1e-6
+
+
+def test_dispatch_assigns_pending_shipments_in_one_update(client):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    create_user(client, "dan", "dan@example.com", "pass123", "driver")
+    create_user(client, "eve", "eve@example.com", "pass123", "driver")
+    for destination in ("Mombasa", "Mombasa", "Kisumu", "Kisumu", "Eldoret"):
+        client.post("/api/shipments", json=shipment(destination, weight=5.0), headers=headers)
+    # Already assigned and no longer Pending shipments are left alone
+    client.patch("/api/shipments/5", json={"driver_id": 2}, headers=headers)
+    client.patch("/api/shipments/4", json={"status": "Cancelled"}, headers=headers)
+
+    dry = client.post("/api/admin/dispatch", json={"dry_run": True}, headers=headers)
+    assert json.loads(dry.data)["assigned"] == 3
+    assert Shipment.query.filter(Shipment.driver_id.isnot(None)).count() == 1
+
+    response = client.post("/api/admin/dispatch", json={"capacity": 50}, headers=headers)
+    assert response.status_code == 200
+    body = json.loads(response.data)
+    assert (body["pending"], body["assigned"], body["unassigned"]) == (3, 3, [])
+
+    db.session.expire_all()
+    drivers = {s.id: s.driver_id for s in Shipment.query.all()}
+    assert drivers[1] == drivers[2]
+    assert drivers[4] is None and drivers[5] == 2
+
+    directory = json.loads(client.get("/api/admin/drivers", headers=headers).data)
+    assert sum(d["active_shipments"] for d in directory) == 4
+
+    # Nothing left to hand out
+    again = json.loads(client.post("/api/admin/dispatch", headers=headers).data)
+    assert again["pending"] == 0
@@ -0,0 +1,53 @@
+import json
+from conftest import create_user, login_user, shipment, admin_token
+
+
+def _directory(client, headers):
+    response = client.get("/api/admin/drivers", headers=headers)
+    assert response.status_code == 200
+    return {d["name"]: d for d in json.loads(response.data)}
+
+
+def test_directory_reports_load_and_follows_assignments(client, record_sql):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    create_user(client, "dan", "dan@example.com", "pass123", "driver")
+    create_user(client, "eve", "eve@example.com", "pass123", "driver")
+    dan, eve = 2, 3
+
+    for weight in (2.0, 3.5, 10.0):
+        client.post("/api/shipments", json=shipment("Mombasa", weight=weight), headers=headers)
+    client.patch("/api/shipments/1", json={"driver_id": dan, "status": "In Transit"}, headers=headers)
+    client.patch("/api/shipments/2", json={"driver_id": dan, "status": "In Transit"}, headers=headers)
+    client.patch("/api/shipments/3", json={"driver_id": dan}, headers=headers)
+
+    directory = _directory(client, headers)
+    assert directory["dan"]["active_shipments"] == 3
+    assert directory["dan"]["in_transit_weight"] == 5.5
+    assert directory["eve"]["active_shipments"] == 0
+    assert directory["eve"]["in_transit_weight"] == 0
+
+    # Served from the cache until something changes
+    with record_sql() as statements:
+        _directory(client, headers)
+    assert not any("GROUP BY" in s for s in statements)
+
+    # Reassigning and cancelling are visible on the next request
+    client.patch("/api/shipments/2", json={"driver_id": eve}, headers=headers)
+    client.patch("/api/shipments/3", json={"status": "Cancelled"}, headers=headers)
+    directory = _directory(client, headers)
+    assert (directory["dan"]["active_shipments"], directory["dan"]["in_transit_weight"]) == (1, 2.0)
+    assert (directory["eve"]["active_shipments"], directory["eve"]["in_transit_weight"]) == (1, 3.5)
+
+    # New driver accounts show up too
+    create_user(client, "finn", "finn@example.com", "pass123", "driver")
+    assert "finn" in _directory(client, headers)
+
+
+def test_directory_is_admin_only(client):
+    create_user(client, "dan", "dan@example.com", "pass123", "driver")
+    token = login_user(client, "dan@example.com", "pass123")
+    response = client.get("/api/admin/drivers", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+    drivers = client.get("/api/auth/users/drivers", headers={"Authorization": f"Bearer {token}"})
+    assert json.loads(drivers.data) == [{"id": 1, "email": "dan@example.com", "name": "dan"}]
@@ -0,0 +1,72 @@
+import json
+from conftest import create_user, login_user
+
+
+def auth(token, **headers):
+    return {"Authorization": f"Bearer {token}", **headers}
+
+
+def create_shipment(client, token):
+    return client.post(
+        "/api/shipments",
+        json={
+            "origin": "Nairobi",
+            "destination": "Mombasa",
+            "recipient": "Jane",
+            "weight": 2.5,
+        },
+        headers=auth(token),
+    )
+
+
+def test_unchanged_shipment_list_returns_304(client):
+    create_user(client, "customer", "cust@example.com", "pass123", "customer")
+    token = login_user(client, "cust@example.com", "pass123")
+    create_shipment(client, token)
+
+    first = client.get("/api/shipments", headers=auth(token))
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/shipments", headers=auth(token, **{"If-None-Match": etag}))
+    assert again.status_code == 304
+    assert again.data == b""
+
+    # A write in this customer's scope invalidates the validator
+    create_shipment(client, token)
+    after_write = client.get(
+        "/api/shipments", headers=auth(token, **{"If-None-Match": etag})
+    )
+    assert after_write.status_code == 200
+    assert len(json.loads(after_write.data)["shipments"]) == 2
+
+
+def test_other_customers_writes_do_not_invalidate(client):
+    create_user(client, "alice", "a@example.com", "pass123", "customer")
+    create_user(client, "bobby", "b@example.com", "pass123", "customer")
+    token_a = login_user(client, "a@example.com", "pass123")
+    token_b = login_user(client, "b@example.com", "pass123")
+
+    etag = client.get("/api/shipments", headers=auth(token_a)).headers["ETag"]
+    create_shipment(client, token_b)
+
+    response = client.get(
+        "/api/shipments", headers=auth(token_a, **{"If-None-Match": etag})
+    )
+    assert response.status_code == 304
+
+
+def test_product_writes_bump_product_etag(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+
+    etag = client.get("/api/products", headers=auth(token)).headers["ETag"]
+    client.post(
+        "/api/products",
+        json={"name": "Laptop", "sku": "LAP001", "quantity": 3},
+        headers=auth(token),
+    )
+
+    response = client.get("/api/products", headers=auth(token, **{"If-None-Match": etag}))
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+from app import db
+from app.models.shipment import Shipment
+from conftest import create_user, login_user
+
+
+def seed_shipments(customer_id, count):
+    for i in range(count):
+        db.session.add(
+            Shipment(origin="Nairobi", destination=f"Stop {i}", customer_id=customer_id)
+        )
+    db.session.commit()
+
+
+def test_ndjson_export_streams_every_shipment(app, client):
+    app.config["EXPORT_BATCH_SIZE"] = 2
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    seed_shipments(customer_id=1, count=5)
+
+    response = client.get(
+        "/api/admin/shipments/export", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [r["id"] for r in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["customer_name"] == "admin"
+
+
+def test_csv_export_has_header_and_rows(app, client):
+    app.config["EXPORT_BATCH_SIZE"] = 2
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    seed_shipments(customer_id=1, count=3)
+
+    response = client.get(
+        "/api/admin/shipments/export?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+
+    rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+    assert len(rows) == 3
+    assert rows[2]["destination"] == "Stop 2"
+
+
+def test_export_is_admin_only(client):
+    create_user(client, "customer", "cust@example.com", "pass123", "customer")
+    token = login_user(client, "cust@example.com", "pass123")
+
+    response = client.get(
+        "/api/admin/shipments/export", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 403
@@ -0,0 +1,109 @@
+import json
+from datetime import datetime
+from app import db
+from app.models.shipment import Shipment
+from conftest import create_user, login_user
+
+
+def seed(admin_token_client):
+    client = admin_token_client
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    create_user(client, "driver", "driver@example.com", "pass123", "driver")
+    db.session.add_all([
+        Shipment(
+            tracking_number="ABC12345",
+            origin="Nairobi",
+            destination="Mombasa Port",
+            recipient="Jane Wanjiru",
+            notes="Fragile glassware",
+            status="Pending",
+            customer_id=1,
+            created_at=datetime(2026, 3, 1, 9, 0),
+        ),
+        Shipment(
+            tracking_number="XYZ99999",
+            origin="Nairobi",
+            destination="Kisumu",
+            recipient="Otieno",
+            status="In Transit",
+            payment_status="Paid",
+            customer_id=1,
+            driver_id=2,
+            created_at=datetime(2026, 3, 2, 15, 30),
+        ),
+        Shipment(
+            tracking_number="QRS55555",
+            origin="Nairobi",
+            destination="Mombasa Old Town",
+            recipient="Ali",
+            status="Delivered",
+            payment_status="Paid",
+            customer_id=1,
+            driver_id=2,
+            created_at=datetime(2026, 3, 5, 8, 0),
+        ),
+    ])
+    db.session.commit()
+    return login_user(client, "admin@example.com", "pass123")
+
+
+def tracking_numbers(client, token, query):
+    response = client.get(
+        f"/api/admin/all?{query}", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.data
+    return sorted(s["tracking"] for s in json.loads(response.data)["shipments"])
+
+
+def test_column_filters(client):
+    token = seed(client)
+
+    assert tracking_numbers(client, token, "status=Pending") == ["ABC12345"]
+    assert tracking_numbers(client, token, "status=Pending,Delivered") == [
+        "ABC12345",
+        "QRS55555",
+    ]
+    assert tracking_numbers(client, token, "payment_status=Paid&driver_id=2") == [
+        "QRS55555",
+        "XYZ99999",
+    ]
+    assert tracking_numbers(client, token, "driver_id=none") == ["ABC12345"]
+    assert tracking_numbers(
+        client, token, "created_from=2026-03-02&created_to=2026-03-02"
+    ) == ["XYZ99999"]
+
+
+def test_text_search_uses_prefixes_across_columns(client):
+    token = seed(client)
+
+    assert tracking_numbers(client, token, "q=mombasa") == ["ABC12345", "QRS55555"]
+    assert tracking_numbers(client, token, "q=mombasa+old") == ["QRS55555"]
+    assert tracking_numbers(client, token, "q=fragile") == ["ABC12345"]
+    assert tracking_numbers(client, token, "q=xyz9") == ["XYZ99999"]
+    assert tracking_numbers(client, token, "q=wanjiru") == ["ABC12345"]
+
+    # Search follows updates through the FTS triggers
+    shipment = db.session.get(Shipment, 2)
+    shipment.notes = "Leave with neighbour"
+    db.session.commit()
+    assert tracking_numbers(client, token, "q=neighbour") == ["XYZ99999"]
+
+
+def test_sort_and_bad_input(client):
+    token = seed(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/admin/all?sort=created_at&limit=2", headers=headers)
+    page = json.loads(response.data)
+    assert [s["tracking"] for s in page["shipments"]] == ["ABC12345", "XYZ99999"]
+
+    response = client.get(
+        f"/api/admin/all?sort=created_at&limit=2&cursor={page['next_cursor']}",
+        headers=headers,
+    )
+    assert [s["tracking"] for s in json.loads(response.data)["shipments"]] == [
+        "QRS55555"
+    ]
+
+    assert client.get("/api/admin/all?sort=bogus", headers=headers).status_code == 400
+    assert client.get("/api/admin/all?driver_id=x", headers=headers).status_code == 400
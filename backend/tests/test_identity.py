@@ -0,0 +1,64 @@
+import time
+from app import db
+from app.models.user import User
+from app.utils import identity
+from conftest import create_user, login_user
+
+
+def test_fresh_token_claims_are_trusted_without_a_user_lookup(client, record_sql):
+    create_user(client, "alice", "alice@example.com", "pass123", "customer")
+    headers = {"Authorization": f"Bearer {login_user(client, 'alice@example.com', 'pass123')}"}
+
+    with record_sql() as statements:
+        response = client.get("/api/shipments", headers=headers)
+    assert response.status_code == 200
+    assert not any("users.role" in s for s in statements)
+
+
+def test_stale_role_claim_is_checked_against_the_database(app, client, monkeypatch, record_sql):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    create_user(client, "bobby", "bobby@example.com", "pass123", "driver")
+    admin = {"Authorization": f"Bearer {login_user(client, 'admin@example.com', 'pass123')}"}
+    driver = {"Authorization": f"Bearer {login_user(client, 'bobby@example.com', 'pass123')}"}
+
+    # Past ROLE_CLAIM_TTL the role version is looked up once, then cached
+    later = time.time() + app.config["ROLE_CLAIM_TTL"] + 1
+    monkeypatch.setattr(identity.time, "time", lambda: later)
+    with record_sql() as statements:
+        response = client.get("/api/admin/all", headers=admin)
+    assert response.status_code == 200
+    assert sum("users.role_version" in s for s in statements) == 1
+    with record_sql() as statements:
+        client.get("/api/admin/all", headers=admin)
+    assert not any("users.role_version" in s for s in statements)
+
+    # The driver's entry is cached too; demoting them through the admin
+    # route drops it, so their old token stops working right away
+    assert client.get("/api/shipments", headers=driver).status_code == 200
+    user = User.query.filter_by(email="bobby@example.com").one()
+    response = client.patch(
+        f"/api/auth/users/{user.id}/role", json={"role": "customer"}, headers=admin
+    )
+    assert response.status_code == 200
+    assert user.role_version == 1
+
+    response = client.get("/api/shipments", headers=driver)
+    assert response.status_code == 401
+
+
+def test_role_cache_expires_well_before_the_claim(app):
+    cache = identity.role_cache()
+    assert cache.ttl < app.config["ROLE_CLAIM_TTL"]
+    assert cache.negative_ttl < app.config["ROLE_CLAIM_TTL"]
+
+
+def test_change_role_is_admin_only(client):
+    create_user(client, "alice", "alice@example.com", "pass123", "customer")
+    token = login_user(client, "alice@example.com", "pass123")
+    response = client.patch(
+        "/api/auth/users/1/role",
+        json={"role": "admin"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 403
+    assert db.session.get(User, 1).role == "customer"
@@ -0,0 +1,182 @@
+import json
+import random
+import threading
+from app import db
+from app.models.product import Product
+from app.models.shipment_item import ShipmentItem
+from conftest import create_product, shipment, admin_token
+
+
+def _quantities():
+    db.session.expire_all()
+    return {p.sku: p.quantity for p in Product.query.order_by(Product.id)}
+
+
+def _create(client, token, items):
+    return client.post(
+        "/api/shipments",
+        json=shipment("Mombasa", items=items),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_creating_a_shipment_reserves_stock_all_or_nothing(client):
+    token = admin_token(client)
+    create_product(client, token, "Laptop", "LAP001", 5)
+    create_product(client, token, "Mouse", "MOU001", 1)
+
+    response = _create(client, token, [
+        {"product_id": 1, "quantity": 2},
+        {"product_id": 2, "quantity": 1},
+        {"product_id": 1, "quantity": 1},
+    ])
+    assert response.status_code == 201
+    assert _quantities() == {"LAP001": 2, "MOU001": 0}
+
+    # The laptops are available but the mouse isn't: nothing is taken
+    response = _create(client, token, [
+        {"product_id": 1, "quantity": 1},
+        {"product_id": 2, "quantity": 1},
+    ])
+    assert response.status_code == 409
+    assert json.loads(response.data)["product_id"] == 2
+    assert _quantities() == {"LAP001": 2, "MOU001": 0}
+    assert ShipmentItem.query.count() == 3
+
+
+def test_cancelling_releases_stock_once_and_reinstating_reserves_it(client):
+    token = admin_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    create_product(client, token, "Laptop", "LAP001", 3)
+    _create(client, token, [{"product_id": 1, "quantity": 3}])
+
+    for _ in range(2):
+        response = client.patch(
+            "/api/shipments/1", json={"status": "Cancelled"}, headers=headers
+        )
+        assert response.status_code == 200
+    assert _quantities() == {"LAP001": 3}
+
+    response = client.patch("/api/shipments/1", json={"status": "Pending"}, headers=headers)
+    assert response.status_code == 200
+    assert _quantities() == {"LAP001": 0}
+
+    # Reinstating a second cancelled shipment can't oversell
+    client.patch("/api/shipments/1", json={"status": "Cancelled"}, headers=headers)
+    _create(client, token, [{"product_id": 1, "quantity": 2}])
+    response = client.patch(
+        "/api/shipments/bulk", json={"ids": [1], "status": "Pending"}, headers=headers
+    )
+    assert response.status_code == 409
+    assert _quantities() == {"LAP001": 1}
+
+    client.delete("/api/shipments/2", headers=headers)
+    assert _quantities() == {"LAP001": 3}
+
+
+def test_delivered_shipments_keep_their_stock_taken(client):
+    token = admin_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    create_product(client, token, "Laptop", "LAP001", 5)
+    _create(client, token, [{"product_id": 1, "quantity": 2}])
+    client.patch("/api/shipments/1", json={"payment_status": "Paid"}, headers=headers)
+    response = client.patch("/api/shipments/1", json={"status": "Delivered"}, headers=headers)
+    assert response.status_code == 200
+    assert _quantities() == {"LAP001": 3}
+
+    response = client.patch("/api/shipments/1", json={"status": "Cancelled"}, headers=headers)
+    assert response.status_code == 400
+    response = client.patch(
+        "/api/shipments/bulk", json={"ids": [1], "status": "Cancelled"}, headers=headers
+    )
+    body = json.loads(response.data)
+    assert body["updated"] == [] and body["rejected"] == {"1": "Cannot cancel a Delivered shipment."}
+    assert _quantities() == {"LAP001": 3}
+
+    # Deleting it doesn't put the goods back either
+    assert client.delete("/api/shipments/1", headers=headers).status_code == 200
+    assert _quantities() == {"LAP001": 3}
+
+
+def test_bulk_create_reports_stock_shortfalls_per_row(client):
+    token = admin_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    create_product(client, token, "Laptop", "LAP001", 3)
+    create_product(client, token, "Mouse", "MOU001", 5)
+
+    rows = [
+        shipment("A", items=[{"product_id": 1, "quantity": 2}]),
+        # Only one laptop left after row 0: this row takes nothing
+        shipment("B", items=[
+            {"product_id": 2, "quantity": 1},
+            {"product_id": 1, "quantity": 2},
+        ]),
+        shipment("C", items=[{"product_id": 2, "quantity": 1}]),
+        shipment("D", items=[{"product_id": 9, "quantity": 1}]),
+    ]
+    response = client.post("/api/shipments/bulk", json=rows, headers=headers)
+    assert response.status_code == 201
+    body = json.loads(response.data)
+    assert [row["index"] for row in body["created"]] == [0, 2]
+    assert body["errors"] == {
+        "1": {"items": ["Insufficient stock for product 1: requested 2, available 1"]},
+        "3": {"items": ["Product 9 does not exist"]},
+    }
+    assert _quantities() == {"LAP001": 1, "MOU001": 4}
+    assert ShipmentItem.query.count() == 2
+
+    # Nothing can be covered: nothing is created
+    response = client.post("/api/shipments/bulk", json=rows[:1], headers=headers)
+    assert response.status_code == 409
+    assert json.loads(response.data)["created"] == []
+    assert _quantities() == {"LAP001": 1, "MOU001": 4}
+
+
+def test_bulk_create_with_items_on_a_file_database(file_app):
+    # The first bulk row reserves a block of tracking numbers on its own
+    # connection, which must not queue behind the stock reservation's lock
+    client = file_app.test_client()
+    token = admin_token(client)
+    create_product(client, token, "Laptop", "LAP001", 3)
+
+    rows = [shipment("A", items=[{"product_id": 1, "quantity": 2}])]
+    response = client.post(
+        "/api/shipments/bulk", json=rows, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201
+    assert _quantities() == {"LAP001": 1}
+
+
+def test_parallel_writers_never_oversell(file_app):
+    # 32 writers on one file database; throughput against a single writer
+    # is measured by benchmarks/inventory_writers.py
+    writers, attempts, stock = 32, 8, 100
+    client = file_app.test_client()
+    token = admin_token(client)
+    create_product(client, token, "Laptop", "LAP001", stock)
+    create_product(client, token, "Mouse", "MOU001", stock)
+
+    statuses = []
+    lock = threading.Lock()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        thread_client = file_app.test_client()
+        for _ in range(attempts):
+            # Items in random order: the engine must still lock by product_id
+            items = [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 1}]
+            rng.shuffle(items)
+            status = _create(thread_client, token, items).status_code
+            with lock:
+                statuses.append(status)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(set(statuses)) == [201, 409]
+    assert statuses.count(201) == stock
+    assert _quantities() == {"LAP001": 0, "MOU001": 0}
+    assert ShipmentItem.query.count() == 2 * stock
@@ -5,6 +5,7 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.shipment import Shipment
 from app.models.shipment_item import ShipmentItem
+from conftest import create_user, login_user, create_product
 
 
 @pytest.fixture
@@ -28,31 +29,6 @@ def runner(app):
     return app.test_cli_runner()
 
 
-def create_user(client, username, email, password, role):
-    response = client.post(
-        "/api/auth/register",
-        json={"username": username, "email": email, "password": password, "role": role},
-    )
-    return response
-
-
-def login_user(client, email, password):
-    response = client.post(
-        "/api/auth/login", json={"email": email, "password": password}
-    )
-    data = json.loads(response.data)
-    return data["access_token"]
-
-
-def create_product(client, token, name, sku, quantity):
-    response = client.post(
-        "/api/products",
-        json={"name": name, "sku": sku, "quantity": quantity},
-        headers={"Authorization": f"Bearer {token}"},
-    )
-    return response
-
-
 def test_spy_security(client):
     # Create two customers
     create_user(client, "customer_a", "a@example.com", "pass123", "customer")
@@ -115,7 +91,7 @@ def test_admin_god_mode(client):
         "/api/shipments", headers={"Authorization": f"Bearer {token_admin}"}
     )
     assert response.status_code == 200
-    shipments = json.loads(response.data)
+    shipments = json.loads(response.data)["shipments"]
     assert len(shipments) == 1
 
     # Admin can delete shipment
@@ -168,7 +144,7 @@ def test_transaction_integrity(client):
     response = client.get(
         "/api/shipments", headers={"Authorization": f"Bearer {token}"}
     )
-    shipments = json.loads(response.data)
+    shipments = json.loads(response.data)["shipments"]
     assert len(shipments) == 0
 
     # Create valid shipment
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+import socket
+import pytest
+from aiosmtpd import controller as controller_module
+from app import db, mail
+from app.models.outbound_email import OutboundEmail, PENDING, SENT, FAILED
+from app.services.mail_queue import deliver_batch, enqueue_email, purge_emails
+from conftest import create_user
+
+
+class Recorder:
+    """aiosmtpd handler: records messages, counts connections, can refuse."""
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        self.replies = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.replies:
+            return self.replies.pop(0)
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode()))
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _use_smtp(app, port):
+    app.config.update(
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=port,
+        MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False,
+        MAIL_USERNAME=None,
+        MAIL_SUPPRESS_SEND=False,
+    )
+    mail.init_app(app)
+
+
+@pytest.fixture
+def smtp(app):
+    handler = Recorder()
+    controller = controller_module.Controller(
+        handler, hostname="127.0.0.1", port=_free_port()
+    )
+    controller.start()
+    _use_smtp(app, controller.port)
+    yield handler
+    controller.stop()
+
+
+def _queue(count):
+    for i in range(count):
+        enqueue_email("Hello", [f"user{i}@example.com"], f"Message {i}")
+    db.session.commit()
+
+
+def test_forgot_password_only_queues_the_email(client, smtp):
+    create_user(client, "alice", "alice@example.com", "pass123", "customer")
+
+    response = client.post("/api/auth/forgot-password", json={"email": "alice@example.com"})
+    assert response.status_code == 200
+    assert smtp.connections == 0
+
+    email = OutboundEmail.query.one()
+    assert email.status == PENDING and email.recipients == ["alice@example.com"]
+    assert "reset code" in email.body
+
+    assert deliver_batch() == 1
+    assert smtp.messages[0][0] == ["alice@example.com"]
+    assert "reset code" in smtp.messages[0][1]
+
+    # Once delivered, the reset code no longer sits in the database
+    email = OutboundEmail.query.one()
+    assert email.status == SENT and email.body is None
+
+
+def test_batch_reuses_one_smtp_connection(app, smtp):
+    _queue(5)
+    assert deliver_batch(batch_size=10) == 5
+    assert smtp.connections == 1
+    assert len(smtp.messages) == 5
+    assert OutboundEmail.query.filter_by(status=SENT).count() == 5
+    # Nothing left to claim
+    assert deliver_batch() == 0
+
+
+def test_temporary_failures_are_retried_with_backoff(app, smtp):
+    smtp.replies = ["451 Try again later", "550 No such user"]
+    _queue(3)
+    deliver_batch()
+
+    retried, rejected, sent = OutboundEmail.query.order_by(OutboundEmail.id).all()
+    assert retried.status == PENDING and retried.attempts == 1
+    assert retried.next_attempt_at > datetime.utcnow()
+    assert "451" in retried.last_error
+    assert rejected.status == FAILED and rejected.body is None
+    assert sent.status == SENT and sent.body is None
+    assert retried.body == "Message 0"
+
+    # Not due yet; once it is, the next run delivers it
+    assert deliver_batch() == 0
+    retried.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    assert deliver_batch() == 1
+    assert db.session.get(OutboundEmail, retried.id).status == SENT
+
+
+def test_unreachable_server_keeps_emails_queued(app):
+    _use_smtp(app, _free_port())
+    app.config["MAIL_MAX_ATTEMPTS"] = 2
+    _queue(2)
+
+    deliver_batch()
+    first, second = OutboundEmail.query.order_by(OutboundEmail.id).all()
+    assert first.status == PENDING and first.attempts == 1
+    # Never attempted: released for the next run without using up an attempt
+    assert second.status == PENDING and second.attempts == 0
+
+    first.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    deliver_batch(batch_size=1)
+    assert db.session.get(OutboundEmail, first.id).status == FAILED
+
+
+def test_finished_emails_are_purged_after_the_retention_period(app, smtp):
+    smtp.replies = ["550 No such user"]
+    _queue(3)
+    deliver_batch()
+    failed, sent, pending = OutboundEmail.query.order_by(OutboundEmail.id).all()
+    # Put the last one back in the queue: due rows are never purged
+    pending.status, pending.next_attempt_at = PENDING, datetime.utcnow()
+    db.session.commit()
+
+    assert purge_emails() == 0
+    old = datetime.utcnow() - timedelta(days=app.config["MAIL_RETENTION_DAYS"] + 1)
+    for email in (failed, sent, pending):
+        email.next_attempt_at = old
+    db.session.commit()
+
+    assert purge_emails() == 2
+    assert [e.status for e in OutboundEmail.query.all()] == [PENDING]
@@ -0,0 +1,88 @@
+import json
+from datetime import datetime, timedelta
+from app import db
+from app.models.shipment import Shipment
+from conftest import create_user, login_user
+
+
+def seed_shipments(customer_id, count):
+    # Half of the rows share a timestamp so the id tie-breaker gets exercised
+    base = datetime(2026, 1, 1)
+    for i in range(count):
+        db.session.add(
+            Shipment(
+                origin="Nairobi",
+                destination=f"Stop {i}",
+                customer_id=customer_id,
+                created_at=base + timedelta(minutes=i // 2),
+            )
+        )
+    db.session.commit()
+
+
+def test_keyset_pages_cover_every_row_once(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    seed_shipments(customer_id=1, count=7)
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/admin/all?limit=3"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = client.get(url, headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        assert len(page["shipments"]) <= 3
+        seen.extend(s["id"] for s in page["shipments"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(seen) == list(range(1, 8))
+    assert len(seen) == len(set(seen))
+    # Newest first
+    assert seen[0] == 7
+
+
+def test_customer_pages_only_contain_own_shipments(client):
+    create_user(client, "alice", "a@example.com", "pass123", "customer")
+    create_user(client, "bob", "b@example.com", "pass123", "customer")
+    token_b = login_user(client, "b@example.com", "pass123")
+    seed_shipments(customer_id=1, count=3)
+    seed_shipments(customer_id=2, count=2)
+
+    response = client.get(
+        "/api/shipments?limit=10", headers={"Authorization": f"Bearer {token_b}"}
+    )
+    page = json.loads(response.data)
+    assert [s["customer_id"] for s in page["shipments"]] == [2, 2]
+    assert page["next_cursor"] is None
+
+
+def test_invalid_cursor_is_rejected(client):
+    create_user(client, "alice", "a@example.com", "pass123", "customer")
+    token = login_user(client, "a@example.com", "pass123")
+
+    response = client.get(
+        "/api/shipments?cursor=not-a-cursor",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 400
+
+
+def test_lists_are_paged_by_default(app, client):
+    app.config["PAGE_SIZE_DEFAULT"] = 4
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    seed_shipments(customer_id=1, count=7)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    page = json.loads(client.get("/api/admin/all", headers=headers).data)
+    assert [s["id"] for s in page["shipments"]] == [7, 6, 5, 4]
+    assert page["next_cursor"]
+
+    # The unbounded plain list only on request
+    everything = json.loads(client.get("/api/admin/all?all=1", headers=headers).data)
+    assert sorted(s["id"] for s in everything) == list(range(1, 8))
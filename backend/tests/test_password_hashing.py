@@ -0,0 +1,68 @@
+import pytest
+from app import db
+from app.models.user import User
+from app.services.password_hashing import (
+    PasswordHasher,
+    PasswordHashTimeout,
+    hash_cost,
+    password_hasher,
+)
+from conftest import create_user, login_user
+
+
+def test_login_rehashes_passwords_with_an_outdated_cost(client):
+    create_user(client, "alice", "alice@example.com", "pass123", "customer")
+    user = User.query.filter_by(email="alice@example.com").one()
+    assert hash_cost(user.password_hash) == 4
+
+    # The configured cost goes up: the next successful login upgrades the hash
+    password_hasher().rounds = 5
+    assert login_user(client, "alice@example.com", "pass123")
+
+    db.session.expire_all()
+    assert hash_cost(user.password_hash) == 5
+    assert user.check_password("pass123")
+    assert not user.password_needs_rehash()
+
+
+def test_process_pool_hashes_match_inline_ones():
+    pooled = PasswordHasher(rounds=4, workers=2, timeout=30)
+    inline = PasswordHasher(rounds=4)
+    try:
+        pw_hash = pooled.hash("s3cret!")
+        assert pw_hash.startswith("$2b$04$")
+        assert inline.check(pw_hash, "s3cret!")
+        assert pooled.check(inline.hash("other"), "other")
+        assert not pooled.check(pw_hash, "wrong")
+        assert pooled._pool is not None
+    finally:
+        pooled.shutdown()
+
+
+def test_pool_timeout_raises_password_hash_timeout():
+    hasher = PasswordHasher(rounds=14, workers=1, timeout=0.01)
+    try:
+        with pytest.raises(PasswordHashTimeout):
+            hasher.hash("s3cret!")
+        assert hasher._pool._mp_context.get_start_method() == "forkserver"
+    finally:
+        hasher.shutdown()
+
+
+def test_hashing_timeouts_answer_503(client):
+    create_user(client, "alice", "alice@example.com", "pass123", "customer")
+
+    hasher = password_hasher()
+    hasher.rounds, hasher.workers, hasher.timeout = 14, 1, 0.01
+    try:
+        response = client.post(
+            "/api/auth/login", json={"email": "alice@example.com", "password": "pass123"}
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+
+        response = create_user(client, "bob", "bob@example.com", "pass123", "customer")
+        assert response.status_code == 503
+        assert User.query.filter_by(email="bob@example.com").first() is None
+    finally:
+        hasher.shutdown()
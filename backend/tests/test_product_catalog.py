@@ -0,0 +1,63 @@
+import json
+from flask import current_app
+from conftest import create_user, login_user, create_product, shipment
+
+
+def test_catalog_is_rebuilt_only_after_writes(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    headers = {"Authorization": f"Bearer {token}"}
+    catalog = current_app.extensions["product_catalog"]
+
+    create_product(client, token, "Laptop", "LAP001", 5)
+    first = json.loads(client.get("/api/products", headers=headers).data)
+    client.get("/api/products", headers=headers)
+    assert [p["sku"] for p in first] == ["LAP001"]
+    rebuilds = catalog.rebuilds
+
+    client.put("/api/products/1", json={"quantity": 9}, headers=headers)
+    updated = json.loads(client.get("/api/products", headers=headers).data)
+    assert updated[0]["quantity"] == 9
+    assert catalog.rebuilds == rebuilds + 1
+
+
+def test_duplicate_sku_checks_use_the_catalog_index(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    create_product(client, token, "Laptop", "LAP001", 5)
+    create_product(client, token, "Mouse", "MOU001", 5)
+
+    assert create_product(client, token, "Dup", "LAP001", 1).status_code == 409
+    response = client.put(
+        "/api/products/2", json={"name": "Renamed", "sku": "LAP001"}, headers=headers
+    )
+    assert response.status_code == 409
+
+    # The rejected rename never reached the cached catalog
+    products = json.loads(client.get("/api/products", headers=headers).data)
+    assert [p["name"] for p in products] == ["Laptop", "Mouse"]
+
+
+def test_orders_refresh_quantities_without_a_rebuild(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    headers = {"Authorization": f"Bearer {token}"}
+    catalog = current_app.extensions["product_catalog"]
+
+    create_product(client, token, "Laptop", "LAP001", 5)
+    etag = client.get("/api/products", headers=headers).headers["ETag"]
+    rebuilds = catalog.rebuilds
+
+    response = client.post(
+        "/api/shipments",
+        json=shipment("Mombasa", items=[{"product_id": 1, "quantity": 2}]),
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+    response = client.get("/api/products", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert json.loads(response.data)[0]["quantity"] == 3
+    assert catalog.rebuilds == rebuilds
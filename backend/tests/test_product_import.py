@@ -0,0 +1,59 @@
+import io
+import json
+from app.models.product import Product
+from conftest import create_user, login_user, create_product
+
+
+def admin_headers(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_csv_import_upserts_by_sku_in_batches(app, client):
+    app.config["IMPORT_BATCH_SIZE"] = 2
+    headers = admin_headers(client)
+    create_product(client, headers["Authorization"][7:], "Old Laptop", "LAP001", 5)
+
+    body = (
+        "name,sku,quantity\n"
+        "Laptop,LAP001,50\n"  # update
+        "Mouse,MOU001,100\n"  # insert
+        ",BAD001,3\n"  # invalid: missing name
+        "Keyboard,KEY001,\n"  # insert, quantity defaults to 0
+        "Mouse v2,MOU001,\n"  # update in a later batch, quantity kept
+    )
+    response = client.post(
+        "/api/products/import",
+        data=body,
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    report = json.loads(response.data)
+    assert (report["inserted"], report["updated"], report["errors"]) == (2, 2, 1)
+    assert report["error_details"][0]["line"] == 4
+
+    products = {p.sku: p for p in Product.query.all()}
+    assert products["LAP001"].name == "Laptop"
+    assert products["LAP001"].quantity == 50
+    assert (products["MOU001"].name, products["MOU001"].quantity) == ("Mouse v2", 100)
+    assert products["KEY001"].quantity == 0
+    assert "BAD001" not in products
+
+
+def test_ndjson_upload_import(client):
+    headers = admin_headers(client)
+    lines = [
+        json.dumps({"name": "Cable", "sku": "CAB001", "quantity": 7}),
+        "not json",
+        json.dumps({"name": "Cable", "sku": "CAB001", "quantity": 9}),
+    ]
+    response = client.post(
+        "/api/products/import",
+        data={"file": (io.BytesIO("\n".join(lines).encode()), "catalog.ndjson")},
+        headers=headers,
+        content_type="multipart/form-data",
+    )
+    report = json.loads(response.data)
+    assert (report["inserted"], report["updated"], report["errors"]) == (1, 1, 1)
+    assert Product.query.filter_by(sku="CAB001").one().quantity == 9
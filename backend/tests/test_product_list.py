@@ -0,0 +1,57 @@
+import json
+from sqlalchemy import text
+from app import db
+from app.services.product_queries import product_list_query, search_products
+from conftest import create_user, login_user, create_product
+
+
+def _admin_headers(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    return token, {"Authorization": f"Bearer {token}"}
+
+
+def test_products_page_by_name_with_sparse_fields(client):
+    token, headers = _admin_headers(client)
+    for name, sku in [("Mouse", "MOU001"), ("Laptop", "LAP001"), ("Keyboard", "KEY001")]:
+        create_product(client, token, name, sku, 3)
+
+    first = json.loads(
+        client.get("/api/products?limit=2&fields=sku", headers=headers).data
+    )
+    assert first["products"] == [{"sku": "KEY001"}, {"sku": "LAP001"}]
+
+    second = json.loads(client.get(
+        f"/api/products?limit=2&fields=sku&cursor={first['next_cursor']}",
+        headers=headers,
+    ).data)
+    assert second == {"products": [{"sku": "MOU001"}], "next_cursor": None}
+
+
+def test_products_prefix_search_on_name_or_sku(client):
+    token, headers = _admin_headers(client)
+    create_product(client, token, "Laptop Stand", "STD001", 1)
+    create_product(client, token, "Mouse", "LAP100", 1)
+    create_product(client, token, "Flap_Valve", "FLP001", 1)
+
+    products = json.loads(
+        client.get("/api/products?q=lap&fields=name", headers=headers).data
+    )
+    assert products == [{"name": "Laptop Stand"}, {"name": "Mouse"}]
+
+    # LIKE wildcards in the prefix are matched literally
+    assert json.loads(client.get("/api/products?q=fl_", headers=headers).data) == []
+    assert client.get("/api/products?fields=price", headers=headers).status_code == 400
+
+
+def test_prefix_search_uses_the_lower_indexes(app):
+    query = search_products(product_list_query(("id",)), "lap")
+    compiled = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = " ".join(
+        str(row[-1])
+        for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    )
+    assert "ix_products_name_lower" in plan
+    assert "ix_products_sku_lower" in plan
@@ -0,0 +1,61 @@
+from datetime import datetime
+import pytest
+from marshmallow import fields
+from app import ma, db
+from app.models.shipment import Shipment
+from app.models.user import User
+from app.schemas import (
+    shipments_schema,
+    shipment_rows_schema,
+    fast_shipments_schema,
+    fast_shipment_rows_schema,
+)
+from app.services.shipment_queries import shipment_list_query
+from app.utils.serializers import compile_serializer
+
+
+def seed():
+    customer = User(username="cust", email="cust@example.com", password_hash="x")
+    driver = User(username="drv", email="drv@example.com", password_hash="x")
+    db.session.add_all([customer, driver])
+    db.session.flush()
+    db.session.add_all([
+        Shipment(
+            origin="A",
+            destination="B",
+            customer_id=customer.id,
+            created_at=datetime(2026, 1, 2, 3, 4, 5, 678),
+        ),
+        Shipment(
+            origin="C",
+            destination="D",
+            customer_id=customer.id,
+            driver_id=driver.id,
+        ),
+        Shipment(origin="E", destination="F", customer_id=999, created_at=None),
+    ])
+    db.session.commit()
+
+
+def test_compiled_output_is_byte_identical(app):
+    seed()
+    objects = Shipment.query.order_by(Shipment.id).all()
+    rows = shipment_list_query().order_by(Shipment.id).all()
+
+    assert app.json.dumps(fast_shipments_schema.dump(objects)) == app.json.dumps(
+        shipments_schema.dump(objects)
+    )
+    assert app.json.dumps(fast_shipment_rows_schema.dump(rows)) == app.json.dumps(
+        shipment_rows_schema.dump(rows)
+    )
+    assert fast_shipments_schema.dump(objects[0], many=False) == shipments_schema.dump(
+        objects[0], many=False
+    )
+
+
+def test_unsupported_fields_are_rejected_at_compile_time():
+    class EmailSchema(ma.Schema):
+        email = fields.Email()
+
+    with pytest.raises(TypeError):
+        compile_serializer(EmailSchema(many=True))
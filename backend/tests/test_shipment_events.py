@@ -0,0 +1,113 @@
+import json
+from app import db
+from app.models.shipment_event import ShipmentEvent
+from conftest import create_user, login_user, shipment, admin_token
+
+
+def _events(shipment_id):
+    return [
+        (e.kind, e.old_value, e.new_value)
+        for e in ShipmentEvent.query.filter_by(shipment_id=shipment_id).order_by(ShipmentEvent.id)
+    ]
+
+
+def test_changes_are_logged_and_shown_in_tracking(client):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    create_user(client, "dan", "dan@example.com", "pass123", "driver")
+    created = json.loads(
+        client.post("/api/shipments", json=shipment("Mombasa"), headers=headers).data
+    )
+
+    client.patch(
+        "/api/shipments/1",
+        json={"driver_id": 2, "payment_status": "Paid", "status": "Pending"},
+        headers=headers,
+    )
+    driver = {"Authorization": f"Bearer {login_user(client, 'dan@example.com', 'pass123')}"}
+    client.patch("/api/shipments/1", json={"status": "In Transit"}, headers=driver)
+
+    assert _events(1) == [
+        ("created", None, "Pending"),
+        ("driver_id", None, "2"),
+        ("payment_status", "Unpaid", "Paid"),
+        ("status", "Pending", "In Transit"),
+    ]
+    assert ShipmentEvent.query.filter_by(kind="status").one().actor_id == 2
+
+    tracked = json.loads(client.get(f"/api/shipments/track/{created['tracking']}").data)
+    timeline = tracked["timeline"]
+    assert [(e["event"], e["to"]) for e in timeline] == [
+        ("created", "Pending"),
+        ("driver_id", "2"),
+        ("payment_status", "Paid"),
+        ("status", "In Transit"),
+    ]
+    assert timeline[-1]["from"] == "Pending"
+    assert "actor_id" not in timeline[0]
+
+    batch = json.loads(
+        client.post(
+            "/api/shipments/track/batch",
+            json={"tracking_numbers": [created["tracking"]]},
+            headers=headers,
+        ).data
+    )
+    assert batch["results"][created["tracking"]]["timeline"] == timeline
+
+
+def test_bulk_paths_write_events_with_one_insert(client, record_sql):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    create_user(client, "dan", "dan@example.com", "pass123", "driver")
+
+    with record_sql() as statements:
+        client.post(
+            "/api/shipments/bulk",
+            json=[shipment(f"Town {i}", driver_id=2 if i == 0 else None) for i in range(5)],
+            headers=headers,
+        )
+        client.patch(
+            "/api/shipments/bulk", json={"ids": [1, 2, 3], "status": "Cancelled"}, headers=headers
+        )
+        client.post("/api/admin/dispatch", headers=headers)
+
+    inserts = [s for s in statements if s.startswith("INSERT INTO shipment_events")]
+    assert len(inserts) == 3
+    assert ShipmentEvent.query.filter_by(kind="created").count() == 5
+    assert ShipmentEvent.query.filter_by(kind="status").count() == 3
+    # Shipment 1 was created with its driver; 4 and 5 were dispatched to them
+    assert ShipmentEvent.query.filter_by(kind="driver_id").count() == 3
+    assert _events(4)[-1] == ("driver_id", None, "2")
+
+
+def test_timeline_is_one_indexed_range_query(client, record_sql):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    created = json.loads(
+        client.post("/api/shipments", json=shipment("Mombasa"), headers=headers).data
+    )
+
+    with record_sql() as statements:
+        client.get(f"/api/shipments/track/{created['tracking']}")
+    reads = [s for s in statements if "FROM shipment_events" in s]
+    assert len(reads) == 1
+
+    plan = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + reads[0], (1,))
+    details = " ".join(str(row[-1]) for row in plan)
+    assert "ix_shipment_events_shipment_occurred" in details
+
+
+def test_deleting_a_shipment_keeps_its_events_and_its_id(client):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    client.post("/api/shipments", json=shipment("Mombasa"), headers=headers)
+    client.post("/api/shipments", json=shipment("Kisumu"), headers=headers)
+    client.patch("/api/shipments/2", json={"payment_status": "Paid"}, headers=headers)
+
+    assert client.delete("/api/shipments/2", headers=headers).status_code == 200
+    assert _events(2) == [("created", None, "Pending"), ("payment_status", "Unpaid", "Paid")]
+
+    # The freed id is not handed out again, so the next shipment starts clean
+    created = json.loads(
+        client.post("/api/shipments", json=shipment("Eldoret"), headers=headers).data
+    )
+    assert created["id"] == 3
+    tracked = json.loads(client.get(f"/api/shipments/track/{created['tracking']}").data)
+    assert [(e["event"], e["to"]) for e in tracked["timeline"]] == [("created", "Pending")]
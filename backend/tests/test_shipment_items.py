@@ -0,0 +1,41 @@
+import json
+from app.models.shipment_item import ShipmentItem
+from app.services.shipment_service import create_shipment_logic
+from conftest import create_product, shipment, admin_token
+
+
+def test_create_writes_items_with_one_insert(client, record_sql):
+    token = admin_token(client)
+    for sku in ("A1", "B1", "C1"):
+        create_product(client, token, sku, sku, 10)
+
+    with record_sql() as statements:
+        items = [{"product_id": i, "quantity": i} for i in (1, 2, 3)]
+        created = create_shipment_logic(shipment("Mombasa", items=items), user_id=1)
+
+    inserts = [s for s in statements if s.startswith("INSERT INTO shipment_items")]
+    assert len(inserts) == 1
+    assert created.customer_id == 1
+    assert [(i.product_id, i.quantity) for i in created.shipment_items] == [
+        (1, 1), (2, 2), (3, 3)
+    ]
+    assert ShipmentItem.query.count() == 3
+
+
+def test_shipment_responses_include_items(client):
+    token = admin_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    create_product(client, token, "Laptop", "LAP001", 10)
+
+    response = client.post(
+        "/api/shipments",
+        json=shipment("Mombasa", items=[{"product_id": 1, "quantity": 4}]),
+        headers=headers,
+    )
+    assert response.status_code == 201
+    created = json.loads(response.data)
+    assert [(i["product_id"], i["quantity"]) for i in created["items"]] == [(1, 4)]
+
+    detail = json.loads(client.get("/api/shipments/1", headers=headers).data)
+    tracked = json.loads(client.get(f"/api/shipments/track/{created['tracking']}").data)
+    assert detail["items"] == tracked["items"] == created["items"]
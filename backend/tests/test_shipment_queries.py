@@ -0,0 +1,35 @@
+from app import db
+from app.models.shipment import Shipment
+from app.models.user import User
+from app.schemas import shipments_schema, shipment_rows_schema
+from app.services.shipment_queries import shipment_list_query
+
+
+def test_projected_rows_serialize_like_orm_objects(app):
+    customer = User(username="cust", email="cust@example.com", role="customer")
+    driver = User(username="drv", email="drv@example.com", role="driver")
+    customer.password_hash = driver.password_hash = "x"
+    db.session.add_all([customer, driver])
+    db.session.flush()
+
+    db.session.add_all([
+        Shipment(origin="A", destination="B", customer_id=customer.id),
+        Shipment(
+            origin="C",
+            destination="D",
+            customer_id=customer.id,
+            driver_id=driver.id,
+            notes="fragile",
+        ),
+        # Orphaned customer reference falls back to "Unknown Customer"
+        Shipment(origin="E", destination="F", customer_id=999),
+    ])
+    db.session.commit()
+
+    orm_rows = shipments_schema.dump(Shipment.query.order_by(Shipment.id).all())
+    projected = shipment_rows_schema.dump(
+        shipment_list_query().order_by(Shipment.id).all()
+    )
+
+    assert projected == orm_rows
+    assert projected[2]["customer_name"] == "Unknown Customer"
@@ -0,0 +1,93 @@
+import json
+from collections import Counter
+from sqlalchemy import update
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipment_stat import ShipmentStat
+from app.commands import reconcile_stats_command
+from conftest import create_user, create_product, shipment, admin_token
+
+
+def _stats(client, headers):
+    response = client.get("/api/admin/stats", headers=headers)
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+
+def _expected():
+    shipments = Shipment.query.all()
+    return (
+        len(shipments),
+        round(sum(s.weight or 0 for s in shipments), 3),
+        Counter(s.status for s in shipments),
+        Counter(s.payment_status for s in shipments),
+    )
+
+
+def _assert_matches_table(client, headers):
+    db.session.expire_all()
+    stats = _stats(client, headers)
+    count, weight, by_status, by_payment = _expected()
+    assert stats["total"] == {"shipments": count, "weight": weight}
+    assert {k: v["shipments"] for k, v in stats["by_status"].items() if v["shipments"]} == by_status
+    assert {k: v["shipments"] for k, v in stats["by_payment_status"].items() if v["shipments"]} == by_payment
+
+
+def test_every_write_path_keeps_stats_current(client):
+    token = admin_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    create_user(client, "dan", "dan@example.com", "pass123", "driver")
+    create_product(client, token, "Laptop", "LAP001", 10)
+
+    client.post("/api/shipments", json=shipment("Mombasa", weight=2.0), headers=headers)
+    client.post(
+        "/api/shipments",
+        json=shipment("Kisumu", weight=3.0, items=[{"product_id": 1, "quantity": 1}]),
+        headers=headers,
+    )
+    client.post(
+        "/api/shipments/bulk",
+        json=[shipment("Eldoret", weight=4.0), shipment("Nakuru", weight=5.5)],
+        headers=headers,
+    )
+    _assert_matches_table(client, headers)
+    assert _stats(client, headers)["by_status"]["Pending"] == {"shipments": 4, "weight": 14.5}
+
+    client.patch("/api/shipments/1", json={"status": "In Transit", "payment_status": "Paid"}, headers=headers)
+    client.patch("/api/shipments/bulk", json={"ids": [2, 3], "status": "Cancelled"}, headers=headers)
+    client.patch("/api/shipments/bulk", json={"ids": [1, 4], "status": "Delivered"}, headers=headers)
+    client.post("/api/admin/dispatch", headers=headers)
+    _assert_matches_table(client, headers)
+
+    client.delete("/api/shipments/3", headers=headers)
+    _assert_matches_table(client, headers)
+    stats = _stats(client, headers)
+    assert stats["by_status"]["Delivered"]["shipments"] == 1  # 4 is unpaid
+    assert stats["by_payment_status"]["Paid"] == {"shipments": 1, "weight": 2.0}
+
+
+def test_stats_reads_do_not_touch_shipments(client, record_sql):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    for i in range(5):
+        client.post("/api/shipments", json=shipment(f"Town {i}"), headers=headers)
+
+    with record_sql() as statements:
+        assert _stats(client, headers)["total"]["shipments"] == 5
+    assert not any("FROM shipments" in s for s in statements)
+
+
+def test_reconcile_command_rebuilds_from_shipments(app, client):
+    headers = {"Authorization": f"Bearer {admin_token(client)}"}
+    for weight in (1.0, 2.0):
+        client.post("/api/shipments", json=shipment("Mombasa", weight=weight), headers=headers)
+
+    # Drift, e.g. from a manual SQL fix that skipped the stats
+    db.session.execute(update(ShipmentStat).values(shipments=99, weight=0))
+    db.session.add(ShipmentStat(status="Lost", payment_status="Unpaid", shipments=1, weight=1))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(reconcile_stats_command)
+    assert result.exit_code == 0, result.output
+    assert "Corrected drift" in result.output
+    _assert_matches_table(client, headers)
+    assert "Lost" not in _stats(client, headers)["by_status"]
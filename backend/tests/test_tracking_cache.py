@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from app import db
+from app.models.shipment import Shipment
+from app.services.tracking_service import tracking_cache
+from app.utils.cache import TTLCache
+from conftest import create_user, login_user
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_lru_and_negative_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, negative_ttl=1, clock=clock)
+
+    assert cache.get_or_load("a", lambda: "A") == "A"
+    assert cache.get_or_load("a", lambda: "changed") == "A"
+    assert cache.get_or_load("missing", lambda: None) is None
+
+    clock.now = 2  # negative entry expired, positive one still fresh
+    assert cache.get_or_load("missing", lambda: "found") == "found"
+    assert cache.get_or_load("a", lambda: "changed") == "A"
+
+    cache.get_or_load("b", lambda: "B")  # evicts the least recently used key
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 2
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache()
+    calls = []
+    started = threading.Event()
+
+    def slow_loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("k", slow_loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] + cache.stats()["hits"] == 7
+
+
+def test_track_route_is_cached_and_invalidated_on_update(client):
+    create_user(client, "admin", "admin@example.com", "pass123", "admin")
+    token = login_user(client, "admin@example.com", "pass123")
+    db.session.add(
+        Shipment(tracking_number="ABC12345", origin="A", destination="B", customer_id=1)
+    )
+    db.session.commit()
+
+    assert client.get("/api/shipments/track/abc12345").status_code == 200
+    assert client.get("/api/shipments/track/ABC12345").status_code == 200
+    assert tracking_cache().stats()["hits"] == 1
+
+    client.patch(
+        "/api/shipments/1",
+        json={"status": "In Transit"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response = client.get("/api/shipments/track/ABC12345")
+    assert json.loads(response.data)["status"] == "In Transit"
+
+    stats = client.get(
+        "/api/admin/cache/tracking", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert json.loads(stats.data)["invalidations"] == 1
+
+
+def test_batch_tracking_resolves_many_numbers(app, client):
+    for number in ("AAA11111", "BBB22222"):
+        db.session.add(
+            Shipment(tracking_number=number, origin="A", destination="B", customer_id=1)
+        )
+    db.session.commit()
+
+    response = client.post(
+        "/api/shipments/track/batch",
+        json={"tracking_numbers": ["aaa11111", "BBB22222", "NOPE0000", "AAA11111"]},
+    )
+    assert response.status_code == 200
+    results = json.loads(response.data)["results"]
+    assert set(results) == {"AAA11111", "BBB22222", "NOPE0000"}
+    assert results["AAA11111"]["tracking"] == "AAA11111"
+    assert results["NOPE0000"] == {"error": "Shipment not found"}
+
+    # The single-number route now answers from the cache
+    hits = tracking_cache().stats()["hits"]
+    client.get("/api/shipments/track/BBB22222")
+    assert tracking_cache().stats()["hits"] == hits + 1
+
+
+def test_batch_tracking_rejects_oversized_and_malformed_requests(app, client):
+    app.config["TRACKING_BATCH_MAX"] = 2
+    too_many = client.post(
+        "/api/shipments/track/batch", json={"tracking_numbers": ["A1", "B2", "C3"]}
+    )
+    assert too_many.status_code == 400
+
+    malformed = client.post("/api/shipments/track/batch", json={"tracking": "A1"})
+    assert malformed.status_code == 400
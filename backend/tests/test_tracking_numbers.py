@@ -0,0 +1,64 @@
+import json
+from app.models.sequence_counter import TRACKING_BLOCK_SIZE
+from app.services import tracking_numbers
+from app.services.tracking_numbers import (
+    ALPHABET,
+    TrackingNumberAllocator,
+    encode_tracking_number,
+    is_generated_tracking_number,
+)
+from conftest import shipment, admin_token
+
+
+def test_encoding_keeps_the_8_character_format_with_a_check_character():
+    numbers = [encode_tracking_number(value) for value in range(1, 5001)]
+
+    assert len(set(numbers)) == len(numbers)
+    for number in numbers:
+        assert len(number) == 8
+        assert number[0] in ALPHABET[16:]  # never a legacy hex number
+        assert is_generated_tracking_number(number)
+
+    # Every single-character typo is caught
+    number = numbers[0]
+    for position in range(8):
+        for char in ALPHABET:
+            if char != number[position]:
+                typo = number[:position] + char + number[position + 1:]
+                assert not is_generated_tracking_number(typo)
+
+
+def test_workers_draw_disjoint_blocks(app):
+    first, second = TrackingNumberAllocator(), TrackingNumberAllocator()
+
+    a = first.allocate(TRACKING_BLOCK_SIZE + 1)
+    b = second.allocate(TRACKING_BLOCK_SIZE)
+    a += first.allocate(5)
+
+    assert first.blocks_reserved == 2 and second.blocks_reserved == 1
+    assert len(set(a) | set(b)) == len(a) + len(b)
+
+
+def test_a_forked_worker_does_not_reuse_the_parents_block(app, monkeypatch):
+    allocator = TrackingNumberAllocator()
+    parent = allocator.allocate(1)
+
+    monkeypatch.setattr(tracking_numbers.os, "getpid", lambda: -1)
+    child = allocator.allocate(1)
+
+    assert allocator.blocks_reserved == 2
+    assert parent != child
+
+
+def test_bulk_create_rejects_numbers_in_the_generated_format(client):
+    token = admin_token(client)
+    reserved = encode_tracking_number(123456)
+
+    response = client.post(
+        "/api/shipments/bulk",
+        json=[shipment("Mombasa", tracking_number=reserved), shipment("Kisumu")],
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    body = json.loads(response.data)
+    assert set(body["errors"]) == {"0"}
+    assert is_generated_tracking_number(body["created"][0]["tracking_number"])
@@ -31,7 +31,7 @@ const CustomerDashboard = () => {
         });
         console.log("Data Received:", res.data);
         console.log("Is Array?", Array.isArray(res.data));
-        const rawData = Array.isArray(res.data) ? res.data : res.data.data || [];
+        const rawData = Array.isArray(res.data) ? res.data : res.data.shipments || [];
         const sanitizedData = rawData.map(sanitizeShipment);
         setOrders(sanitizedData);
       } catch (err) {
@@ -11,7 +11,7 @@ const ShipmentListPage = () => {
     // Replace with your actual API endpoint
     axios
       .get("/api/shipments")
-      .then((res) => setShipments(res.data))
+      .then((res) => setShipments(res.data.shipments))
       .catch((err) => console.log(err));
   }, []);
 